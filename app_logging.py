@@ -0,0 +1,251 @@
+"""
+Modul pentru logging structurat.
+
+Mesajele nu sunt scrise direct pe stderr din handler-e sau din worker-i:
+`configure_logging` pune pe logger-ul rădăcină un `QueueHandler`, iar un
+thread separat (`QueueListener`) le formatează și le scrie. Un apel de log
+din calea critică doar adaugă înregistrarea într-o coadă în memorie.
+
+Fiecare înregistrare primește ID-ul cererii HTTP curente (`request_id`),
+setat de `RequestIdMiddleware` din header-ul X-Request-ID sau generat;
+același ID este trimis în răspuns și în job-urile din pool.
+
+Evenimentele frecvente (ex. câte unul per fișă) se scriu cu `log_sampled`,
+care păstrează doar o fracțiune din ele (LOG_SAMPLE_RATE).
+
+Configurare prin variabile de mediu: LOG_LEVEL (implicit INFO),
+LOG_FORMAT ('json' sau 'text'), LOG_SAMPLE_RATE (implicit 0.01).
+"""
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
+
+
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', 0.01))
+
+REQUEST_ID_HEADER = b'x-request-id'
+
+request_id_var: ContextVar[Optional[str]] = ContextVar('request_id', default=None)
+
+# Atributele standard ale unui LogRecord; celelalte provin din `extra=` și
+# sunt scrise drept câmpuri ale înregistrării
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'request_id'}
+
+
+def get_request_id() -> Optional[str]:
+    """ID-ul cererii curente (None în afara unei cereri)."""
+    return request_id_var.get()
+
+
+def set_request_id(request_id: Optional[str]):
+    """Setează ID-ul cererii în contextul curent; returnează token-ul pentru reset."""
+    return request_id_var.set(request_id)
+
+
+def _fields(record: logging.LogRecord) -> dict:
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS}
+
+
+class JsonFormatter(logging.Formatter):
+    """O înregistrare pe linie, ca obiect JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+            **_fields(record)
+        }
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Format lizibil pentru dezvoltare: câmpurile suplimentare ca cheie=valoare."""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)-7s %(name)s [%(request_id)s] %(message)s')
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        fields = _fields(record)
+        if fields:
+            text += ' ' + ' '.join(f'{key}={value}' for key, value in fields.items())
+        return text
+
+
+class _RequestIdFilter(logging.Filter):
+    """Atașează ID-ul cererii; rulează în contextul apelantului, nu în listener."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, 'request_id'):
+            record.request_id = request_id_var.get()
+        return True
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler care lasă formatarea în seama listener-ului.
+
+    `QueueHandler.prepare` formatează mesajul în thread-ul apelantului și
+    pierde câmpurile structurate; aici sunt păstrate, iar excepția este
+    doar transformată în text (traceback-ul nu poate trece prin coadă).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener: Optional[QueueListener] = None
+_configure_lock = threading.Lock()
+
+
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT) -> None:
+    """
+    Configurează logger-ul rădăcină cu coada și thread-ul de scriere.
+
+    Apelurile repetate nu au efect; este folosită și ca `initializer` pentru
+    procesele din pool-ul de lucru.
+
+    Args:
+        level: Nivelul minim (DEBUG, INFO, WARNING, ...)
+        fmt: 'json' sau 'text'
+    """
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return
+
+        output = logging.StreamHandler(sys.stderr)
+        output.setFormatter(TextFormatter() if fmt == 'text' else JsonFormatter())
+
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        handler = _NonBlockingQueueHandler(log_queue)
+        handler.addFilter(_RequestIdFilter())
+
+        root = logging.getLogger()
+        root.handlers = [handler]
+        root.setLevel(level)
+        # Parserul multipart scrie câte un mesaj DEBUG pentru fiecare bucată din upload
+        logging.getLogger('multipart').setLevel(max(root.level, logging.INFO))
+
+        _listener = QueueListener(log_queue, output, respect_handler_level=True)
+        _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Scrie înregistrările rămase în coadă și oprește thread-ul de scriere."""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def log_sampled(
+    logger: logging.Logger,
+    level: int,
+    msg: str,
+    *args: Any,
+    rate: Optional[float] = None,
+    **fields: Any
+) -> None:
+    """
+    Scrie un eveniment frecvent doar cu probabilitatea `rate`.
+
+    Decizia se ia înainte de a construi înregistrarea, deci un eveniment
+    eliminat (sau sub nivelul logger-ului) nu costă aproape nimic. Rata este
+    scrisă în înregistrare (`sample_rate`), pentru reponderare la agregare.
+
+    Args:
+        logger: Logger-ul modulului
+        level: Nivelul (ex. logging.DEBUG)
+        msg: Mesajul (cu argumentele `args`, ca în `logger.log`)
+        rate: Fracțiunea păstrată (implicit LOG_SAMPLE_RATE)
+        fields: Câmpuri structurate ale înregistrării
+    """
+    if not logger.isEnabledFor(level):
+        return
+    rate = LOG_SAMPLE_RATE if rate is None else rate
+    if rate < 1.0 and random.random() >= rate:
+        return
+    logger.log(level, msg, *args, extra={**fields, 'sample_rate': rate})
+
+
+access_logger = logging.getLogger('fisa.access')
+
+
+class RequestIdMiddleware:
+    """
+    Middleware ASGI: ID-ul de corelare al cererii și jurnalul de acces.
+
+    ID-ul vine din header-ul X-Request-ID (dacă clientul sau proxy-ul îl
+    trimite) sau este generat și este returnat în răspuns. Cererile reușite
+    sunt jurnalizate eșantionat (DEBUG); erorile 5xx întotdeauna (WARNING).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope['headers']:
+            if name == REQUEST_ID_HEADER:
+                request_id = value.decode('latin-1')[:128]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = set_request_id(request_id)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_id(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                headers = list(message.get('headers', []))
+                headers.append((REQUEST_ID_HEADER, request_id.encode('latin-1')))
+                message = {**message, 'headers': headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            fields = {
+                'method': scope['method'],
+                'path': scope['path'],
+                'status': status,
+                'duration_ms': round((time.perf_counter() - start) * 1000, 2)
+            }
+            if status >= 500:
+                access_logger.warning('Cerere eșuată', extra=fields)
+            else:
+                log_sampled(access_logger, logging.DEBUG, 'Cerere', **fields)
+            request_id_var.reset(token)
@@ -0,0 +1,302 @@
+"""
+Modul pentru validarea în lot a mai multor fișe de disciplină.
+
+Fișele pot fi trimise ca fișiere DOCX separate sau într-o arhivă ZIP.
+Membrii arhivei sunt citiți unul câte unul direct din upload (fără
+dezarhivare pe disc), iar numărul de fișe aflate simultan în memorie este
+limitat de fereastra de procesare, indiferent de dimensiunea arhivei.
+"""
+import asyncio
+import io
+import logging
+import shutil
+import tempfile
+import zipfile
+from collections import Counter
+from typing import Any, AsyncIterator, Awaitable, BinaryIO, Callable, Dict, List, Optional, Tuple
+
+from executor import ExecutorSaturatedError
+from serialization import dumps
+from uploads import UploadRejected, check_docx
+
+
+logger = logging.getLogger(__name__)
+
+# Pauza dintre reîncercări când pool-ul este saturat (secunde)
+BATCH_RETRY_DELAY = 0.05
+
+# Dimensiunea maximă (necomprimată) a unui membru DOCX din arhivă
+BATCH_MAX_MEMBER_SIZE = 50 * 1024 * 1024
+
+# Cu `spool`, membrii arhivei mai mari de atât trec prin disc, nu prin memorie
+BATCH_SPOOL_MEMORY = 1024 * 1024
+
+
+def _is_docx(name: str) -> bool:
+    return name.lower().endswith('.docx')
+
+
+def _is_zip(name: str) -> bool:
+    return name.lower().endswith('.zip')
+
+
+async def iter_batch_documents(
+    uploads: List[Any],
+    in_memory: bool = False,
+    max_member_size: int = BATCH_MAX_MEMBER_SIZE,
+    spool: Optional[Callable[[BinaryIO], Any]] = None
+) -> AsyncIterator[Tuple[str, Any, Optional[str]]]:
+    """
+    Generează fișele din upload-uri, expandând arhivele ZIP.
+
+    Args:
+        uploads: Fișierele încărcate (UploadFile)
+        in_memory: True dacă pool-ul poate primi direct obiectul fișier al
+            upload-ului; altfel se trimite conținutul (bytes)
+        max_member_size: Dimensiunea maximă a unui membru din arhivă
+        spool: Funcție (rulată într-un thread) care copiază fișa verificată
+            dintr-un fișier, în bucăți, și returnează sursa generată în locul
+            conținutului (ex. hash-ul fișei salvate); fișele nu mai sunt
+            citite în memorie
+
+    Yields:
+        Tupluri (nume_fisier, sursă, eroare); sursa este None când există eroare
+    """
+    for upload in uploads:
+        name = upload.filename or ''
+
+        if _is_docx(name):
+            try:
+                check_docx(upload.file)
+            except UploadRejected as e:
+                yield name, None, str(e)
+                continue
+            if spool is not None:
+                source = await asyncio.to_thread(spool, upload.file)
+            else:
+                source = upload.file if in_memory else await upload.read()
+            yield name, source, None
+
+        elif _is_zip(name):
+            try:
+                archive = zipfile.ZipFile(upload.file)
+            except zipfile.BadZipFile:
+                yield name, None, "Arhiva ZIP este invalidă"
+                continue
+
+            with archive:
+                for info in archive.infolist():
+                    member = info.filename
+                    if info.is_dir() or not _is_docx(member) or member.startswith('__MACOSX/'):
+                        continue
+                    if info.file_size > max_member_size:
+                        yield member, None, "Fișierul depășește dimensiunea maximă permisă"
+                        continue
+                    if spool is not None:
+                        source, error = await _spool_member(archive, info, spool)
+                        yield member, source, error
+                        continue
+                    try:
+                        # ZipExtFile nu decomprimă mai mult decât dimensiunea declarată
+                        content = await asyncio.to_thread(archive.read, info)
+                    except (zipfile.BadZipFile, OSError, NotImplementedError) as e:
+                        yield member, None, f"Membrul arhivei nu poate fi citit: {str(e)}"
+                        continue
+                    try:
+                        check_docx(io.BytesIO(content))
+                    except UploadRejected as e:
+                        yield member, None, str(e)
+                        continue
+                    yield member, content, None
+
+        else:
+            yield name, None, "Fișierul trebuie să fie în format DOCX sau ZIP"
+
+
+async def _spool_member(
+    archive: zipfile.ZipFile,
+    info: zipfile.ZipInfo,
+    spool: Callable[[BinaryIO], Any]
+) -> Tuple[Any, Optional[str]]:
+    """Membrul arhivei, copiat în bucăți (prin disc, dacă e mare), verificat și dat lui `spool`."""
+    with tempfile.SpooledTemporaryFile(BATCH_SPOOL_MEMORY) as content:
+        try:
+            def copy() -> None:
+                with archive.open(info) as member_file:
+                    shutil.copyfileobj(member_file, content)
+            await asyncio.to_thread(copy)
+        except (zipfile.BadZipFile, OSError, NotImplementedError) as e:
+            return None, f"Membrul arhivei nu poate fi citit: {str(e)}"
+        try:
+            check_docx(content)
+        except UploadRejected as e:
+            return None, str(e)
+        return await asyncio.to_thread(spool, content), None
+
+
+# Validarea unei fișe: primește sursa și returnează rezultatul `validate_fisa`
+Validator = Callable[[Any], Awaitable[Dict[str, Any]]]
+
+
+async def _validate_one(index: int, filename: str, source: Any, validate: Validator) -> Dict[str, Any]:
+    """Validează o fișă, așteptând un loc liber dacă pool-ul e saturat."""
+    while True:
+        try:
+            rezultat = await validate(source)
+            return {
+                "index": index,
+                "filename": filename,
+                "status": "success",
+                "validare": rezultat
+            }
+        except ExecutorSaturatedError:
+            await asyncio.sleep(BATCH_RETRY_DELAY)
+        except Exception as e:
+            logger.warning("Eroare la validarea unei fișe din lot: %s", e, extra={"fisier": filename})
+            return {
+                "index": index,
+                "filename": filename,
+                "status": "error",
+                "detail": f"Eroare la validare: {str(e)}"
+            }
+
+
+async def validate_batch(
+    documents: AsyncIterator[Tuple[str, Any, Optional[str]]],
+    validate: Validator,
+    window: int
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Validează fișele în paralel și generează rezultatele pe măsură ce se termină.
+
+    Rezultatele pot sosi în altă ordine decât fișele; fiecare poartă indexul
+    fișei în lot. Cel mult `window` fișe sunt citite și în lucru simultan.
+
+    Args:
+        documents: Fișele de validat (vezi `iter_batch_documents`)
+        validate: Funcția async care validează o fișă (de regulă în pool-ul
+            de lucru); poate ridica ExecutorSaturatedError
+        window: Numărul maxim de fișe în lucru
+
+    Yields:
+        Rezultatul per fișă, cu cheile index, filename, status și validare/detail
+    """
+    pending = set()
+    index = 0
+
+    try:
+        async for filename, source, error in documents:
+            if error is not None:
+                yield {"index": index, "filename": filename, "status": "error", "detail": error}
+                index += 1
+                continue
+
+            pending.add(asyncio.create_task(
+                _validate_one(index, filename, source, validate)
+            ))
+            index += 1
+
+            if len(pending) >= window:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        # Clientul s-a deconectat sau a apărut o eroare: nu mai așteptăm restul
+        for task in pending:
+            task.cancel()
+
+
+class BatchSummary:
+    """
+    Sumarul agregat al unui lot, actualizat incremental cu fiecare rezultat.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.pe_status = Counter()
+        self.pe_eroare = Counter()
+        self.pe_avertisment = Counter()
+        self.statistici = Counter()
+
+    def add(self, item: Dict[str, Any]) -> None:
+        """Adaugă rezultatul unei fișe în sumar."""
+        self.total += 1
+
+        if item['status'] != 'success':
+            # Fișa nu a putut fi procesată (format invalid, eroare la extragere)
+            self.pe_status['esuat'] += 1
+            return
+
+        validare = item['validare']
+        self.pe_status[validare['status']] += 1
+        self.statistici.update(validare.get('statistici') or {})
+
+        if validare['validari'] is None:
+            self.pe_eroare['disciplina_inexistenta'] += 1
+            return
+
+        for grup in validare['validari'].values():
+            for nume, verificare in grup.items():
+                if verificare.get('status') == 'error':
+                    self.pe_eroare[nume] += 1
+                elif verificare.get('status') == 'warning':
+                    self.pe_avertisment[nume] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Sumarul ca dicționar serializabil JSON."""
+        return {
+            "total_fisiere": self.total,
+            "pe_status": dict(self.pe_status),
+            "pe_eroare": dict(self.pe_eroare),
+            "pe_avertisment": dict(self.pe_avertisment),
+            "statistici": {
+                "total_verificari": self.statistici['total_verificari'],
+                "succes": self.statistici['succes'],
+                "warning": self.statistici['warning'],
+                "erori": self.statistici['erori']
+            }
+        }
+
+
+def encode_ndjson(tip: str, record: Dict[str, Any]) -> bytes:
+    """Un rând NDJSON; câmpul `tip` distinge rezultatele de sumarul final."""
+    return dumps({"tip": tip, **record}) + b"\n"
+
+
+def encode_sse(tip: str, record: Dict[str, Any]) -> bytes:
+    """Un eveniment Server-Sent Events, cu `tip` ca nume de eveniment."""
+    # JSON-ul compact este pe un singur rând, deci încape într-un câmp `data`
+    return b"event: " + tip.encode() + b"\ndata: " + dumps(record) + b"\n\n"
+
+
+# Formatele de streaming: codificatorul și media type-ul răspunsului
+STREAM_FORMATS = {
+    'ndjson': (encode_ndjson, 'application/x-ndjson'),
+    'sse': (encode_sse, 'text/event-stream')
+}
+
+
+async def stream_batch(
+    results: AsyncIterator[Dict[str, Any]],
+    encode: Callable[[str, Dict[str, Any]], bytes]
+) -> AsyncIterator[bytes]:
+    """
+    Transmite fiecare rezultat imediat ce este gata, urmat de sumarul lotului.
+
+    Args:
+        results: Rezultatele per fișă (vezi `validate_batch`)
+        encode: Codificatorul formatului (`encode_ndjson` sau `encode_sse`)
+
+    Yields:
+        Înregistrările codificate, câte una per fișă, apoi sumarul
+    """
+    summary = BatchSummary()
+    async for item in results:
+        summary.add(item)
+        yield encode('rezultat', item)
+    yield encode('sumar', summary.to_dict())
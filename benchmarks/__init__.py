@@ -0,0 +1,9 @@
+"""
+Benchmark-uri pentru extragerea și validarea fișelor de disciplină.
+
+- `generator`: fișe DOCX sintetice, generate din planul de învățământ
+- `run`: măsurători per etapă, throughput și (opțional) endpoint-urile HTTP,
+  cu rezultate JSON comparabile între commit-uri
+
+Rulare: `python -m benchmarks.run --help`
+"""
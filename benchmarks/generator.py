@@ -0,0 +1,272 @@
+"""
+Generator de fișe de disciplină DOCX sintetice.
+
+Fișele respectă structura din schema implicită (fisa_schema.py): tabelul 2
+cu datele disciplinei și tabelul 3 cu orele, cu aceleași celule îmbinate
+ca fișa reală. Datele provin din planul de învățământ.
+
+Variante:
+- 'valid': valorile din plan
+- 'erori': credite, ore și denumire modificate (validarea raportează erori)
+- 'imbinari': aceleași date, cu multe celule îmbinate (gridSpan/vMerge) și tabele suplimentare
+- 'mare': aceleași date, cu imagini încorporate și multe paragrafe
+"""
+import io
+import random
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from docx import Document
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+from docx.shared import Inches
+
+from matching import fold_diacritics
+
+
+VARIANTS = ('valid', 'erori', 'imbinari', 'mare')
+
+
+def _png(width: int, height: int, rng: random.Random) -> bytes:
+    """O imagine PNG RGB cu zgomot (practic necompresibilă)."""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    row = width * 3
+    raw = b''.join(b'\x00' + rng.randbytes(row) for _ in range(height))
+    return (
+        b'\x89PNG\r\n\x1a\n'
+        + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+        + chunk(b'IDAT', zlib.compress(raw, 1))
+        + chunk(b'IEND', b'')
+    )
+
+
+def fisa_values(disc: Dict[str, Any], variant: str = 'valid') -> Dict[str, Any]:
+    """
+    Valorile scrise în fișă pentru o disciplină din plan.
+
+    Câmpurile lipsă din plan sunt completate consecvent (ore plan = 14
+    săptămâni, total semestru = credite × 25).
+    """
+    ore = disc['nr_ore_saptamana']
+    total_saptamana = disc.get('nr_ore_saptamana_total', sum(ore.values()))
+    total_plan = disc.get('total_ore_plan', total_saptamana * 14)
+    total_semestru = disc.get('total_ore_semestru', disc['credite'] * 25)
+    total_studiu = disc.get('total_ore_studiu_individual', max(total_semestru - total_plan, 0))
+    distributie = disc.get('distributie_fond_timp') or {
+        'studiu_manual': total_studiu // 3,
+        'documentare': total_studiu // 3,
+        'pregatire_seminarii': total_studiu - 2 * (total_studiu // 3),
+        'examinari': 2
+    }
+
+    values = {
+        'cod': disc['cod'],
+        'denumire_ro': disc['denumire_ro'],
+        'denumire_en': disc['denumire_en'],
+        'categoria': disc['categoria'],
+        'evaluare': disc.get('evaluare', 'E'),
+        'credite': disc['credite'],
+        'total_saptamana': total_saptamana,
+        'curs': ore['curs'],
+        'lucrari': ore['lucrari'],
+        'total_plan': total_plan,
+        'distributie': dict(distributie),
+        'total_studiu': total_studiu,
+        'total_semestru': total_semestru
+    }
+
+    if variant == 'erori':
+        values['denumire_ro'] = fold_diacritics(values['denumire_ro'])
+        values['credite'] += 1
+        values['lucrari'] += 1
+        values['distributie']['examinari'] = 5
+        values['total_studiu'] += 3
+    return values
+
+
+def _merge(table, r1: int, c1: int, r2: int, c2: int, text: str) -> None:
+    table.cell(r1, c1).merge(table.cell(r2, c2)).text = text
+
+
+def _merged_table(rows: int, cols: int, rng: random.Random):
+    """Un tabel w:tbl în care fiecare grup de 3 rânduri are îmbinări gridSpan și vMerge."""
+    def tc(text: str, span: int = 1, merge: Optional[str] = None) -> str:
+        props = f'<w:gridSpan w:val="{span}"/>' if span > 1 else ''
+        if merge:
+            props += f'<w:vMerge w:val="{merge}"/>' if merge == 'restart' else '<w:vMerge/>'
+        return f'<w:tc><w:tcPr>{props}</w:tcPr><w:p><w:r><w:t>{text}</w:t></w:r></w:p></w:tc>'
+
+    trs = []
+    for r in range(rows):
+        phase = r % 3
+        cells = [tc(f'Secțiunea {r // 3 + 1}' if phase == 0 else '', 2, 'restart' if phase == 0 else 'continue')]
+        for _ in range(2, cols, 2):
+            if phase == 0:
+                cells.append(tc(str(rng.randint(1, 99)), 2))
+            else:
+                cells.append(tc('conținut îmbinat' if phase == 1 else '', 2, 'restart' if phase == 1 else 'continue'))
+        trs.append(f'<w:tr>{"".join(cells)}</w:tr>')
+
+    grid = ''.join('<w:gridCol w:w="700"/>' for _ in range(cols))
+    return parse_xml(
+        f'<w:tbl {nsdecls("w")}><w:tblPr><w:tblW w:w="0" w:type="auto"/></w:tblPr>'
+        f'<w:tblGrid>{grid}</w:tblGrid>{"".join(trs)}</w:tbl>'
+    )
+
+
+def build_fisa(disc: Dict[str, Any], variant: str = 'valid', seed: int = 0) -> bytes:
+    """
+    Construiește o fișă DOCX pentru o disciplină din plan.
+
+    Args:
+        disc: Disciplina din plan
+        variant: Una dintre `VARIANTS`
+        seed: Sămânța pentru conținutul aleator (imagini, text de umplutură)
+
+    Returns:
+        Conținutul fișierului DOCX
+    """
+    if variant not in VARIANTS:
+        raise ValueError(f"Variantă necunoscută: {variant}")
+    rng = random.Random(seed)
+    v = fisa_values(disc, variant)
+    doc = Document()
+
+    doc.add_paragraph('FIȘA DISCIPLINEI')
+    doc.add_paragraph('1. Date despre program')
+    t0 = doc.add_table(rows=4, cols=4)
+    for r, (label, value) in enumerate([
+        ('1.1 Instituția de învățământ superior', 'Universitatea Tehnică'),
+        ('1.2 Facultatea', 'Facultatea de Construcții'),
+        ('1.3 Domeniul de studii', 'Inginerie civilă'),
+        ('1.4 Programul de studii', 'Inginerie geotehnică')
+    ]):
+        t0.cell(r, 0).text = label
+        _merge(t0, r, 1, r, 3, value)
+
+    doc.add_paragraph('2. Date despre disciplină')
+    t1 = doc.add_table(rows=5, cols=10)
+    _merge(t1, 0, 0, 0, 3, '2.1 Denumirea disciplinei')
+    _merge(t1, 0, 4, 0, 9, f"{v['denumire_ro']} / {v['denumire_en']}")
+    _merge(t1, 1, 0, 1, 3, '2.2 Codul disciplinei')
+    _merge(t1, 1, 4, 1, 6, v['cod'])
+    t1.cell(1, 7).text = 'Categoria'
+    _merge(t1, 1, 8, 1, 9, v['categoria'])
+    _merge(t1, 2, 0, 3, 0, '2.3 Titularul activităților')
+    _merge(t1, 2, 1, 2, 9, 'Curs: Prof. dr. ing. Titular Curs')
+    _merge(t1, 3, 1, 3, 9, 'Aplicații: Ș.l. dr. ing. Titular Aplicații')
+    _merge(t1, 4, 0, 4, 5, '2.7 Tipul de evaluare')
+    t1.cell(4, 6).text = v['evaluare']
+    _merge(t1, 4, 7, 4, 9, 'Semestrul')
+
+    doc.add_paragraph('3. Timpul total estimat')
+    t2 = doc.add_table(rows=11, cols=14)
+    t2.cell(0, 0).text = '3.1 Număr de ore pe săptămână'
+    t2.cell(0, 1).text = str(v['total_saptamana'])
+    _merge(t2, 0, 2, 0, 3, 'din care: 3.2 curs')
+    t2.cell(0, 4).text = str(v['curs'])
+    _merge(t2, 0, 5, 0, 7, '3.3 laborator')
+    t2.cell(0, 8).text = str(v['lucrari'])
+    t2.cell(1, 0).text = '3.4 Total ore din planul de învățământ'
+    _merge(t2, 1, 1, 1, 3, str(v['total_plan']))
+    _merge(t2, 2, 0, 2, 13, 'Distribuția fondului de timp')
+    for r, (label, key) in enumerate([
+        ('Studiul după manual, suport de curs, bibliografie și notițe', 'studiu_manual'),
+        ('Documentare suplimentară în bibliotecă', 'documentare'),
+        ('Pregătire seminarii / laboratoare, teme, referate', 'pregatire_seminarii'),
+        ('Examinări', 'examinari')
+    ], start=3):
+        _merge(t2, r, 0, r, 11, label)
+        t2.cell(r, 12).text = str(v['distributie'][key])
+    _merge(t2, 3, 13, 6, 13, 'ore')
+    t2.cell(7, 0).text = 'Alte activități'
+    for r, label, key in [
+        (8, '3.7 Total ore studiu individual', 'total_studiu'),
+        (9, '3.8 Total ore pe semestru', 'total_semestru'),
+        (10, '3.9 Numărul de credite', 'credite')
+    ]:
+        t2.cell(r, 0).text = label
+        _merge(t2, r, 1, r, 13, str(v[key]))
+
+    doc.add_paragraph('4. Precondiții')
+    t3 = doc.add_table(rows=2, cols=2)
+    t3.cell(0, 0).text = '4.1 de curriculum'
+    t3.cell(1, 0).text = '4.2 de competențe'
+
+    if variant == 'imbinari':
+        # Tabele lungi, cu îmbinări orizontale și verticale alternante
+        # (scrise direct în XML; `_Cell.merge` este prea lent pentru sute de celule)
+        for _ in range(6):
+            doc.add_paragraph('Conținutul disciplinei')
+            doc.element.body.append(_merged_table(60, 12, rng))
+
+    if variant == 'mare':
+        for i in range(4):
+            doc.add_paragraph(f'Figura {i + 1}')
+            doc.add_picture(io.BytesIO(_png(400, 300, rng)), width=Inches(4))
+        for i in range(300):
+            doc.add_paragraph(f'{i + 1}. Conținutul cursului – tema {rng.randint(1, 1000)}. ' * 3)
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def generate_corpus(
+    plan_data: Dict[str, Any],
+    count: int,
+    variants: Tuple[str, ...] = VARIANTS,
+    seed: int = 0
+) -> Iterator[Tuple[str, str, bytes]]:
+    """
+    Generează `count` fișe, alternând disciplinele din plan și variantele.
+
+    Yields:
+        Tupluri (nume_fisier, variantă, conținut DOCX)
+    """
+    discipline = plan_data['discipline']
+    for i in range(count):
+        disc = discipline[i % len(discipline)]
+        variant = variants[i % len(variants)]
+        name = f"{i:04d}_{disc['cod'].replace('.', '')}_{variant}.docx"
+        yield name, variant, build_fisa(disc, variant, seed + i)
+
+
+def write_corpus(
+    plan_data: Dict[str, Any],
+    out_dir: str,
+    count: int,
+    variants: Tuple[str, ...] = VARIANTS,
+    seed: int = 0
+) -> List[str]:
+    """Scrie corpusul generat în `out_dir` și returnează căile fișierelor."""
+    directory = Path(out_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, _, content in generate_corpus(plan_data, count, variants, seed):
+        path = directory / name
+        path.write_bytes(content)
+        paths.append(str(path))
+    return paths
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description='Generează fișe DOCX sintetice din planul de învățământ')
+    parser.add_argument('out_dir', help='Directorul în care sunt scrise fișele')
+    parser.add_argument('--count', type=int, default=20)
+    parser.add_argument('--variants', default=','.join(VARIANTS))
+    parser.add_argument('--plan', default='plan_invatamant.json')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with open(args.plan, encoding='utf-8') as f:
+        plan = json.load(f)
+    written = write_corpus(plan, args.out_dir, args.count, tuple(args.variants.split(',')), args.seed)
+    print(f"{len(written)} fișe scrise în {args.out_dir}")
@@ -0,0 +1,262 @@
+"""
+Benchmark pentru extragere, validare și endpoint-urile HTTP.
+
+Măsoară, pe un corpus de fișe sintetice (vezi generator.py):
+- latența per etapă: dezarhivare, parsare XML, citirea tabelelor (motorul
+  'stream'), căutarea în celule, validarea; plus extragerea completă cu
+  fiecare motor, per variantă de fișă
+- throughput-ul extragerii secvențial și într-un pool de procese
+- opțional (`--url`), latența și throughput-ul endpoint-urilor unui server
+  pornit separat, cu cereri concurente
+
+Rezultatele sunt scrise ca JSON (`--out`); `--compare` afișează diferențele
+față de un rezultat anterior (ex. de pe alt commit).
+
+Exemple:
+    python -m benchmarks.run --count 40 --out bench.json
+    python -m benchmarks.run --url http://localhost:8000 --concurrency 16 --out bench.json
+    python -m benchmarks.run --compare bench_vechi.json --out bench.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from lxml import etree
+
+from benchmarks.generator import VARIANTS, generate_corpus
+from extractors import EXTRACTOR_ENGINES, _stream_tables, extract_fisa_disciplina, extract_from_tables, tables_needed
+from fisa_schema import IDENTIFICATION_FIELDS
+from plan_store import PlanStore
+from tasks import extract_job
+from validators import validate_fisa
+
+
+# Corpus: tupluri (nume_fisier, variantă, conținut DOCX)
+Corpus = List[Tuple[str, str, bytes]]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Statisticile unei serii de durate (secunde), în milisecunde."""
+    ordered = sorted(samples)
+    n = len(ordered)
+    return {
+        'n': n,
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 4),
+        'p50_ms': round(ordered[n // 2] * 1000, 4),
+        'p95_ms': round(ordered[min(n - 1, int(n * 0.95))] * 1000, 4),
+        'max_ms': round(ordered[-1] * 1000, 4)
+    }
+
+
+def measure(fn: Callable[[Any], Any], inputs: List[Any], repeat: int) -> List[float]:
+    """Durata fiecărui apel `fn(input)`, de `repeat` ori pentru fiecare input."""
+    samples = []
+    # Mesajele afișate de extractor/validator nu trebuie să inunde ieșirea
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeat):
+            for item in inputs:
+                start = time.perf_counter()
+                fn(item)
+                samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_stages(corpus: Corpus, store: PlanStore, repeat: int) -> Dict[str, Any]:
+    """Latența fiecărei etape a extragerii și validării."""
+    contents = [content for _, _, content in corpus]
+    xmls = [zipfile.ZipFile(io.BytesIO(content)).read('word/document.xml') for content in contents]
+    tables = [_stream_tables(io.BytesIO(content), tables_needed()) for content in contents]
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        extracted = [extract_from_tables(doc_tables) for doc_tables in tables]
+
+    etape = {
+        'unzip': measure(lambda c: zipfile.ZipFile(io.BytesIO(c)).read('word/document.xml'), contents, repeat),
+        'xml_parse': measure(etree.fromstring, xmls, repeat),
+        'stream_tables': measure(lambda c: _stream_tables(io.BytesIO(c), tables_needed()), contents, repeat),
+        'cell_lookup': measure(extract_from_tables, tables, repeat),
+        'validation': measure(lambda fisa: validate_fisa(fisa, store), extracted, repeat)
+    }
+    for engine in EXTRACTOR_ENGINES:
+        etape[f'extract_{engine}'] = measure(
+            lambda c: extract_fisa_disciplina(c, engine=engine), contents, repeat
+        )
+    etape['extract_identificare'] = measure(
+        lambda c: extract_fisa_disciplina(c, fields=IDENTIFICATION_FIELDS), contents, repeat
+    )
+
+    variante = {}
+    for variant in sorted({variant for _, variant, _ in corpus}):
+        docs = [content for _, v, content in corpus if v == variant]
+        variante[variant] = {
+            'dimensiune_medie_kb': round(statistics.fmean(len(d) for d in docs) / 1024, 1),
+            **{
+                f'extract_{engine}': summarize(measure(
+                    lambda c: extract_fisa_disciplina(c, engine=engine), docs, repeat
+                ))
+                for engine in EXTRACTOR_ENGINES
+            }
+        }
+
+    return {
+        'etape': {name: summarize(samples) for name, samples in etape.items()},
+        'variante': variante
+    }
+
+
+def bench_throughput(corpus: Corpus, workers: int) -> Dict[str, Any]:
+    """Fișe extrase pe secundă, secvențial și în pool-ul de procese."""
+    contents = [content for _, _, content in corpus]
+    result = {}
+    for engine in EXTRACTOR_ENGINES:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            for content in contents:
+                extract_fisa_disciplina(content, engine=engine)
+            sequential = time.perf_counter() - start
+
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            # Pornirea worker-ilor nu intră în măsurătoare
+            list(pool.map(extract_job, contents[:workers], [engine] * workers))
+            start = time.perf_counter()
+            list(pool.map(extract_job, contents, [engine] * len(contents)))
+            parallel = time.perf_counter() - start
+
+        result[engine] = {
+            'secvential_fise_pe_s': round(len(contents) / sequential, 2),
+            'pool_fise_pe_s': round(len(contents) / parallel, 2),
+            'pool_workers': workers
+        }
+    return result
+
+
+def bench_http(corpus: Corpus, url: str, concurrency: int, rounds: int) -> Dict[str, Any]:
+    """
+    Latența și throughput-ul endpoint-urilor unui server pornit separat.
+
+    Prima trecere prin corpus poate fi servită din cache doar dacă serverul
+    a mai văzut fișele (ex. cache SQLite persistent); trecerile următoare
+    măsoară calea cu cache.
+    """
+    import requests
+
+    def post(endpoint: str, name: str, content: bytes) -> Tuple[float, int]:
+        start = time.perf_counter()
+        response = requests.post(
+            f'{url.rstrip("/")}{endpoint}',
+            files={'file': (name, content, 'application/vnd.openxmlformats-officedocument.wordprocessingml.document')}
+        )
+        return time.perf_counter() - start, response.status_code
+
+    result = {}
+    for endpoint in ('/api/validate', '/api/extract'):
+        for round_idx in range(rounds):
+            label = f'{endpoint} prima_trecere' if round_idx == 0 else f'{endpoint} repetat'
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                responses = list(pool.map(lambda doc: post(endpoint, doc[0], doc[2]), corpus))
+            elapsed = time.perf_counter() - start
+
+            entry = result.setdefault(label, {'latente': [], 'status': {}, 'durata': 0.0})
+            entry['latente'].extend(latency for latency, _ in responses)
+            entry['durata'] += elapsed
+            for _, status in responses:
+                entry['status'][str(status)] = entry['status'].get(str(status), 0) + 1
+
+    return {
+        label: {
+            **summarize(entry['latente']),
+            'cereri_pe_s': round(len(entry['latente']) / entry['durata'], 2),
+            'status': entry['status'],
+            'concurenta': concurrency
+        }
+        for label, entry in result.items()
+    }
+
+
+def git_commit() -> Optional[str]:
+    """Commit-ul curent, dacă benchmark-ul rulează într-un checkout git."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any]) -> List[str]:
+    """Diferențele de latență medie per etapă între două rezultate."""
+    lines = [f"Comparație {old['meta'].get('commit')} -> {new['meta'].get('commit')}"]
+    for name, stats in new['etape'].items():
+        before = old.get('etape', {}).get(name)
+        if not before:
+            continue
+        delta = (stats['mean_ms'] - before['mean_ms']) / before['mean_ms'] * 100 if before['mean_ms'] else 0.0
+        lines.append(f"  {name:16} {before['mean_ms']:9.3f} ms -> {stats['mean_ms']:9.3f} ms  ({delta:+.1f}%)")
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description='Benchmark extragere și validare fișe de disciplină')
+    parser.add_argument('--plan', default='plan_invatamant.json', help='Planul de învățământ')
+    parser.add_argument('--count', type=int, default=20, help='Numărul de fișe generate')
+    parser.add_argument('--variants', default=','.join(VARIANTS), help='Variantele de fișe, separate prin virgulă')
+    parser.add_argument('--repeat', type=int, default=5, help='Repetări per fișă și etapă')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker-i pentru throughput')
+    parser.add_argument('--url', help='URL-ul unui server pornit (activează benchmark-ul HTTP)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Cereri HTTP simultane')
+    parser.add_argument('--rounds', type=int, default=2, help='Treceri prin corpus per endpoint')
+    parser.add_argument('--out', help='Fișierul JSON cu rezultatele')
+    parser.add_argument('--compare', help='Un rezultat anterior, pentru comparație')
+    args = parser.parse_args(argv)
+
+    store = PlanStore.from_file(args.plan)
+    corpus = list(generate_corpus(store.data, args.count, tuple(args.variants.split(','))))
+
+    results = {
+        'meta': {
+            'commit': git_commit(),
+            'data': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platforma': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'parametri': {
+                'count': args.count,
+                'variants': args.variants,
+                'repeat': args.repeat,
+                'workers': args.workers
+            }
+        },
+        **bench_stages(corpus, store, args.repeat),
+        'throughput': bench_throughput(corpus, args.workers)
+    }
+    if args.url:
+        results['http'] = bench_http(corpus, args.url, args.concurrency, args.rounds)
+
+    output = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    print(output)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            previous = json.load(f)
+        print('\n'.join(compare(previous, results)), file=sys.stderr)
+    return results
+
+
+if __name__ == '__main__':
+    main()
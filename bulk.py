@@ -0,0 +1,396 @@
+"""
+Validarea offline a unei arhive de fișe (un director cu mii de DOCX).
+
+Fișele din directorul dat (recursiv) sunt extrase și validate față de plan
+într-un pool de procese, în grupuri de câte `--chunksize` fișiere; fiecare
+proces încarcă planul o singură dată. Rezultatele sunt scrise pe măsură ce
+grupurile se termină, în JSONL (un rând per fișă, în formatul rezultatelor
+din /api/validate-batch) și opțional CSV.
+
+Un checkpoint SQLite reține, pentru fiecare fișier procesat, dimensiunea,
+mtime, SHA-256 și versiunile (extractor, reguli de validare, plan). La o
+rulare nouă (de exemplu după o întrerupere):
+- fișierele cu aceeași dimensiune și mtime nu mai sunt citite deloc;
+- cele cu mtime schimbat dar același conținut (hash) nu mai sunt parsate;
+- toate sunt reprocesate dacă s-a schimbat planul sau extractorul.
+Checkpoint-ul unui grup este salvat după ce rezultatele lui au fost scrise,
+deci după o întrerupere se pot repeta cel mult grupurile în lucru; pentru un
+fișier apărut de mai multe ori în JSONL, ultimul rând este cel valabil.
+
+Utilizare:
+    python bulk.py arhiva_fise/ --out rezultate.jsonl --csv rezultate.csv
+    python bulk.py arhiva_fise/ --out rezultate.jsonl --workers 8 --chunksize 16
+"""
+import argparse
+import csv
+import hashlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from app_logging import configure_logging
+from batch import BatchSummary
+from extractors import EXTRACTOR_VERSION, extract_fisa_disciplina
+from plan_store import PlanStore
+from serialization import dumps
+from uploads import UploadRejected, check_docx
+from validators import VALIDATION_VERSION, validate_fisa
+
+
+logger = logging.getLogger(__name__)
+
+# Coloanele fișierului CSV
+CSV_COLUMNS = (
+    'filename', 'status', 'cod', 'denumire', 'validare_status',
+    'total_verificari', 'succes', 'warning', 'erori', 'verificari_esuate', 'detail'
+)
+
+# O sarcină: (cale relativă, hash-ul din checkpoint sau None)
+Task = Tuple[str, Optional[str]]
+
+
+def find_documents(root: str) -> Iterator[str]:
+    """
+    Căile relative ale fișelor DOCX din director, recursiv, în ordine stabilă.
+
+    Fișierele temporare Word (~$...) și directoarele ascunse sunt ignorate.
+    """
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+        for name in sorted(filenames):
+            if name.lower().endswith('.docx') and not name.startswith('~$'):
+                yield os.path.relpath(os.path.join(dirpath, name), root)
+
+
+class Checkpoint:
+    """
+    Starea fișierelor deja procesate, într-o bază SQLite.
+    """
+
+    def __init__(self, db_path: str, versiune: str):
+        """
+        Args:
+            db_path: Calea bazei SQLite
+            versiune: Versiunea extractorului, a regulilor și a planului;
+                intrările cu altă versiune nu sunt folosite
+        """
+        self.versiune = versiune
+        self._db = sqlite3.connect(db_path)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS fisiere ('
+            'path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, sha256 TEXT, '
+            'versiune TEXT, status TEXT, processed REAL)'
+        )
+        self._entries: Dict[str, Tuple[int, int, str]] = {
+            path: (size, mtime_ns, sha256)
+            for path, size, mtime_ns, sha256 in self._db.execute(
+                'SELECT path, size, mtime_ns, sha256 FROM fisiere WHERE versiune = ?', (versiune,)
+            )
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, path: str, size: int, mtime_ns: int) -> Tuple[bool, Optional[str]]:
+        """
+        Returns:
+            Tuplu (neschimbat, hash cunoscut): neschimbat dacă dimensiunea și
+            mtime sunt cele din checkpoint; altfel hash-ul din checkpoint
+            (dacă există), pentru a evita parsarea unui conținut identic
+        """
+        entry = self._entries.get(path)
+        if entry is None:
+            return False, None
+        if entry[0] == size and entry[1] == mtime_ns:
+            return True, entry[2]
+        return False, entry[2]
+
+    def save(self, records: List[Dict[str, Any]]) -> None:
+        """Salvează (într-o singură tranzacție) starea fișierelor procesate."""
+        now = time.time()
+        with self._db:
+            self._db.executemany(
+                'INSERT OR REPLACE INTO fisiere VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(r['filename'], r['size'], r['mtime_ns'], r['sha256'], self.versiune, r['status'], now)
+                 for r in records]
+            )
+        for r in records:
+            self._entries[r['filename']] = (r['size'], r['mtime_ns'], r['sha256'])
+
+    def close(self) -> None:
+        self._db.close()
+
+
+# -- Worker ------------------------------------------------------------------
+
+_worker_root: Optional[str] = None
+_worker_store: Optional[PlanStore] = None
+
+
+def _init_worker(root: str, plan_path: str) -> None:
+    """Inițializarea unui proces din pool: logging-ul și planul, o singură dată."""
+    global _worker_root, _worker_store
+    configure_logging()
+    _worker_root = root
+    _worker_store = PlanStore.from_file(plan_path)
+
+
+def process_file(root: str, path: str, known_hash: Optional[str], store: PlanStore) -> Dict[str, Any]:
+    """
+    Extrage și validează o fișă.
+
+    Args:
+        root: Directorul arhivei
+        path: Calea relativă a fișei
+        known_hash: Hash-ul din checkpoint; dacă este același, fișa nu mai
+            este parsată (status 'neschimbat')
+        store: Planul de învățământ
+
+    Returns:
+        Rezultatul, cu cheile filename, status ('success', 'error' sau
+        'neschimbat'), validare/detail și metadatele pentru checkpoint
+    """
+    full_path = os.path.join(root, path)
+    start = time.perf_counter()
+    try:
+        with open(full_path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            content = f.read()
+    except OSError as e:
+        return {'filename': path, 'status': 'error', 'detail': f"Fișierul nu poate fi citit: {e}",
+                'size': None, 'mtime_ns': None, 'sha256': None}
+
+    record: Dict[str, Any] = {
+        'filename': path,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': hashlib.sha256(content).hexdigest()
+    }
+    if record['sha256'] == known_hash:
+        record['status'] = 'neschimbat'
+        return record
+
+    try:
+        check_docx(io.BytesIO(content))
+        fisa_data = extract_fisa_disciplina(content)
+        record['status'] = 'success'
+        record['validare'] = validate_fisa(fisa_data, store)
+    except UploadRejected as e:
+        record['status'] = 'error'
+        record['detail'] = str(e)
+    except Exception as e:
+        logger.warning("Eroare la validarea unei fișe din arhivă: %s", e, extra={"fisier": path})
+        record['status'] = 'error'
+        record['detail'] = f"Eroare la procesare: {str(e)}"
+    record['durata_ms'] = round((time.perf_counter() - start) * 1000, 2)
+    return record
+
+
+def _process_chunk(tasks: List[Task]) -> List[Dict[str, Any]]:
+    return [process_file(_worker_root, path, known_hash, _worker_store) for path, known_hash in tasks]
+
+
+# -- Ieșire ------------------------------------------------------------------
+
+def csv_row(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Rândul CSV al unui rezultat."""
+    row = {'filename': record['filename'], 'status': record['status'], 'detail': record.get('detail')}
+    validare = record.get('validare')
+    if validare:
+        statistici = validare.get('statistici') or {}
+        row.update({
+            'cod': validare.get('cod'),
+            'denumire': validare.get('denumire'),
+            'validare_status': validare['status'],
+            'total_verificari': statistici.get('total_verificari'),
+            'succes': statistici.get('succes'),
+            'warning': statistici.get('warning'),
+            'erori': statistici.get('erori'),
+            'verificari_esuate': ';'.join(
+                nume for grup in (validare['validari'] or {}).values()
+                for nume, v in grup.items() if v['status'] != 'ok'
+            ),
+            'detail': validare.get('mesaj') or record.get('detail')
+        })
+    return row
+
+
+class ResultWriter:
+    """
+    Scrie rezultatele în JSONL (și opțional CSV), în mod append.
+    """
+
+    def __init__(self, jsonl_path: str, csv_path: Optional[str] = None):
+        self._jsonl = open(jsonl_path, 'a', encoding='utf-8')
+        self._csv_file = None
+        self._csv = None
+        if csv_path:
+            new_file = not os.path.exists(csv_path) or os.path.getsize(csv_path) == 0
+            self._csv_file = open(csv_path, 'a', encoding='utf-8', newline='')
+            self._csv = csv.DictWriter(self._csv_file, fieldnames=CSV_COLUMNS)
+            if new_file:
+                self._csv.writeheader()
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        """Scrie rezultatele și le forțează pe disc (înaintea checkpoint-ului)."""
+        for record in records:
+            self._jsonl.write(dumps(record).decode('utf-8') + '\n')
+            if self._csv is not None:
+                self._csv.writerow(csv_row(record))
+        self._jsonl.flush()
+        os.fsync(self._jsonl.fileno())
+        if self._csv_file is not None:
+            self._csv_file.flush()
+            os.fsync(self._csv_file.fileno())
+
+    def close(self) -> None:
+        self._jsonl.close()
+        if self._csv_file is not None:
+            self._csv_file.close()
+
+
+# -- Rulare ------------------------------------------------------------------
+
+def plan_tasks(root: str, checkpoint: Optional[Checkpoint]) -> Tuple[List[Task], int]:
+    """
+    Fișele de procesat și numărul celor sărite (neschimbate după checkpoint).
+    """
+    tasks: List[Task] = []
+    skipped = 0
+    for path in find_documents(root):
+        if checkpoint is None:
+            tasks.append((path, None))
+            continue
+        stat = os.stat(os.path.join(root, path))
+        unchanged, known_hash = checkpoint.lookup(path, stat.st_size, stat.st_mtime_ns)
+        if unchanged:
+            skipped += 1
+        else:
+            tasks.append((path, known_hash))
+    return tasks, skipped
+
+
+def run(
+    root: str,
+    plan_path: str,
+    out_path: str,
+    csv_path: Optional[str] = None,
+    checkpoint_path: Optional[str] = None,
+    workers: Optional[int] = None,
+    chunksize: int = 8,
+    progress: bool = True
+) -> Dict[str, Any]:
+    """
+    Validează toate fișele din director.
+
+    Args:
+        root: Directorul arhivei
+        plan_path: Fișierul JSON cu planul
+        out_path: Fișierul JSONL cu rezultatele (completat, nu suprascris)
+        csv_path: Fișierul CSV cu rezultatele (opțional)
+        checkpoint_path: Baza SQLite a checkpoint-ului (None = fără reluare)
+        workers: Numărul de procese (implicit numărul de nuclee)
+        chunksize: Fișe trimise unui proces într-o singură sarcină
+        progress: Afișează progresul pe stderr
+
+    Returns:
+        Sumarul rulării: fișe procesate, sărite, neschimbate, durata și
+        sumarul agregat al rezultatelor (vezi `BatchSummary`)
+    """
+    start = time.perf_counter()
+    store = PlanStore.from_file(plan_path)
+    versiune = f'{EXTRACTOR_VERSION}:{VALIDATION_VERSION}:{store.version}'
+    checkpoint = Checkpoint(checkpoint_path, versiune) if checkpoint_path else None
+    tasks, skipped = plan_tasks(root, checkpoint)
+    chunks = [tasks[i:i + chunksize] for i in range(0, len(tasks), chunksize)]
+    workers = workers or os.cpu_count() or 1
+
+    summary = BatchSummary()
+    unchanged = 0
+    done_files = 0
+    writer = ResultWriter(out_path, csv_path)
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+        initargs=(root, plan_path)
+    )
+    try:
+        pending: Set[Future] = set()
+        next_chunk = 0
+        while next_chunk < len(chunks) or pending:
+            # Cel mult două grupuri per proces în așteptare: rezultatele sunt
+            # scrise pe măsură ce se termină, iar memoria rămâne limitată
+            while next_chunk < len(chunks) and len(pending) < workers * 2:
+                pending.add(pool.submit(_process_chunk, chunks[next_chunk]))
+                next_chunk += 1
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                records = future.result()
+                results = [r for r in records if r['status'] != 'neschimbat']
+                writer.write(results)
+                for record in results:
+                    summary.add(record)
+                unchanged += len(records) - len(results)
+                done_files += len(records)
+                if checkpoint is not None:
+                    checkpoint.save([r for r in records if r['sha256'] is not None])
+            if progress:
+                print(f"\r{done_files}/{len(tasks)} fișe procesate", end='', file=sys.stderr, flush=True)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        writer.close()
+        if checkpoint is not None:
+            checkpoint.close()
+        if progress and tasks:
+            print(file=sys.stderr)
+
+    return {
+        'procesate': done_files - unchanged,
+        'sarite': skipped,
+        'neschimbate': unchanged,
+        'durata_s': round(time.perf_counter() - start, 2),
+        'versiune': versiune,
+        'sumar': summary.to_dict()
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Validarea offline a unei arhive de fișe de disciplină')
+    parser.add_argument('root', help='Directorul cu fișe DOCX (parcurs recursiv)')
+    parser.add_argument('--plan', default='plan_invatamant.json', help='Planul de învățământ')
+    parser.add_argument('--out', default='rezultate.jsonl', help='Fișierul JSONL cu rezultatele')
+    parser.add_argument('--csv', help='Fișierul CSV cu rezultatele (opțional)')
+    parser.add_argument('--checkpoint', help='Baza SQLite a checkpoint-ului (implicit <out>.checkpoint)')
+    parser.add_argument('--no-checkpoint', action='store_true', help='Procesează toate fișele, fără checkpoint')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Numărul de procese')
+    parser.add_argument('--chunksize', type=int, default=8, help='Fișe per sarcină trimisă unui proces')
+    parser.add_argument('--quiet', action='store_true', help='Fără progres pe stderr')
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.root):
+        parser.error(f"Directorul nu există: {args.root}")
+    configure_logging()
+    checkpoint_path = None if args.no_checkpoint else (args.checkpoint or f'{args.out}.checkpoint')
+    try:
+        rezultat = run(
+            args.root, args.plan, args.out, args.csv, checkpoint_path,
+            workers=args.workers, chunksize=max(args.chunksize, 1), progress=not args.quiet
+        )
+    except KeyboardInterrupt:
+        print("Întrerupt; rularea poate fi reluată cu aceeași comandă", file=sys.stderr)
+        return 130
+    print(json.dumps(rezultat, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
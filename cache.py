@@ -0,0 +1,287 @@
+"""
+Modul pentru cache-ul rezultatelor de extragere și validare.
+
+Cheile sunt derivate din SHA-256-ul conținutului fișei, deci aceeași fișă
+reîncărcată (chiar sub alt nume) nu mai este parsată din nou:
+- nivelul 1: (hash conținut, versiune extractor) -> datele extrase
+- nivelul 2: (hash conținut, versiune extractor, versiune plan, cod selectat)
+  -> rezultatul validării
+
+Fiecare nivel este un LRU limitat în memorie, dublat opțional de o bază
+SQLite comună tuturor worker-ilor uvicorn (și worker-ului de job-uri).
+Variantele `*_async` ale metodelor rulează accesul la SQLite într-un thread
+separat, ca o bază blocată de alt proces să nu oprească event loop-ul; o
+eroare SQLite este tratată ca lipsă din cache.
+"""
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from extractors import EXTRACTOR_VERSION, FisaSource
+from serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+# Momentul accesării unei intrări SQLite este actualizat cel mult o dată la
+# atâtea secunde (altfel fiecare citire ar fi și o scriere)
+ACCESS_RESOLUTION = 60.0
+
+# Evacuarea LRU din SQLite rulează o dată la atâtea inserări per nivel
+EVICT_EVERY = 64
+
+
+def source_hash(source: FisaSource) -> str:
+    """
+    SHA-256 al conținutului unei fișe (bytes, obiect fișier sau cale).
+
+    Pentru obiectele fișier, poziția este readusă la început după citire.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(source).hexdigest()
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+    source.seek(0)
+    digest = hashlib.file_digest(source, 'sha256').hexdigest()
+    source.seek(0)
+    return digest
+
+
+class _LRU:
+    """LRU limitat ca număr de intrări."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def discard_if(self, predicate) -> None:
+        for key in [k for k in self._data if predicate(k)]:
+            del self._data[key]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class ResultCache:
+    """
+    Cache pe două niveluri pentru extragere și validare.
+
+    Valorile returnate sunt partajate între cereri și trebuie tratate ca
+    read-only.
+    """
+
+    def __init__(self, max_entries: int = 1024, db_path: Optional[str] = None):
+        """
+        Args:
+            max_entries: Numărul maxim de intrări per nivel (memorie și SQLite)
+            db_path: Calea bazei SQLite comune worker-ilor (None = doar memorie)
+        """
+        self.max_entries = max_entries
+        self._extract = _LRU(max_entries)
+        self._validation = _LRU(max_entries)
+        self._lock = threading.Lock()
+        self._stats = {
+            'extract': {'hits': 0, 'misses': 0},
+            'validation': {'hits': 0, 'misses': 0}
+        }
+        self._puts = {'extract_cache': 0, 'validation_cache': 0}
+
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS extract_cache ('
+                'key TEXT PRIMARY KEY, extractor_version TEXT, value TEXT, accessed REAL)'
+            )
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS validation_cache ('
+                'key TEXT PRIMARY KEY, extractor_version TEXT, plan_version TEXT, value TEXT, accessed REAL)'
+            )
+            # Pentru evacuarea LRU (ordonare după momentul accesării)
+            self._db.execute('CREATE INDEX IF NOT EXISTS extract_cache_accessed ON extract_cache (accessed)')
+            self._db.execute('CREATE INDEX IF NOT EXISTS validation_cache_accessed ON validation_cache (accessed)')
+            # Intrările create de o altă versiune a extractorului nu mai sunt valide
+            self._db.execute('DELETE FROM extract_cache WHERE extractor_version != ?', (EXTRACTOR_VERSION,))
+            self._db.execute('DELETE FROM validation_cache WHERE extractor_version != ?', (EXTRACTOR_VERSION,))
+
+    # -- Chei ---------------------------------------------------------------
+
+    @staticmethod
+    def _extract_key(content_hash: str) -> str:
+        return f'{EXTRACTOR_VERSION}:{content_hash}'
+
+    @staticmethod
+    def _validation_key(content_hash: str, plan_version: str, cod_disciplina: Optional[str]) -> str:
+        return f'{EXTRACTOR_VERSION}:{content_hash}:{plan_version}:{cod_disciplina or ""}'
+
+    # -- SQLite -------------------------------------------------------------
+
+    def _db_get(self, table: str, key: str) -> Optional[Any]:
+        if self._db is None:
+            return None
+        try:
+            with self._lock:
+                row = self._db.execute(f'SELECT value, accessed FROM {table} WHERE key = ?', (key,)).fetchone()
+                if row is None:
+                    return None
+                now = time.time()
+                if now - row[1] >= ACCESS_RESOLUTION:
+                    self._db.execute(f'UPDATE {table} SET accessed = ? WHERE key = ?', (now, key))
+        except sqlite3.Error as e:
+            logger.warning('Cache-ul SQLite nu poate fi citit: %s', e, extra={'table': table})
+            return None
+        return loads(row[0])
+
+    def _db_put(self, table: str, key: str, value: Any, plan_version: Optional[str] = None) -> None:
+        if self._db is None:
+            return
+        payload = dumps(value).decode('utf-8')
+        try:
+            with self._lock:
+                if table == 'validation_cache':
+                    self._db.execute(
+                        'INSERT OR REPLACE INTO validation_cache VALUES (?, ?, ?, ?, ?)',
+                        (key, EXTRACTOR_VERSION, plan_version, payload, time.time())
+                    )
+                else:
+                    self._db.execute(
+                        'INSERT OR REPLACE INTO extract_cache VALUES (?, ?, ?, ?)',
+                        (key, EXTRACTOR_VERSION, payload, time.time())
+                    )
+                # Evacuare LRU, o dată la EVICT_EVERY inserări: se păstrează cele
+                # mai recent accesate `max_entries` intrări
+                self._puts[table] += 1
+                if self._puts[table] % EVICT_EVERY == 0:
+                    self._db.execute(
+                        f'DELETE FROM {table} WHERE key IN ('
+                        f'SELECT key FROM {table} ORDER BY accessed DESC LIMIT -1 OFFSET ?)',
+                        (self.max_entries,)
+                    )
+        except sqlite3.Error as e:
+            logger.warning('Cache-ul SQLite nu poate fi scris: %s', e, extra={'table': table})
+
+    # -- API ----------------------------------------------------------------
+
+    def _get(self, level: str, lru: _LRU, table: str, key: str) -> Optional[Any]:
+        value = lru.get(key)
+        if value is None:
+            value = self._db_get(table, key)
+            if value is not None:
+                lru.put(key, value)
+        self._stats[level]['hits' if value is not None else 'misses'] += 1
+        return value
+
+    async def _get_async(self, level: str, lru: _LRU, table: str, key: str) -> Optional[Any]:
+        value = lru.get(key)
+        if value is None and self._db is not None:
+            value = await asyncio.to_thread(self._db_get, table, key)
+            if value is not None:
+                lru.put(key, value)
+        self._stats[level]['hits' if value is not None else 'misses'] += 1
+        return value
+
+    def get_extract(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Datele extrase pentru o fișă, sau None dacă nu sunt în cache."""
+        return self._get('extract', self._extract, 'extract_cache', self._extract_key(content_hash))
+
+    def put_extract(self, content_hash: str, fisa_data: Dict[str, Any]) -> None:
+        """Salvează datele extrase pentru o fișă."""
+        key = self._extract_key(content_hash)
+        self._extract.put(key, fisa_data)
+        self._db_put('extract_cache', key, fisa_data)
+
+    async def get_extract_async(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Varianta async a `get_extract`: doar citirea din SQLite rulează într-un thread separat."""
+        return await self._get_async('extract', self._extract, 'extract_cache', self._extract_key(content_hash))
+
+    async def put_extract_async(self, content_hash: str, fisa_data: Dict[str, Any]) -> None:
+        """Varianta async a `put_extract`: doar scrierea în SQLite rulează într-un thread separat."""
+        key = self._extract_key(content_hash)
+        self._extract.put(key, fisa_data)
+        if self._db is not None:
+            await asyncio.to_thread(self._db_put, 'extract_cache', key, fisa_data)
+
+    def get_validation(
+        self,
+        content_hash: str,
+        plan_version: str,
+        cod_disciplina: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Rezultatul validării pentru o fișă și o versiune a planului, sau None."""
+        key = self._validation_key(content_hash, plan_version, cod_disciplina)
+        return self._get('validation', self._validation, 'validation_cache', key)
+
+    def put_validation(
+        self,
+        content_hash: str,
+        plan_version: str,
+        cod_disciplina: Optional[str],
+        rezultat: Dict[str, Any]
+    ) -> None:
+        """Salvează rezultatul validării pentru o fișă și o versiune a planului."""
+        key = self._validation_key(content_hash, plan_version, cod_disciplina)
+        self._validation.put(key, rezultat)
+        self._db_put('validation_cache', key, rezultat, plan_version)
+
+    async def get_validation_async(
+        self,
+        content_hash: str,
+        plan_version: str,
+        cod_disciplina: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Varianta async a `get_validation`: doar citirea din SQLite rulează într-un thread separat."""
+        key = self._validation_key(content_hash, plan_version, cod_disciplina)
+        return await self._get_async('validation', self._validation, 'validation_cache', key)
+
+    async def put_validation_async(
+        self,
+        content_hash: str,
+        plan_version: str,
+        cod_disciplina: Optional[str],
+        rezultat: Dict[str, Any]
+    ) -> None:
+        """Varianta async a `put_validation`: doar scrierea în SQLite rulează într-un thread separat."""
+        key = self._validation_key(content_hash, plan_version, cod_disciplina)
+        self._validation.put(key, rezultat)
+        if self._db is not None:
+            await asyncio.to_thread(self._db_put, 'validation_cache', key, rezultat, plan_version)
+
+    def discard_plan(self, plan_version: str) -> None:
+        """
+        Elimină validările făcute față de o versiune înlocuită a unui plan.
+
+        Validările celorlalte planuri (alte programe de studii) rămân în cache.
+        """
+        self._validation.discard_if(lambda key: key.split(':')[2] == plan_version)
+        if self._db is not None:
+            try:
+                with self._lock:
+                    self._db.execute('DELETE FROM validation_cache WHERE plan_version = ?', (plan_version,))
+            except sqlite3.Error as e:
+                logger.warning('Cache-ul SQLite nu poate fi curățat: %s', e, extra={'plan_version': plan_version})
+
+    def stats(self) -> Dict[str, Any]:
+        """Contoarele de hit/miss și numărul de intrări din memorie."""
+        return {
+            'extract': {**self._stats['extract'], 'entries': len(self._extract)},
+            'validation': {**self._stats['validation'], 'entries': len(self._validation)}
+        }
@@ -0,0 +1,228 @@
+"""
+Modul pentru rularea extragerii și validării în afara event loop-ului.
+
+Parsarea DOCX este CPU-bound; rulată direct într-un handler `async def`
+blochează toate celelalte cereri ale worker-ului uvicorn (inclusiv /health).
+`JobExecutor` trimite aceste operații într-un pool de procese (sau de
+thread-uri), cu o coadă limitată și timeout per job.
+
+Un proces din pool care moare (OOM kill, segfault în lxml) strică tot
+`ProcessPoolExecutor`-ul; pool-ul este atunci înlocuit la următorul job, iar
+job-urile afectate primesc WorkerCrashedError (503 + Retry-After).
+"""
+import asyncio
+import multiprocessing
+import os
+import signal
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+
+EXECUTOR_KINDS = ('process', 'thread')
+
+
+class ExecutorSaturatedError(Exception):
+    """Coada pool-ului este plină; cererea trebuie reîncercată mai târziu."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Serverul este ocupat, reîncercați mai târziu")
+        self.retry_after = retry_after
+
+
+class JobTimeoutError(Exception):
+    """Job-ul nu s-a terminat în timpul alocat."""
+
+
+class WorkerCrashedError(Exception):
+    """Un proces din pool a murit; pool-ul a fost recreat, cererea poate fi reîncercată."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Procesul de lucru s-a oprit neașteptat, reîncercați")
+        self.retry_after = retry_after
+
+
+def _run_with_deadline(deadline: float, fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Rulează `fn(*args)` într-un proces din pool, întrerupt după `deadline` secunde.
+
+    Alarma (SIGALRM) este tratată între instrucțiunile Python, deci un apel C
+    lung (ex. parsarea lxml a unui singur XML uriaș) este întrerupt abia după
+    ce se termină.
+    """
+    def expired(_signum, _frame):
+        raise JobTimeoutError(f"Procesarea a depășit {deadline:g} secunde")
+
+    previous = signal.signal(signal.SIGALRM, expired)
+    signal.setitimer(signal.ITIMER_REAL, deadline)
+    try:
+        return fn(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+class JobExecutor:
+    """
+    Pool de lucru cu coadă limitată și timeout per job.
+
+    Un loc în coadă este ocupat din momentul trimiterii job-ului până când
+    acesta se termină efectiv în pool (nu doar până la timeout), astfel încât
+    limita `max_pending` reflectă încărcarea reală a worker-ilor.
+    """
+
+    def __init__(
+        self,
+        kind: str = 'process',
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        timeout: float = 30.0,
+        retry_after: int = 5,
+        initializer: Optional[Callable[[], None]] = None
+    ):
+        """
+        Args:
+            kind: 'process' (folosește toate nucleele) sau 'thread'
+            max_workers: Numărul de worker-i (implicit numărul de nuclee)
+            max_pending: Numărul maxim de job-uri în lucru + în așteptare
+                (implicit de 4 ori numărul de worker-i)
+            timeout: Timpul maxim al unui job, în secunde. Pentru procese,
+                job-ul pornit este oprit în worker după acest timp (SIGALRM,
+                unde există); pentru thread-uri, doar așteptarea se oprește,
+                iar job-ul ocupă worker-ul până se termină
+            retry_after: Valoarea sugerată pentru header-ul Retry-After
+            initializer: Funcție apelată la pornirea fiecărui proces din pool
+                (ex. configurarea logging-ului)
+        """
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Tip de executor necunoscut: {kind}")
+
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.max_workers * 4
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.initializer = initializer
+
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._pool: Optional[Executor] = None
+        self.restarts = 0
+
+    @property
+    def shares_memory(self) -> bool:
+        """True dacă job-urile rulează în același proces (pot primi obiecte fișier)."""
+        return self.kind == 'thread'
+
+    @property
+    def pending(self) -> int:
+        """Numărul de job-uri în lucru sau în așteptare."""
+        return self._pending
+
+    def stats(self) -> Dict[str, Any]:
+        """Starea pool-ului, pentru /health."""
+        return {
+            'tip': self.kind,
+            'workeri': self.max_workers,
+            'in_lucru': self._pending,
+            'reporniri': self.restarts
+        }
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == 'process':
+                # 'spawn' evită fork-ul unui proces care are deja thread-uri active
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=self.initializer
+                )
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='fisa-worker'
+                )
+        return self._pool
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _discard_pool(self, pool: Executor) -> None:
+        """Renunță la un pool stricat; următorul job pornește unul nou."""
+        with self._lock:
+            if self._pool is not pool:
+                # Alt job a înlocuit deja pool-ul
+                return
+            self._pool = None
+            self.restarts += 1
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Rulează `fn(*args)` în pool și așteaptă rezultatul.
+
+        Raises:
+            ExecutorSaturatedError: dacă s-a atins limita `max_pending`
+            JobTimeoutError: dacă job-ul depășește `timeout`
+            WorkerCrashedError: dacă un proces din pool a murit în timpul job-ului
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise ExecutorSaturatedError(self.retry_after)
+            self._pending += 1
+
+        if self.kind == 'process' and hasattr(signal, 'SIGALRM'):
+            fn, args = _run_with_deadline, (self.timeout, fn, *args)
+
+        pool = self._get_pool()
+        try:
+            future = pool.submit(fn, *args)
+        except BrokenProcessPool:
+            self._release(None)
+            self._discard_pool(pool)
+            raise WorkerCrashedError(self.retry_after)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            # Un job încă în coadă este anulat; unul deja pornit este oprit în
+            # worker de `_run_with_deadline` (doar pentru procese)
+            future.cancel()
+            raise JobTimeoutError(f"Procesarea a depășit {self.timeout:g} secunde")
+        except BrokenProcessPool:
+            self._discard_pool(pool)
+            raise WorkerCrashedError(self.retry_after)
+
+    def shutdown(self) -> None:
+        """Oprește pool-ul (job-urile în curs sunt lăsate să se termine)."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+
+def executor_from_env(initializer: Optional[Callable[[], None]] = None) -> JobExecutor:
+    """
+    Construiește executorul din variabilele de mediu:
+    EXECUTOR_KIND, EXECUTOR_WORKERS, EXECUTOR_MAX_PENDING,
+    EXECUTOR_JOB_TIMEOUT, EXECUTOR_RETRY_AFTER.
+
+    EXECUTOR_JOB_TIMEOUT oprește job-ul pornit doar pentru EXECUTOR_KIND=process
+    (vezi `_run_with_deadline`); cu 'thread' oprește numai așteptarea.
+
+    Args:
+        initializer: Vezi `JobExecutor`
+    """
+    return JobExecutor(
+        kind=os.environ.get('EXECUTOR_KIND', 'process'),
+        max_workers=int(os.environ.get('EXECUTOR_WORKERS', 0)) or None,
+        max_pending=int(os.environ.get('EXECUTOR_MAX_PENDING', 0)) or None,
+        timeout=float(os.environ.get('EXECUTOR_JOB_TIMEOUT', 30)),
+        retry_after=int(os.environ.get('EXECUTOR_RETRY_AFTER', 5)),
+        initializer=initializer
+    )
@@ -1,24 +1,247 @@
 """
 Modul pentru extragerea datelor din fișa disciplinei în format DOCX.
 Folosește indexare directă pentru acces rapid la celule.
+
+Sunt disponibile două motoare de extragere:
+- 'docx': construiește documentul complet cu python-docx (implicit)
+- 'stream': parcurge incremental doar word/document.xml cu lxml și se oprește
+  după al treilea tabel, fără a construi obiectul Document
+
+Cu `fields` (ex. doar codul și denumirile) sunt extrase doar acele câmpuri,
+iar citirea documentului se oprește după ultimul tabel în care se află ele.
 """
-import re
+import io
+import logging
+import time
+import zipfile
 from docx import Document
-from typing import Dict, Optional
+from lxml import etree
+from typing import BinaryIO, Dict, List, Optional, Sequence, Union
+
+from app_logging import log_sampled
+from fisa_schema import DEFAULT_TEMPLATE, clean_text, project_template
+from layout import LAYOUT_EXTRA_TABLES, layout_resolver
+from models import FisaData
+
+
+# Sursa unei fișe: cale pe disc, conținutul în memorie sau un obiect fișier
+# (ex. SpooledTemporaryFile din upload-ul multipart)
+FisaSource = Union[str, bytes, bytearray, memoryview, BinaryIO]
+
 
+# Namespace-ul WordprocessingML și tag-urile folosite de motorul 'stream'
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
 
-def clean_text(text: str) -> str:
-    """Curăță textul de spații multiple și caractere speciale."""
-    text = text.strip()
-    text = re.sub(r'\s+', ' ', text)
-    return text
+_BODY = f'{{{W_NS}}}body'
+_TBL = f'{{{W_NS}}}tbl'
+_TR = f'{{{W_NS}}}tr'
+_TC = f'{{{W_NS}}}tc'
+_P = f'{{{W_NS}}}p'
+_R = f'{{{W_NS}}}r'
+_T = f'{{{W_NS}}}t'
+_TAB = f'{{{W_NS}}}tab'
+_BR = f'{{{W_NS}}}br'
+_CR = f'{{{W_NS}}}cr'
+_PTAB = f'{{{W_NS}}}ptab'
+_NO_BREAK_HYPHEN = f'{{{W_NS}}}noBreakHyphen'
+_HYPERLINK = f'{{{W_NS}}}hyperlink'
+_TC_PR = f'{{{W_NS}}}tcPr'
+_TR_PR = f'{{{W_NS}}}trPr'
+_GRID_SPAN = f'{{{W_NS}}}gridSpan'
+_GRID_BEFORE = f'{{{W_NS}}}gridBefore'
+_V_MERGE = f'{{{W_NS}}}vMerge'
+_VAL = f'{{{W_NS}}}val'
+_TYPE = f'{{{W_NS}}}type'
 
+# Fișa folosește doar primele trei tabele din corpul documentului
+# (pentru un șablon anume, vezi `CompiledTemplate.tables_needed`)
+TABLES_NEEDED = 3
 
-def extract_fisa_disciplina(file_path: str) -> Dict[str, any]:
+EXTRACTOR_ENGINES = ('docx', 'stream')
+
+# Versiunea extractorului; se incrementează la orice schimbare a datelor extrase
+# (invalidează rezultatele din cache)
+EXTRACTOR_VERSION = '1.3'
+
+logger = logging.getLogger(__name__)
+
+
+def _open_source(source: FisaSource) -> Union[str, BinaryIO]:
+    """
+    Normalizează sursa fișei la o cale sau un obiect fișier cu seek.
+
+    Conținutul în memorie este învelit într-un BytesIO, fără copiere pe disc.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+
+def _stream_tables(file_path: Union[str, BinaryIO], count: int = TABLES_NEEDED) -> List[etree._Element]:
+    """
+    Citește primele `count` tabele din corpul documentului, fără python-docx.
+
+    Parcurge incremental word/document.xml și se oprește imediat după
+    ultimul tabel necesar. Ca în python-docx, sunt numărate doar tabelele
+    aflate direct în w:body (nu și cele imbricate în celule).
+
+    Args:
+        file_path: Calea către fișierul DOCX sau un obiect fișier
+        count: Numărul de tabele de citit
+
+    Returns:
+        Lista elementelor w:tbl găsite (poate fi mai scurtă decât `count`)
+    """
+    tables = []
+    if count <= 0:
+        return tables
+    with zipfile.ZipFile(file_path) as archive:
+        with archive.open('word/document.xml') as xml:
+            for _, element in etree.iterparse(
+                xml, events=('end',), tag=(_P, _TBL), resolve_entities=False
+            ):
+                if element.getparent().tag != _BODY:
+                    continue
+                if element.tag == _TBL:
+                    tables.append(element)
+                    if len(tables) >= count:
+                        break
+                else:
+                    # Paragrafele din corp nu sunt necesare
+                    element.clear()
+    return tables
+
+
+def _xml_paragraph_text(p: etree._Element) -> str:
+    """Textul unui paragraf w:p, identic cu `Paragraph.text` din python-docx."""
+    parts = []
+    for child in p.iterchildren(_R, _HYPERLINK):
+        runs = (child,) if child.tag == _R else child.iterchildren(_R)
+        for run in runs:
+            for item in run.iterchildren(_T, _TAB, _BR, _CR, _PTAB, _NO_BREAK_HYPHEN):
+                tag = item.tag
+                if tag == _T:
+                    parts.append(item.text or '')
+                elif tag == _BR:
+                    if item.get(_TYPE, 'textWrapping') == 'textWrapping':
+                        parts.append('\n')
+                elif tag == _CR:
+                    parts.append('\n')
+                elif tag == _NO_BREAK_HYPHEN:
+                    parts.append('-')
+                else:
+                    parts.append('\t')
+    return ''.join(parts)
+
+
+def _xml_cell_text(tc: etree._Element) -> str:
+    """Textul unei celule w:tc, identic cu `_Cell.text` din python-docx."""
+    return '\n'.join(_xml_paragraph_text(p) for p in tc.iterchildren(_P))
+
+
+def _tc_props(tc: etree._Element) -> tuple:
+    """Returnează (gridSpan, vMerge) pentru o celulă w:tc."""
+    tc_pr = tc.find(_TC_PR)
+    if tc_pr is None:
+        return 1, None
+    grid_span = tc_pr.find(_GRID_SPAN)
+    v_merge = tc_pr.find(_V_MERGE)
+    span = int(grid_span.get(_VAL)) if grid_span is not None else 1
+    # <w:vMerge/> fără atribut înseamnă 'continue'
+    merge = v_merge.get(_VAL, 'continue') if v_merge is not None else None
+    return span, merge
+
+
+def _grid_before(tr: etree._Element) -> int:
+    """Numărul de coloane omise la începutul rândului (w:gridBefore)."""
+    tr_pr = tr.find(_TR_PR)
+    if tr_pr is None:
+        return 0
+    grid_before = tr_pr.find(_GRID_BEFORE)
+    return int(grid_before.get(_VAL)) if grid_before is not None else 0
+
+
+# Codurile elementelor care descriu structura unui tabel (vezi `_table_shape`)
+_SHAPE_CODES = {_TR: 'r', _TC: 'c', _GRID_SPAN: 's', _GRID_BEFORE: 'b', _V_MERGE: 'm'}
+
+
+def _table_shape(tbl: etree._Element) -> str:
+    """
+    Structura unui tabel, ca text compact: rândurile, celulele și
+    valorile gridBefore/gridSpan/vMerge, în ordinea din document.
+    """
+    return ''.join(
+        _SHAPE_CODES[element.tag] + (element.get(_VAL) or '')
+        for element in tbl.iter(*_SHAPE_CODES)
+    )
+
+
+class CellIndex:
+    """
+    Indexul celulelor unui tabel w:tbl, construit într-o singură trecere.
+
+    Rezolvă o singură dată îmbinările (gridSpan/vMerge) cu aceeași semantică
+    ca `_Row.cells` din python-docx: o celulă cu gridSpan=n apare de n ori,
+    iar o celulă care continuă o îmbinare verticală primește textul celulei
+    de început de deasupra. Căutările (rând, celulă) devin simple indexări.
+    """
+    __slots__ = ('_rows',)
+
+    def __init__(self, tbl: etree._Element):
+        rows = []
+        above = {}          # grid_offset -> (text, gridSpan) al celulei rădăcină din rândul anterior
+        for tr in tbl.iterchildren(_TR):
+            current = {}
+            cells = []
+            error = None
+            grid_offset = _grid_before(tr)
+            for tc in tr.iterchildren(_TC):
+                span, merge = _tc_props(tc)
+                if merge == 'continue':
+                    root = above.get(grid_offset)
+                    if root is None:
+                        # python-docx ridică eroarea doar la accesarea rândului
+                        error = error or ValueError(f"no `tc` element at grid_offset={grid_offset}")
+                    else:
+                        cells.extend([root[0]] * root[1])
+                else:
+                    root = (_xml_cell_text(tc), span)
+                    cells.extend([root[0]] * span)
+                current[grid_offset] = root
+                grid_offset += span
+            rows.append(error if error is not None else tuple(cells))
+            above = current
+        self._rows = rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def row(self, row_idx: int) -> tuple:
+        """Textele celulelor unui rând, ridicând aceleași erori ca python-docx."""
+        row = self._rows[row_idx]
+        if isinstance(row, Exception):
+            raise row
+        return row
+
+    def text(self, row_idx: int, cell_idx: int) -> str:
+        """Textul celulei (rând, celulă), ridicând IndexError ca python-docx."""
+        return self.row(row_idx)[cell_idx]
+
+
+def extract_fisa_disciplina(
+    source: FisaSource,
+    engine: str = 'docx',
+    template: str = DEFAULT_TEMPLATE,
+    detect_layout: bool = True,
+    timings: Optional[Dict[str, float]] = None,
+    fields: Optional[Sequence[str]] = None
+) -> FisaData:
     """
     Extrage datele din fișa disciplinei folosind indexare directă.
     
-    Structura fișei (indexare 0-based):
+    Pozițiile câmpurilor (tabel, rând, celulă) sunt definite declarativ,
+    per revizie a șablonului fișei, în `fisa_schema.FISA_TEMPLATES`.
+    Pentru șablonul implicit (indexare 0-based):
     - Tabel 1 (index 1): Date despre disciplină
       - Rând 0, Celula 4: Denumiri (română / engleză)
       - Rând 1, Celula 4: Cod disciplină
@@ -26,161 +249,133 @@ def extract_fisa_disciplina(file_path: str) -> Dict[str, any]:
       - Rând 4, Celula 6: Evaluare (E/V/C)
     
     - Tabel 2 (index 2): Ore pe săptămână și distribuție timp
+      - Rând 0, Celula 1: Total ore pe săptămână
       - Rând 0, Celula 4: Ore curs
       - Rând 0, Celula 8: Ore laborator
+      - Rând 1, Celula 1: Total ore din plan
       - Rând 3, Celula 12: Ore studiu manual
       - Rând 4, Celula 12: Ore documentare
       - Rând 5, Celula 12: Ore pregătire seminarii
       - Rând 6, Celula 12: Ore examinări
+      - Rând 8, Celula 1: Total ore studiu individual
+      - Rând 9, Celula 1: Total ore pe semestru
       - Rând 10, Celula 1: Număr credite
     
     Args:
-        file_path: Calea către fișierul DOCX
+        source: Calea către fișierul DOCX, conținutul lui (bytes) sau un
+            obiect fișier deschis în mod binar
+        engine: Motorul de extragere ('docx' sau 'stream'); ambele
+            returnează exact același dicționar
+        template: Șablonul fișei (vezi `fisa_schema.FISA_TEMPLATES`)
+        detect_layout: Regăsește tabelele și rândurile deplasate după
+            etichete (vezi layout.py); False folosește pozițiile din schemă
+        timings: Dacă este dat, primește duratele etapelor în secunde:
+            'parse' (citirea tabelelor) și 'cells' (extragerea câmpurilor)
+        fields: Câmpurile de extras (vezi `fisa_schema.FISA_FIELDS`; implicit
+            toate). Rezultatul conține doar aceste câmpuri, iar tabelele sunt
+            citite incremental, ca la motorul 'stream', până la ultimul tabel
+            necesar (python-docx ar parsa tot documentul)
         
     Returns:
         Dicționar cu datele extrase
     """
-    doc = Document(file_path)
+    start = time.perf_counter()
+    if engine not in EXTRACTOR_ENGINES:
+        raise ValueError(f"Motor de extragere necunoscut: {engine}")
+    file_path = _open_source(source)
+    if engine == 'docx' and fields is None:
+        tables = [table._tbl for table in Document(file_path).tables]
+    else:
+        tables = _stream_tables(file_path, tables_needed(template, detect_layout, fields))
+    parsed = time.perf_counter()
     
-    result = {
-        'cod': None,
-        'denumire_ro': None,
-        'denumire_en': None,
-        'categoria': None,
-        'credite': None,
-        'nr_ore_saptamana_total': None,
-        'nr_ore_saptamana': {
-            'curs': 0,
-            'seminar': 0,
-            'proiect': 0,
-            'lucrari': 0
-        },
-        'total_ore_plan': None,
-        'distributie_fond_timp': {
-            'studiu_manual': 0,
-            'documentare': 0,
-            'pregatire_seminarii': 0,
-            'examinari': 0
-        },
-        'total_ore_studiu_individual': None,
-        'total_ore_semestru': None,
-        'evaluare': None
-    }
+    result = extract_from_tables(tables, template, detect_layout, fields)
+    done = time.perf_counter()
+    if timings is not None:
+        timings['parse'] = parsed - start
+        timings['cells'] = done - parsed
+    log_sampled(
+        logger, logging.DEBUG, 'Fișă extrasă',
+        engine=engine, template=template, tabele=len(tables), campuri=len(result),
+        parse_ms=round((parsed - start) * 1000, 2), cells_ms=round((done - parsed) * 1000, 2)
+    )
+    return result
+
+
+def tables_needed(
+    template: str = DEFAULT_TEMPLATE,
+    detect_layout: bool = True,
+    fields: Optional[Sequence[str]] = None
+) -> int:
+    """Numărul de tabele din corpul documentului citite pentru un șablon (și câmpurile date)."""
+    # Cu detectarea layout-ului sunt citite și câteva tabele în plus
+    return project_template(template, fields).tables_needed + (LAYOUT_EXTRA_TABLES if detect_layout else 0)
+
+
+def extract_from_tables(
+    tables: List[etree._Element],
+    template: str = DEFAULT_TEMPLATE,
+    detect_layout: bool = True,
+    fields: Optional[Sequence[str]] = None
+) -> FisaData:
+    """
+    Extrage câmpurile fișei din tabelele (w:tbl) deja citite ale documentului.
     
-    try:
-        # Tabelul 2 (index 1) - Date despre disciplină
-        table_disciplina = doc.tables[1]
-        
-        # Denumiri - Rând 0, Celula 4
-        denumiri_text = clean_text(table_disciplina.rows[0].cells[4].text)
-        if '/' in denumiri_text:
-            parts = denumiri_text.split('/')
-            result['denumire_ro'] = clean_text(parts[0])
-            result['denumire_en'] = clean_text(parts[1]) if len(parts) > 1 else None
-        
-        # Cod - Rând 1, Celula 4
-        cod_text = clean_text(table_disciplina.rows[1].cells[4].text)
-        match = re.search(r'([A-Z]{2}\.[A-Z]{2}\.\d{3})', cod_text)
-        if match:
-            result['cod'] = match.group(1)
-        
-        # Categoria - Rând 1, Celula 8
-        categoria_text = clean_text(table_disciplina.rows[1].cells[8].text)
-        match = re.search(r'\b(DA|DOP|DOB|DFA)\b', categoria_text)
-        if match:
-            result['categoria'] = match.group(1)
-        
-        # Evaluare - Rând 4, Celula 6
-        evaluare_text = clean_text(table_disciplina.rows[4].cells[6].text)
-        match = re.search(r'\b([EVC])\b', evaluare_text)
-        if match:
-            result['evaluare'] = match.group(1)
-        
-        # Tabelul 3 (index 2) - Ore pe săptămână și totalizări
-        table_ore = doc.tables[2]
-        
-        # Total ore pe săptămână - Rând 0, Celula 1
-        total_ore_saptamana_text = clean_text(table_ore.rows[0].cells[1].text)
-        match = re.search(r'\b(\d+)\b', total_ore_saptamana_text)
-        if match:
-            result['nr_ore_saptamana_total'] = int(match.group(1))
-        
-        # Ore curs - Rând 0, Celula 4
-        ore_curs_text = clean_text(table_ore.rows[0].cells[4].text)
-        match = re.search(r'\b(\d+)\b', ore_curs_text)
-        if match:
-            result['nr_ore_saptamana']['curs'] = int(match.group(1))
-        
-        # Ore laborator - Rând 0, Celula 8
-        ore_lab_text = clean_text(table_ore.rows[0].cells[8].text)
-        match = re.search(r'\b(\d+)\b', ore_lab_text)
-        if match:
-            result['nr_ore_saptamana']['lucrari'] = int(match.group(1))
-        
-        # Seminar și proiect rămân 0 (nu sunt în structura actuală)
-        
-        # Total ore din planul de învățământ - Rând 1, Celula 1
-        total_ore_plan_text = clean_text(table_ore.rows[1].cells[1].text)
-        match = re.search(r'\b(\d+)\b', total_ore_plan_text)
-        if match:
-            result['total_ore_plan'] = int(match.group(1))
-        
-        # Credite - Rând 10, Celula 1
-        credite_text = clean_text(table_ore.rows[10].cells[1].text)
-        match = re.search(r'\b(\d+)\b', credite_text)
-        if match:
-            result['credite'] = int(match.group(1))
-        
-        # Distribuția fondului de timp - Rândurile 3-6, Celula 12
-        # Studiul după manual - Rând 3, Celula 12
-        studiu_text = clean_text(table_ore.rows[3].cells[12].text)
-        match = re.search(r'\b(\d+)\b', studiu_text)
-        if match:
-            result['distributie_fond_timp']['studiu_manual'] = int(match.group(1))
-        
-        # Documentare - Rând 4, Celula 12
-        doc_text = clean_text(table_ore.rows[4].cells[12].text)
-        match = re.search(r'\b(\d+)\b', doc_text)
-        if match:
-            result['distributie_fond_timp']['documentare'] = int(match.group(1))
-        
-        # Pregătire seminarii - Rând 5, Celula 12
-        prep_text = clean_text(table_ore.rows[5].cells[12].text)
-        match = re.search(r'\b(\d+)\b', prep_text)
-        if match:
-            result['distributie_fond_timp']['pregatire_seminarii'] = int(match.group(1))
-        
-        # Examinări - Rând 6, Celula 12
-        exam_text = clean_text(table_ore.rows[6].cells[12].text)
-        match = re.search(r'\b(\d+)\b', exam_text)
-        if match:
-            result['distributie_fond_timp']['examinari'] = int(match.group(1))
-        
-        # Total ore studiu individual - Rând 8, Celula 1
-        total_studiu_text = clean_text(table_ore.rows[8].cells[1].text)
-        match = re.search(r'\b(\d+)\b', total_studiu_text)
-        if match:
-            result['total_ore_studiu_individual'] = int(match.group(1))
+    Args:
+        tables: Tabelele din corpul documentului, în ordine
+        template: Șablonul fișei (vezi `fisa_schema.FISA_TEMPLATES`)
+        detect_layout: Vezi `extract_fisa_disciplina`
+        fields: Câmpurile de extras (implicit toate)
         
-        # Total ore pe semestru - Rând 9, Celula 1
-        total_semestru_text = clean_text(table_ore.rows[9].cells[1].text)
-        match = re.search(r'\b(\d+)\b', total_semestru_text)
-        if match:
-            result['total_ore_semestru'] = int(match.group(1))
+    Returns:
+        Dicționar cu datele extrase
+    """
+    schema = project_template(template, fields)
+    
+    # Indexul celulelor se construiește o singură dată per tabel, la prima accesare
+    indexes = {}
+    
+    def index_of(table_idx: int) -> CellIndex:
+        index = indexes.get(table_idx)
+        if index is None:
+            index = indexes[table_idx] = CellIndex(tables[table_idx])
+        return index
+    
+    fields = schema.fields
+    if detect_layout:
+        # Amprenta ia în calcul aceleași tabele indiferent de motor
+        shapes = [_table_shape(tbl) for tbl in tables[:schema.tables_needed + LAYOUT_EXTRA_TABLES]]
+        fields = layout_resolver.fields_for(schema, shapes, index_of)
+    
+    result = schema.new_result()
+    
+    try:
+        for table_idx, row_idx, cell_idx, apply in fields:
+            apply(index_of(table_idx).text(row_idx, cell_idx), result)
         
     except IndexError as e:
-        print(f"Eroare la accesarea structurii: {e}")
+        # Câmpurile rămase păstrează valorile implicite (validarea le raportează)
+        logger.warning(
+            'Structura fișei nu corespunde șablonului: %s', e,
+            extra={'template': schema.name, 'tabel': table_idx, 'rand': row_idx, 'celula': cell_idx}
+        )
     
     return result
 
 if __name__ == '__main__':
     # Test pe fișa încărcată
     import json
+    import sys
     
-    fisa_path = '/mnt/user-data/uploads/IGIA202_Modelare_in__ingineria_geotehnica_Teodoru_2.docx'
+    fisa_path = sys.argv[1] if len(sys.argv) > 1 else '/mnt/user-data/uploads/IGIA202_Modelare_in__ingineria_geotehnica_Teodoru_2.docx'
     
     print("Extrag datele din fișa disciplinei...")
     date = extract_fisa_disciplina(fisa_path)
     
     print("\n=== DATE EXTRASE ===")
-    print(json.dumps(date, indent=2, ensure_ascii=False))
\ No newline at end of file
+    print(json.dumps(date, indent=2, ensure_ascii=False))
+    
+    # Verifică motorul 'stream' față de motorul python-docx
+    date_stream = extract_fisa_disciplina(fisa_path, engine='stream')
+    identic = json.dumps(date_stream, ensure_ascii=False) == json.dumps(date, ensure_ascii=False)
+    print(f"\nMotor 'stream' identic cu 'docx': {'DA' if identic else 'NU'}")
\ No newline at end of file
@@ -0,0 +1,347 @@
+"""
+Schema declarativă a câmpurilor din fișa disciplinei.
+
+Fiecare revizie a șablonului fișei are propria listă de câmpuri
+(tabel, rând, celulă -> câmp JSON, tip de conversie). La import, schemele
+sunt compilate o singură dată într-o listă plată de extractori, cu
+expresiile regulate deja compilate; extragerea unei fișe doar parcurge
+această listă.
+
+Pentru un șablon nou se adaugă o intrare în `FISA_TEMPLATES` (sau se
+apelează `register_template`); formatul rezultatului rămâne același.
+
+Când sunt necesare doar câteva câmpuri (ex. codul și denumirile, pentru
+identificarea disciplinei), `project_template` dă o proiecție a șablonului:
+doar extractorii acelor câmpuri și doar tabelele în care se află ele.
+"""
+import re
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from matching import fold_diacritics, normalize_name
+
+
+_WHITESPACE = re.compile(r'\s+')
+_INT = re.compile(r'\b(\d+)\b')
+
+
+def clean_text(text: str) -> str:
+    """Curăță textul de spații multiple și caractere speciale."""
+    return _WHITESPACE.sub(' ', text.strip())
+
+
+# Forma rezultatului extragerii (aceeași pentru toate șabloanele); câmpurile
+# negăsite în fișă păstrează aceste valori
+RESULT_DEFAULTS: Dict[str, Any] = {
+    'cod': None,
+    'denumire_ro': None,
+    'denumire_en': None,
+    'categoria': None,
+    'credite': None,
+    'nr_ore_saptamana_total': None,
+    'nr_ore_saptamana': {
+        'curs': 0,
+        'seminar': 0,
+        'proiect': 0,
+        'lucrari': 0
+    },
+    'total_ore_plan': None,
+    'distributie_fond_timp': {
+        'studiu_manual': 0,
+        'documentare': 0,
+        'pregatire_seminarii': 0,
+        'examinari': 0
+    },
+    'total_ore_studiu_individual': None,
+    'total_ore_semestru': None,
+    'evaluare': None
+}
+
+# Câmpurile (de nivel superior) ale rezultatului, care pot fi cerute separat
+FISA_FIELDS: Tuple[str, ...] = tuple(RESULT_DEFAULTS)
+
+# Câmpurile care identifică disciplina (pre-selectarea ei înainte de validare)
+IDENTIFICATION_FIELDS: Tuple[str, ...] = ('cod', 'denumire_ro', 'denumire_en')
+
+# Tipurile de câmp:
+# - 'int': primul număr întreg din celulă
+# - 'regex': primul grup al expresiei `regex`
+# - 'bilingv': "denumire română / denumire engleză", în două câmpuri
+#
+# Câmpurile sunt extrase în ordinea din listă; la prima celulă inexistentă
+# extragerea se oprește (câmpurile rămase au valorile implicite).
+#
+# Pentru detectarea layout-ului (vezi layout.py), `tabele` dă pentru fiecare
+# tabel folosit un text care îl identifică, iar `eticheta` unui câmp este
+# textul din rândul lui, aflat într-o celulă dinaintea celulei cu valoarea.
+# Comparația ignoră majusculele, spațiile multiple și diacriticele; o
+# etichetă dintr-un singur cuvânt trebuie să fie tot textul celulei (cel
+# mult precedat de un număr de secțiune, ex. "3.2 curs", sau de "...:").
+FISA_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    'fisa-2024': {
+        'descriere': 'Fișa disciplinei, formatul din 2024 (16 câmpuri)',
+        'tabele': {
+            1: 'Denumirea disciplinei',
+            2: 'Număr de ore pe săptămână'
+        },
+        'campuri': [
+            # Tabelul 2 (index 1) - Date despre disciplină
+            {'camp': ('denumire_ro', 'denumire_en'), 'tabel': 1, 'rand': 0, 'celula': 4, 'tip': 'bilingv',
+             'eticheta': 'Denumirea disciplinei'},
+            {'camp': 'cod', 'tabel': 1, 'rand': 1, 'celula': 4, 'tip': 'regex',
+             'regex': r'([A-Z]{2}\.[A-Z]{2}\.\d{3})', 'eticheta': 'Codul'},
+            {'camp': 'categoria', 'tabel': 1, 'rand': 1, 'celula': 8, 'tip': 'regex',
+             'regex': r'\b(DA|DOP|DOB|DFA)\b', 'eticheta': 'Categoria'},
+            {'camp': 'evaluare', 'tabel': 1, 'rand': 4, 'celula': 6, 'tip': 'regex',
+             'regex': r'\b([EVC])\b', 'eticheta': 'Tipul de evaluare'},
+
+            # Tabelul 3 (index 2) - Ore pe săptămână și totalizări
+            # (seminar și proiect nu apar în structura actuală și rămân 0)
+            {'camp': 'nr_ore_saptamana_total', 'tabel': 2, 'rand': 0, 'celula': 1, 'tip': 'int',
+             'eticheta': 'Număr de ore pe săptămână'},
+            {'camp': 'nr_ore_saptamana.curs', 'tabel': 2, 'rand': 0, 'celula': 4, 'tip': 'int',
+             'eticheta': 'curs'},
+            {'camp': 'nr_ore_saptamana.lucrari', 'tabel': 2, 'rand': 0, 'celula': 8, 'tip': 'int',
+             'eticheta': 'laborator'},
+            {'camp': 'total_ore_plan', 'tabel': 2, 'rand': 1, 'celula': 1, 'tip': 'int',
+             'eticheta': 'Total ore din planul de învățământ'},
+            {'camp': 'credite', 'tabel': 2, 'rand': 10, 'celula': 1, 'tip': 'int',
+             'eticheta': 'Numărul de credite'},
+            {'camp': 'distributie_fond_timp.studiu_manual', 'tabel': 2, 'rand': 3, 'celula': 12, 'tip': 'int',
+             'eticheta': 'Studiul după manual'},
+            {'camp': 'distributie_fond_timp.documentare', 'tabel': 2, 'rand': 4, 'celula': 12, 'tip': 'int',
+             'eticheta': 'Documentare'},
+            {'camp': 'distributie_fond_timp.pregatire_seminarii', 'tabel': 2, 'rand': 5, 'celula': 12, 'tip': 'int',
+             'eticheta': 'Pregătire seminarii'},
+            {'camp': 'distributie_fond_timp.examinari', 'tabel': 2, 'rand': 6, 'celula': 12, 'tip': 'int',
+             'eticheta': 'Examinări'},
+            {'camp': 'total_ore_studiu_individual', 'tabel': 2, 'rand': 8, 'celula': 1, 'tip': 'int',
+             'eticheta': 'Total ore studiu individual'},
+            {'camp': 'total_ore_semestru', 'tabel': 2, 'rand': 9, 'celula': 1, 'tip': 'int',
+             'eticheta': 'Total ore pe semestru'}
+        ]
+    }
+}
+
+DEFAULT_TEMPLATE = 'fisa-2024'
+
+
+def fold_label(text: str) -> str:
+    """Forma în care sunt comparate etichetele: normalizată și fără diacritice."""
+    return fold_diacritics(normalize_name(text))
+
+
+# Un extractor compilat: (tabel, rând, celulă, funcție(text_celulă, rezultat))
+FieldExtractor = Tuple[int, int, int, Callable[[str, Dict[str, Any]], None]]
+
+
+def _ignore(result: Dict[str, Any], value: Any) -> None:
+    pass
+
+
+def _setter(path: str, keys_out: Iterable[str] = FISA_FIELDS) -> Callable[[Dict[str, Any], Any], None]:
+    """
+    Funcția care scrie un câmp (eventual imbricat, ex. 'a.b') în rezultat.
+
+    Câmpurile din afara `keys_out` (necerute într-o proiecție) sunt ignorate.
+    """
+    keys = path.split('.')
+    node = RESULT_DEFAULTS
+    for key in keys:
+        if not isinstance(node, dict) or key not in node:
+            raise ValueError(f"Câmp necunoscut în schemă: {path}")
+        node = node[key]
+
+    if keys[0] not in keys_out:
+        return _ignore
+    if len(keys) == 1:
+        key = keys[0]
+
+        def set_value(result: Dict[str, Any], value: Any) -> None:
+            result[key] = value
+    else:
+        parent, key = keys[0], keys[1]
+
+        def set_value(result: Dict[str, Any], value: Any) -> None:
+            result[parent][key] = value
+    return set_value
+
+
+def _field_keys(spec: Dict[str, Any]) -> Tuple[str, ...]:
+    """Câmpurile de nivel superior ale rezultatului scrise de un extractor."""
+    paths = spec['camp'] if isinstance(spec['camp'], tuple) else (spec['camp'],)
+    return tuple(path.split('.')[0] for path in paths)
+
+
+def _compile_check(spec: Dict[str, Any]) -> Callable[[str], bool]:
+    """Funcția care spune dacă textul unei celule conține o valoare de tipul câmpului."""
+    tip = spec['tip']
+    if tip == 'bilingv':
+        return lambda text: '/' in text
+    search = _INT.search if tip == 'int' else re.compile(spec['regex']).search
+    return lambda text: search(clean_text(text)) is not None
+
+
+def _compile_field(spec: Dict[str, Any], keys_out: Iterable[str] = FISA_FIELDS) -> FieldExtractor:
+    tip = spec['tip']
+
+    if tip == 'bilingv':
+        set_ro, set_en = (_setter(path, keys_out) for path in spec['camp'])
+
+        def apply(text: str, result: Dict[str, Any]) -> None:
+            text = clean_text(text)
+            if '/' in text:
+                parts = text.split('/')
+                set_ro(result, clean_text(parts[0]))
+                set_en(result, clean_text(parts[1]) if len(parts) > 1 else None)
+
+    elif tip in ('int', 'regex'):
+        set_value = _setter(spec['camp'], keys_out)
+        search = _INT.search if tip == 'int' else re.compile(spec['regex']).search
+        convert = int if tip == 'int' else str
+
+        def apply(text: str, result: Dict[str, Any]) -> None:
+            match = search(clean_text(text))
+            if match:
+                set_value(result, convert(match.group(1)))
+
+    else:
+        raise ValueError(f"Tip de câmp necunoscut în schemă: {tip}")
+
+    return spec['tabel'], spec['rand'], spec['celula'], apply
+
+
+class CompiledTemplate:
+    """
+    Schema unui șablon de fișă, compilată într-o listă plată de extractori.
+    """
+
+    __slots__ = ('name', 'descriere', 'spec', 'keys', 'fields', 'labels', 'checks', 'anchors', 'tables_needed')
+
+    def __init__(self, name: str, spec: Dict[str, Any], keys: Iterable[str] = FISA_FIELDS):
+        """
+        Args:
+            name: Numele șablonului
+            spec: Schema declarativă (vezi `FISA_TEMPLATES`)
+            keys: Câmpurile rezultatului (implicit toate; vezi `project`)
+
+        Raises:
+            ValueError: dacă schema conține câmpuri sau tipuri necunoscute
+        """
+        self.name = name
+        self.descriere = spec.get('descriere', '')
+        self.spec = spec
+        self.keys = tuple(key for key in FISA_FIELDS if key in keys)
+        campuri = [field for field in spec['campuri'] if set(_field_keys(field)) & set(self.keys)]
+        self.fields: List[FieldExtractor] = [_compile_field(field, self.keys) for field in campuri]
+        # Etichetele normalizate ale câmpurilor și ale tabelelor, pentru layout.py
+        self.labels: List[Optional[str]] = [
+            fold_label(field['eticheta']) if field.get('eticheta') else None
+            for field in campuri
+        ]
+        # Dacă o celulă conține o valoare de tipul câmpului (vezi `_compile_check`)
+        self.checks: List[Callable[[str], bool]] = [_compile_check(field) for field in campuri]
+        tables_used = {table for table, _, _, _ in self.fields}
+        self.anchors: Dict[int, str] = {
+            table: fold_label(label) for table, label in spec.get('tabele', {}).items()
+            if table in tables_used
+        }
+        # Numărul de tabele din document de care are nevoie șablonul
+        self.tables_needed = max(tables_used, default=-1) + 1
+
+    def new_result(self) -> Dict[str, Any]:
+        """Un rezultat nou, cu valorile implicite."""
+        return {
+            key: dict(value) if isinstance(value, dict) else value
+            for key, value in RESULT_DEFAULTS.items() if key in self.keys
+        }
+
+    def project(self, keys: Iterable[str]) -> 'CompiledTemplate':
+        """
+        Proiecția șablonului pe câmpurile date: doar extractorii lor și doar
+        tabelele până la ultimul tabel folosit. Numele proiecției conține
+        câmpurile, deci layout-urile ei au propriile intrări în cache.
+
+        Raises:
+            ValueError: dacă un câmp nu există în rezultat
+        """
+        keys = frozenset(keys)
+        unknown = sorted(keys - set(FISA_FIELDS))
+        if unknown:
+            raise ValueError(f"Câmpuri necunoscute: {', '.join(unknown)}")
+        keys = tuple(key for key in FISA_FIELDS if key in keys)
+        return CompiledTemplate(f"{self.name}[{','.join(keys)}]", self.spec, keys)
+
+
+# Șabloanele compilate, o singură dată la import
+COMPILED_TEMPLATES: Dict[str, CompiledTemplate] = {
+    name: CompiledTemplate(name, spec) for name, spec in FISA_TEMPLATES.items()
+}
+
+
+# Proiecțiile deja compilate, după (șablon, câmpuri)
+_PROJECTIONS: Dict[Tuple[str, FrozenSet[str]], CompiledTemplate] = {}
+
+
+def register_template(name: str, spec: Dict[str, Any]) -> CompiledTemplate:
+    """Compilează și înregistrează schema unui șablon nou (sau o înlocuiește)."""
+    template = CompiledTemplate(name, spec)
+    FISA_TEMPLATES[name] = spec
+    COMPILED_TEMPLATES[name] = template
+    for key in [key for key in _PROJECTIONS if key[0] == name]:
+        del _PROJECTIONS[key]
+    return template
+
+
+def get_template(name: Optional[str] = None) -> CompiledTemplate:
+    """
+    Șablonul compilat cu numele dat (implicit `DEFAULT_TEMPLATE`).
+
+    Raises:
+        ValueError: dacă șablonul nu există
+    """
+    template = COMPILED_TEMPLATES.get(name or DEFAULT_TEMPLATE)
+    if template is None:
+        raise ValueError(f"Șablon de fișă necunoscut: {name}")
+    return template
+
+
+def project_template(name: Optional[str], fields: Optional[Iterable[str]]) -> CompiledTemplate:
+    """
+    Proiecția șablonului pe câmpurile date (compilată o singură dată), sau
+    șablonul complet dacă `fields` este None.
+
+    Raises:
+        ValueError: dacă șablonul sau un câmp nu există
+    """
+    template = get_template(name)
+    if fields is None:
+        return template
+    key = (template.name, frozenset(fields))
+    projection = _PROJECTIONS.get(key)
+    if projection is None:
+        projection = _PROJECTIONS[key] = template.project(key[1])
+    return projection
+
+
+def parse_fields(value: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Lista de câmpuri dintr-un parametru de tip "cod,denumire_ro" (None sau
+    șir gol: toate câmpurile).
+
+    Raises:
+        ValueError: dacă un câmp nu există în rezultat
+    """
+    if not value:
+        return None
+    fields = tuple(dict.fromkeys(part.strip() for part in value.split(',') if part.strip()))
+    unknown = [field for field in fields if field not in RESULT_DEFAULTS]
+    if unknown:
+        raise ValueError(f"Câmpuri necunoscute: {', '.join(unknown)}")
+    return fields or None
+
+
+def project_result(fisa_data: Dict[str, Any], fields: Optional[Iterable[str]]) -> Dict[str, Any]:
+    """Doar câmpurile date dintr-un rezultat complet (ex. luat din cache)."""
+    if fields is None:
+        return fisa_data
+    return {key: fisa_data[key] for key in FISA_FIELDS if key in fields}
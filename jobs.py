@@ -0,0 +1,606 @@
+"""
+Job-uri de validare asincrone, cu stare persistentă într-o bază SQLite locală.
+
+`POST /api/jobs` salvează fișele pe disc și returnează imediat ID-ul
+job-ului; clientul urmărește progresul cu `GET /api/jobs/{id}`, iar
+rezultatul rămâne disponibil după terminare (JOBS_TTL secunde). O conexiune
+HTTP întreruptă (ex. timeout-ul unui proxy) nu mai pierde munca.
+
+- Fișele sunt păstrate după SHA-256 (files/<hash>.docx), o singură dată
+  chiar dacă apar în mai multe job-uri, și șterse când niciun job
+  neterminat nu mai are nevoie de ele.
+- Un job identic (aceleași fișiere și conținut, același cod selectat, același
+  program de studii, aceeași versiune a planului și a regulilor) aflat în lucru sau terminat nu mai este
+  creat din nou: se returnează job-ul existent.
+- Job-urile sunt preluate atomic din baza SQLite, deci le pot procesa
+  `JobRunner`-ul din aplicație sau procese separate pe aceeași mașină
+  (`python jobs.py`), fără alt broker.
+- Un job preluat aparține runner-ului care l-a preluat (`owner`), care îl
+  menține activ printr-un heartbeat; un job rămas 'running' fără heartbeat
+  (worker oprit) este repus în coadă, iar scrierile vechiului runner sunt
+  respinse (JobLeaseLost), deci un job nu este procesat de doi runner-i.
+
+Configurare: JOBS_DIR (implicit 'jobs'), JOBS_TTL (secunde, implicit 24 h),
+JOBS_STALE_AFTER (implicit 600 s), JOBS_CONCURRENCY (job-uri procesate
+simultan de un runner, implicit 1).
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, BinaryIO, Callable, Dict, List, Optional, Tuple
+
+from batch import BatchSummary, validate_batch
+from serialization import dumps, loads
+
+
+logger = logging.getLogger(__name__)
+
+JOBS_DIR = os.environ.get('JOBS_DIR', 'jobs')
+JOBS_TTL = float(os.environ.get('JOBS_TTL', 24 * 3600))
+JOBS_STALE_AFTER = float(os.environ.get('JOBS_STALE_AFTER', 600))
+JOBS_CONCURRENCY = int(os.environ.get('JOBS_CONCURRENCY', 1))
+
+# Intervalul la care runner-ul confirmă că încă procesează un job preluat
+JOBS_HEARTBEAT_INTERVAL = JOBS_STALE_AFTER / 4
+
+# Intervalul dintre curățări (job-uri expirate, job-uri blocate)
+JOBS_CLEANUP_INTERVAL = 300.0
+
+# Status-urile unui job
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_ERROR = 'error'
+
+# Fișele scrise recent nu sunt șterse (job-ul care le folosește poate fi încă în creare)
+FILE_GRACE_PERIOD = 60.0
+
+# O fișă din job: (nume fișier, hash-ul fișei salvate cu `JobStore.save_file`,
+# eroare); hash-ul este None când există eroare
+JobDocument = Tuple[str, Optional[str], Optional[str]]
+
+# Dimensiunea bucăților în care sunt copiate fișele salvate
+FILE_CHUNK_SIZE = 1024 * 1024
+
+# Validarea unei fișe: primește conținutul, codul selectat manual, programul de
+# studii (None pentru planul implicit) și ID-ul job-ului
+JobValidator = Callable[[bytes, Optional[str], Optional[str], str], Awaitable[Dict[str, Any]]]
+
+
+class JobLeaseLost(Exception):
+    """Job-ul a fost repus în coadă (și eventual preluat de alt runner)."""
+
+
+class JobStore:
+    """
+    Job-urile, fișele și rezultatele lor, într-o bază SQLite și un director
+    cu fișele salvate după hash.
+    """
+
+    def __init__(self, directory: str = JOBS_DIR):
+        """
+        Args:
+            directory: Directorul bazei (jobs.sqlite) și al fișelor (files/)
+        """
+        self.files_dir = os.path.join(directory, 'files')
+        os.makedirs(self.files_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            os.path.join(directory, 'jobs.sqlite'), check_same_thread=False, isolation_level=None
+        )
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        # Mai multe procese (aplicația și worker-i separați) scriu în aceeași bază
+        self._db.execute('PRAGMA busy_timeout=5000')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS jobs ('
+            'id TEXT PRIMARY KEY, dedup_key TEXT, status TEXT, cod_disciplina TEXT, version TEXT, '
+            'total INTEGER, processed INTEGER, failed INTEGER, summary TEXT, error TEXT, '
+            'created REAL, updated REAL, program TEXT, owner TEXT)'
+        )
+        # Bazele create înainte de planurile per program (sau de heartbeat) nu
+        # au coloanele 'program' și 'owner'
+        columns = [row[1] for row in self._db.execute('PRAGMA table_info(jobs)')]
+        for column in ('program', 'owner'):
+            if column not in columns:
+                self._db.execute(f'ALTER TABLE jobs ADD COLUMN {column} TEXT')
+        self._db.execute('CREATE INDEX IF NOT EXISTS jobs_dedup ON jobs (dedup_key)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created)')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS job_files ('
+            'job_id TEXT, idx INTEGER, filename TEXT, sha256 TEXT, error TEXT, result TEXT, '
+            'PRIMARY KEY (job_id, idx))'
+        )
+
+    # -- Fișe ---------------------------------------------------------------
+
+    def file_path(self, sha256: str) -> str:
+        return os.path.join(self.files_dir, f'{sha256}.docx')
+
+    def read_file(self, sha256: str) -> bytes:
+        """Conținutul unei fișe salvate."""
+        with open(self.file_path(sha256), 'rb') as f:
+            return f.read()
+
+    def save_file(self, file: BinaryIO) -> str:
+        """
+        Salvează o fișă, copiată în bucăți (fără a o citi toată în memorie).
+
+        Args:
+            file: Fișa (obiect fișier binar cu seek), citită de la început
+
+        Returns:
+            Hash-ul SHA-256 al fișei, sub care este păstrată
+        """
+        # Scriere atomică: un worker nu citește niciodată o fișă incompletă
+        tmp_path = os.path.join(self.files_dir, f'{uuid.uuid4().hex}.tmp')
+        digest = hashlib.sha256()
+        try:
+            file.seek(0)
+            with open(tmp_path, 'wb') as f:
+                while chunk := file.read(FILE_CHUNK_SIZE):
+                    digest.update(chunk)
+                    f.write(chunk)
+            sha256 = digest.hexdigest()
+            path = self.file_path(sha256)
+            if os.path.exists(path):
+                try:
+                    # Fișa este folosită din nou: perioada de grație începe de acum
+                    os.utime(path)
+                    os.remove(tmp_path)
+                    return sha256
+                except FileNotFoundError:
+                    pass
+            os.replace(tmp_path, path)
+            return sha256
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            file.seek(0)
+
+    def _delete_unused_files(self) -> None:
+        """Șterge fișele de care nu mai are nevoie niciun job neterminat."""
+        with self._lock:
+            needed = {
+                row[0] for row in self._db.execute(
+                    'SELECT DISTINCT f.sha256 FROM job_files f JOIN jobs j ON j.id = f.job_id '
+                    'WHERE j.status IN (?, ?) AND f.sha256 IS NOT NULL',
+                    (JOB_QUEUED, JOB_RUNNING)
+                )
+            }
+        recent = time.time() - FILE_GRACE_PERIOD
+        for name in os.listdir(self.files_dir):
+            if not name.endswith('.docx') or name[:-len('.docx')] in needed:
+                continue
+            path = os.path.join(self.files_dir, name)
+            try:
+                if os.path.getmtime(path) < recent:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    # -- Creare și citire ---------------------------------------------------
+
+    @staticmethod
+    def dedup_key(
+        files: List[Tuple[str, Optional[str], Optional[str]]],
+        cod_disciplina: Optional[str],
+        version: str,
+        program: Optional[str] = None
+    ) -> str:
+        """Cheia de deduplicare: fișierele (nume, hash, eroare), codul selectat, programul și versiunea."""
+        payload = json.dumps([version, program, cod_disciplina, files], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def create(
+        self,
+        documents: List[JobDocument],
+        cod_disciplina: Optional[str],
+        version: str,
+        program: Optional[str] = None
+    ) -> Tuple[str, bool]:
+        """
+        Creează un job (sau îl găsește pe cel identic existent).
+
+        Args:
+            documents: Fișele job-ului, deja salvate (vezi `JobDocument`)
+            cod_disciplina: Codul selectat manual (opțional)
+            version: Versiunea planului și a regulilor de validare
+            program: Programul de studii (None pentru planul implicit)
+
+        Returns:
+            Tuplu (ID-ul job-ului, True dacă este un job existent)
+        """
+        files = list(documents)
+        key = self.dedup_key(files, cod_disciplina, version, program)
+        with self._lock:
+            row = self._db.execute(
+                'SELECT id FROM jobs WHERE dedup_key = ? AND status != ? ORDER BY created DESC LIMIT 1',
+                (key, JOB_ERROR)
+            ).fetchone()
+        if row is not None:
+            return row[0], True
+
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                self._db.execute(
+                    'INSERT INTO jobs (id, dedup_key, status, cod_disciplina, version, total, processed, failed, '
+                    'created, updated, program) VALUES (?, ?, ?, ?, ?, ?, 0, 0, ?, ?, ?)',
+                    (job_id, key, JOB_QUEUED, cod_disciplina, version, len(files), now, now, program)
+                )
+                self._db.executemany(
+                    'INSERT INTO job_files VALUES (?, ?, ?, ?, ?, NULL)',
+                    [(job_id, idx, filename, sha256, error) for idx, (filename, sha256, error) in enumerate(files)]
+                )
+                self._db.execute('COMMIT')
+            except Exception:
+                self._db.execute('ROLLBACK')
+                raise
+        return job_id, False
+
+    def get(self, job_id: str, with_results: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Starea unui job: status, progres și, după terminare, rezultatele
+        per fișă și sumarul.
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT status, cod_disciplina, program, total, processed, failed, summary, error, created, updated '
+                'FROM jobs WHERE id = ?', (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            status, cod_disciplina, program, total, processed, failed, summary, error, created, updated = row
+            results = None
+            if with_results and status == JOB_DONE:
+                results = [
+                    loads(result) for (result,) in self._db.execute(
+                        'SELECT result FROM job_files WHERE job_id = ? ORDER BY idx', (job_id,)
+                    )
+                ]
+        job = {
+            'job_id': job_id,
+            'status': status,
+            'cod_selectat_manual': cod_disciplina is not None,
+            'program': program,
+            'progres': {
+                'total': total,
+                'procesate': processed,
+                'esuate': failed,
+                'procent': round(processed / total * 100, 1) if total else 100.0
+            },
+            'creat': created,
+            'actualizat': updated
+        }
+        if status == JOB_DONE:
+            job['rezultate'] = results
+            job['sumar'] = loads(summary)
+        elif status == JOB_ERROR:
+            job['detail'] = error
+        return job
+
+    # -- Procesare ----------------------------------------------------------
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """
+        Preia atomic cel mai vechi job din coadă (sau None).
+
+        Returns:
+            Job-ul preluat: id, owner (token-ul cu care runner-ul scrie
+            progresul), cod_disciplina, program și fișele (idx, filename,
+            sha256, error)
+        """
+        owner = uuid.uuid4().hex
+        with self._lock:
+            row = self._db.execute(
+                'UPDATE jobs SET status = ?, owner = ?, processed = 0, failed = 0, updated = ? '
+                'WHERE id = (SELECT id FROM jobs WHERE status = ? ORDER BY created LIMIT 1) AND status = ? '
+                'RETURNING id, cod_disciplina, program',
+                (JOB_RUNNING, owner, time.time(), JOB_QUEUED, JOB_QUEUED)
+            ).fetchone()
+            if row is None:
+                return None
+            files = self._db.execute(
+                'SELECT idx, filename, sha256, error FROM job_files WHERE job_id = ? ORDER BY idx', (row[0],)
+            ).fetchall()
+        return {'id': row[0], 'owner': owner, 'cod_disciplina': row[1], 'program': row[2], 'files': files}
+
+    def _update_owned(self, job_id: str, owner: str, sql: str, params: Tuple[Any, ...]) -> bool:
+        """`UPDATE jobs SET <sql>` doar dacă job-ul este încă în lucru la runner-ul `owner`."""
+        cursor = self._db.execute(
+            f'UPDATE jobs SET {sql} WHERE id = ? AND owner = ? AND status = ?',
+            (*params, job_id, owner, JOB_RUNNING)
+        )
+        return cursor.rowcount > 0
+
+    def heartbeat(self, job_id: str, owner: str) -> bool:
+        """Confirmă că runner-ul încă procesează job-ul; False dacă l-a pierdut."""
+        with self._lock:
+            return self._update_owned(job_id, owner, 'updated = ?', (time.time(),))
+
+    def record_result(self, job_id: str, owner: str, item: Dict[str, Any]) -> None:
+        """
+        Salvează rezultatul unei fișe și actualizează progresul job-ului.
+
+        Raises:
+            JobLeaseLost: dacă job-ul nu mai aparține runner-ului `owner`
+        """
+        failed = 1 if item['status'] != 'success' else 0
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                if not self._update_owned(
+                    job_id, owner, 'processed = processed + 1, failed = failed + ?, updated = ?',
+                    (failed, time.time())
+                ):
+                    raise JobLeaseLost(job_id)
+                self._db.execute(
+                    'UPDATE job_files SET result = ? WHERE job_id = ? AND idx = ?',
+                    (dumps(item).decode('utf-8'), job_id, item['index'])
+                )
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+
+    def finish(self, job_id: str, owner: str, summary: Dict[str, Any]) -> None:
+        """
+        Marchează job-ul terminat, cu sumarul rezultatelor.
+
+        Raises:
+            JobLeaseLost: dacă job-ul nu mai aparține runner-ului `owner`
+        """
+        with self._lock:
+            owned = self._update_owned(
+                job_id, owner, 'status = ?, summary = ?, updated = ?',
+                (JOB_DONE, dumps(summary).decode('utf-8'), time.time())
+            )
+        if not owned:
+            raise JobLeaseLost(job_id)
+        self._delete_unused_files()
+
+    def fail(self, job_id: str, owner: str, error: str) -> None:
+        """Marchează job-ul eșuat (dacă încă aparține runner-ului `owner`)."""
+        with self._lock:
+            owned = self._update_owned(
+                job_id, owner, 'status = ?, error = ?, updated = ?', (JOB_ERROR, error, time.time())
+            )
+        if owned:
+            self._delete_unused_files()
+
+    # -- Întreținere --------------------------------------------------------
+
+    def requeue_stale(self, stale_after: float = JOBS_STALE_AFTER) -> int:
+        """
+        Repune în coadă job-urile 'running' fără heartbeat de `stale_after`
+        secunde (runner oprit); runner-ul vechi nu mai poate scrie în ele.
+        """
+        with self._lock:
+            cursor = self._db.execute(
+                'UPDATE jobs SET status = ?, owner = NULL WHERE status = ? AND updated < ?',
+                (JOB_QUEUED, JOB_RUNNING, time.time() - stale_after)
+            )
+        return cursor.rowcount
+
+    def cleanup(self, ttl: float = JOBS_TTL) -> int:
+        """Șterge job-urile terminate de mai mult de `ttl` secunde; returnează numărul lor."""
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                expired = [
+                    row[0] for row in self._db.execute(
+                        'SELECT id FROM jobs WHERE status IN (?, ?) AND updated < ?',
+                        (JOB_DONE, JOB_ERROR, time.time() - ttl)
+                    )
+                ]
+                self._db.executemany('DELETE FROM job_files WHERE job_id = ?', [(job_id,) for job_id in expired])
+                self._db.executemany('DELETE FROM jobs WHERE id = ?', [(job_id,) for job_id in expired])
+                self._db.execute('COMMIT')
+            except Exception:
+                self._db.execute('ROLLBACK')
+                raise
+        self._delete_unused_files()
+        return len(expired)
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class JobRunner:
+    """
+    Procesează job-urile din coadă, fișă cu fișă, cu progres salvat după
+    fiecare rezultat.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        validate: JobValidator,
+        window: int,
+        concurrency: int = JOBS_CONCURRENCY,
+        poll_interval: float = 1.0,
+        heartbeat_interval: float = JOBS_HEARTBEAT_INTERVAL
+    ):
+        """
+        Args:
+            store: Baza job-urilor
+            validate: Funcția async care validează o fișă (vezi `JobValidator`)
+            window: Numărul maxim de fișe ale unui job în lucru simultan
+            concurrency: Numărul de job-uri procesate simultan
+            poll_interval: Intervalul de verificare a cozii (job-urile create
+                de alte procese nu sunt anunțate prin `notify`)
+            heartbeat_interval: Intervalul la care un job în lucru este
+                confirmat (trebuie să fie mai mic decât JOBS_STALE_AFTER)
+        """
+        self.store = store
+        self.validate = validate
+        self.window = window
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self._wakeup = asyncio.Event()
+
+    def notify(self) -> None:
+        """Anunță un job nou creat în acest proces."""
+        self._wakeup.set()
+
+    async def _documents(self, job: Dict[str, Any]) -> AsyncIterator[Tuple[str, Any, Optional[str]]]:
+        for idx, filename, sha256, error in job['files']:
+            if error is not None:
+                yield filename, None, error
+                continue
+            try:
+                content = await asyncio.to_thread(self.store.read_file, sha256)
+            except OSError as e:
+                yield filename, None, f"Fișa nu mai este disponibilă: {str(e)}"
+                continue
+            yield filename, content, None
+
+    async def _heartbeat(self, job: Dict[str, Any]) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                if not await asyncio.to_thread(self.store.heartbeat, job['id'], job['owner']):
+                    return
+            except sqlite3.Error:
+                # Următorul heartbeat (sau rezultat) reîncearcă
+                logger.warning("Heartbeat eșuat", exc_info=True, extra={"job_id": job['id']})
+
+    async def process(self, job: Dict[str, Any]) -> None:
+        """
+        Validează fișele unui job preluat și salvează rezultatele.
+
+        Scrierile în baza SQLite (care pot aștepta după lock-ul altui proces)
+        și ștergerea fișelor rulează în thread-uri separate, nu în event loop.
+        Cât timp job-ul este în lucru, un heartbeat îl împiedică să fie
+        repus în coadă; dacă totuși a fost repus (JobLeaseLost), procesarea
+        se oprește fără să mai scrie nimic.
+        """
+        job_id, owner = job['id'], job['owner']
+        cod_disciplina = job['cod_disciplina']
+        program = job['program']
+
+        async def validate(source):
+            return await self.validate(source, cod_disciplina, program, job_id)
+
+        summary = BatchSummary()
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            async for item in validate_batch(self._documents(job), validate, self.window):
+                summary.add(item)
+                await asyncio.to_thread(self.store.record_result, job_id, owner, item)
+            await asyncio.to_thread(self.store.finish, job_id, owner, summary.to_dict())
+        except JobLeaseLost:
+            logger.warning("Job-ul a fost repus în coadă în timpul procesării", extra={"job_id": job_id})
+        except Exception as e:
+            logger.exception("Eroare la procesarea job-ului", extra={"job_id": job_id})
+            await asyncio.to_thread(self.store.fail, job_id, owner, f"Eroare la procesare: {str(e)}")
+        finally:
+            heartbeat.cancel()
+
+    async def _loop(self) -> None:
+        while True:
+            job = await asyncio.to_thread(self.store.claim)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self.process(job)
+
+    async def run(self) -> None:
+        """Procesează job-uri până la anulare."""
+        await asyncio.gather(*(self._loop() for _ in range(self.concurrency)))
+
+
+async def maintain(store: JobStore, ttl: float = JOBS_TTL, interval: float = JOBS_CLEANUP_INTERVAL) -> None:
+    """Curăță periodic job-urile expirate și repune în coadă job-urile blocate."""
+    while True:
+        try:
+            expired = await asyncio.to_thread(store.cleanup, ttl)
+            requeued = await asyncio.to_thread(store.requeue_stale)
+            if expired or requeued:
+                logger.info("Job-uri curățate", extra={"expirate": expired, "repuse_in_coada": requeued})
+        except Exception:
+            logger.exception("Eroare la curățarea job-urilor")
+        await asyncio.sleep(interval)
+
+
+if __name__ == '__main__':
+    # Worker separat (sidecar) pe aceeași mașină: python jobs.py
+    import argparse
+
+    from app_logging import configure_logging
+    from cache import ResultCache, source_hash
+    from executor import executor_from_env
+    from plan_registry import PlanRegistry
+    from tasks import extract_job, validate_extracted
+    from validators import VALIDATION_VERSION, validation_version
+
+    parser = argparse.ArgumentParser(description='Worker pentru job-urile de validare')
+    parser.add_argument('--plan', default='plan_invatamant.json', help='Planul de învățământ implicit')
+    parser.add_argument('--plans-dir', default=os.environ.get('PLANS_DIR', 'planuri'),
+                        help='Planurile per program de studii (PLANS_DIR)')
+    parser.add_argument('--snapshot-dir', default=os.environ.get('PLAN_SNAPSHOT_DIR', 'plan_snapshots'),
+                        help='Snapshot-urile compilate ale planurilor (PLAN_SNAPSHOT_DIR)')
+    parser.add_argument('--dir', default=JOBS_DIR, help='Directorul job-urilor (JOBS_DIR)')
+    args = parser.parse_args()
+
+    configure_logging()
+    plans = PlanRegistry(args.plans_dir, args.plan, args.snapshot_dir)
+    pool = executor_from_env(initializer=configure_logging)
+    job_store = JobStore(args.dir)
+    # Același motor de extragere și același cache ca aplicația (EXTRACTOR_ENGINE,
+    # RESULT_CACHE_*), deci rezultatele nu depind de cine procesează job-ul
+    engine = os.environ.get('EXTRACTOR_ENGINE', 'docx')
+    result_cache = ResultCache(
+        max_entries=int(os.environ.get('RESULT_CACHE_SIZE', 1024)),
+        db_path=os.environ.get('RESULT_CACHE_DB') or None
+    )
+
+    def on_plan_reload(program: Optional[str], old, store) -> None:
+        if old is not None:
+            result_cache.discard_plan(validation_version(old))
+
+    plans.on_reload(on_plan_reload)
+
+    async def validate_in_pool(
+        source: bytes, cod_disciplina: Optional[str], program: Optional[str], job_id: str
+    ) -> Dict[str, Any]:
+        plan_store = await plans.get_async(program)
+        content_hash = source_hash(source)
+        rezultat = await result_cache.get_validation_async(content_hash, validation_version(plan_store), cod_disciplina)
+        if rezultat is None:
+            fisa_data = await result_cache.get_extract_async(content_hash)
+            if fisa_data is None:
+                fisa_data, _ = await pool.run(extract_job, source, engine)
+                await result_cache.put_extract_async(content_hash, fisa_data)
+            rezultat = validate_extracted(fisa_data, plan_store, cod_disciplina)
+            await result_cache.put_validation_async(content_hash, validation_version(plan_store), cod_disciplina, rezultat)
+        return rezultat
+
+    async def main() -> None:
+        logger.info("Worker pornit", extra={"jobs_dir": args.dir, "validation_version": VALIDATION_VERSION})
+        runner = JobRunner(job_store, validate_in_pool, pool.max_workers)
+        await asyncio.gather(runner.run(), plans.watch(), maintain(job_store))
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.shutdown()
+        job_store.close()
@@ -0,0 +1,220 @@
+"""
+Modul pentru detectarea layout-ului unei fișe.
+
+Pozițiile din schema șablonului (fisa_schema.py) presupun structura
+standard a fișei; un rând sau un tabel în plus mută celulele și duce fie la
+IndexError, fie la citirea altei celule. `LayoutResolver` regăsește
+tabelele și rândurile după textul etichetelor (un câmp este mutat doar dacă
+poziția din schemă nu este plauzibilă și eticheta este găsită fără
+ambiguitate) și păstrează coordonatele rezolvate per amprentă structurală a
+documentului (număr de tabele, rânduri și gridSpan-urile celulelor). Documentele cu o amprentă deja întâlnită
+folosesc direct coordonatele din cache; doar layout-urile noi plătesc
+căutarea după etichete.
+"""
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Pattern, Sequence
+
+from fisa_schema import CompiledTemplate, FieldExtractor, fold_label
+
+
+# Tabele citite în plus față de cele cerute de șablon, pentru a regăsi
+# tabelele deplasate de un tabel suplimentar (inserat înaintea lor)
+LAYOUT_EXTRA_TABLES = 1
+
+# Numărul maxim de layout-uri (amprente) păstrate per proces
+LAYOUT_CACHE_SIZE = int(os.environ.get('LAYOUT_CACHE_SIZE', 256))
+
+
+def layout_fingerprint(shapes: Sequence[str]) -> str:
+    """
+    Amprenta structurală a unui document.
+
+    Args:
+        shapes: Structura fiecărui tabel (vezi `extractors._table_shape`)
+    """
+    return hashlib.blake2b('|'.join(shapes).encode(), digest_size=16).hexdigest()
+
+
+# Indexul celulelor unui tabel (extractors.CellIndex), după poziția tabelului
+IndexOf = Callable[[int], Any]
+
+
+@lru_cache(maxsize=None)
+def _label_pattern(label: str) -> Pattern[str]:
+    """
+    Expresia care regăsește o etichetă în textul (normalizat) al unei celule.
+
+    O etichetă din mai multe cuvinte este căutată oriunde în celulă, ca
+    text întreg (nu în interiorul altor cuvinte). O etichetă dintr-un singur
+    cuvânt ('curs', 'laborator') apare și în texte fără legătură ("suport de
+    curs"), deci trebuie să fie tot textul celulei, cel mult precedat de un
+    număr de secțiune ("3.2 curs") sau de un text încheiat cu ':' ("din
+    care: curs").
+    """
+    if ' ' in label:
+        return re.compile(rf'(?<!\w){re.escape(label)}(?!\w)')
+    return re.compile(rf'^(?:[^:]*:\s*)?(?:\d+(?:\.\d+)*\.?\s+)?{re.escape(label)}\s*:?$')
+
+
+def _has_label(texts: Iterable[str], label: str) -> bool:
+    search = _label_pattern(label).search
+    return any(search(fold_label(text)) for text in texts)
+
+
+def _row_has_label(index: Any, row_idx: int, cell_idx: int, label: str) -> bool:
+    """Dacă eticheta apare într-o celulă dinaintea celulei cu valoarea."""
+    try:
+        cells = index.row(row_idx)[:cell_idx]
+    except (IndexError, ValueError):
+        return False
+    return _has_label(dict.fromkeys(cells), label)
+
+
+def _table_has_label(index: Any, label: str) -> bool:
+    for row_idx in range(len(index)):
+        try:
+            cells = index.row(row_idx)
+        except ValueError:
+            continue
+        if _has_label(dict.fromkeys(cells), label):
+            return True
+    return False
+
+
+def _cell_parses(index: Any, row_idx: int, cell_idx: int, check: Callable[[str], bool]) -> bool:
+    """Dacă celula există și conține o valoare de tipul câmpului."""
+    try:
+        return check(index.text(row_idx, cell_idx))
+    except (IndexError, ValueError):
+        return False
+
+
+def _find_table(index_of: IndexOf, table_count: int, expected: int, label: str) -> int:
+    """Primul tabel care conține eticheta, începând cu cel din schemă."""
+    order = [expected] + [t for t in range(table_count) if t != expected]
+    for table_idx in order:
+        if table_idx < table_count and _table_has_label(index_of(table_idx), label):
+            return table_idx
+    return expected
+
+
+def _find_row(
+    index: Any,
+    expected: int,
+    cell_idx: int,
+    label: str,
+    check: Callable[[str], bool],
+    others: Sequence[str] = ()
+) -> int:
+    """
+    Rândul câmpului: cel din schemă, dacă este plauzibil, altfel singurul
+    rând care conține eticheta înaintea celulei cu valoarea.
+
+    Rândul din schemă este păstrat dacă celula lui conține o valoare de
+    tipul câmpului, cu excepția cazului în care rândul poartă eticheta altui
+    câmp citit din aceeași coloană (`others`): un rând inserat mai sus a
+    deplasat câmpurile. Un câmp este mutat doar dacă eticheta apare într-un
+    singur alt rând și celula de acolo conține o valoare de tipul câmpului;
+    altfel își păstrează poziția din schemă.
+    """
+    if _row_has_label(index, expected, cell_idx, label):
+        return expected
+    if _cell_parses(index, expected, cell_idx, check) and not any(
+        _row_has_label(index, expected, cell_idx, other) for other in others
+    ):
+        return expected
+
+    candidates = [
+        row_idx for row_idx in range(len(index))
+        if row_idx != expected and _row_has_label(index, row_idx, cell_idx, label)
+    ]
+    if len(candidates) == 1 and _cell_parses(index, candidates[0], cell_idx, check):
+        return candidates[0]
+    return expected
+
+
+def resolve_fields(schema: CompiledTemplate, index_of: IndexOf, table_count: int) -> List[FieldExtractor]:
+    """
+    Coordonatele câmpurilor șablonului în documentul dat.
+
+    Câmpurile (sau tabelele) a căror etichetă nu este găsită fără
+    ambiguitate își păstrează poziția din schemă, deci un document cu
+    structura standard dă exact coordonatele schemei.
+    """
+    tables: Dict[int, int] = {
+        table: _find_table(index_of, table_count, table, label)
+        for table, label in schema.anchors.items()
+    }
+
+    fields = []
+    for (table_idx, row_idx, cell_idx, apply), label, check in zip(schema.fields, schema.labels, schema.checks):
+        # Etichetele câmpurilor citite din aceeași coloană a tabelului, din alte rânduri
+        others = [
+            other for (t, r, c, _), other in zip(schema.fields, schema.labels)
+            if other and (t, c) == (table_idx, cell_idx) and r != row_idx
+        ]
+        table_idx = tables.get(table_idx, table_idx)
+        if label and table_idx < table_count:
+            row_idx = _find_row(index_of(table_idx), row_idx, cell_idx, label, check, others)
+        fields.append((table_idx, row_idx, cell_idx, apply))
+    return fields
+
+
+class LayoutResolver:
+    """
+    Cache LRU (per proces) al coordonatelor rezolvate, după amprenta documentului.
+    """
+
+    def __init__(self, max_entries: int = LAYOUT_CACHE_SIZE):
+        """
+        Args:
+            max_entries: Numărul maxim de layout-uri păstrate
+        """
+        self.max_entries = max_entries
+        self._layouts: 'OrderedDict[tuple, List[FieldExtractor]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def fields_for(
+        self,
+        schema: CompiledTemplate,
+        shapes: Sequence[str],
+        index_of: IndexOf
+    ) -> List[FieldExtractor]:
+        """
+        Coordonatele câmpurilor pentru un document, din cache sau prin căutare.
+
+        Args:
+            schema: Șablonul compilat
+            shapes: Structura tabelelor documentului (vezi `layout_fingerprint`)
+            index_of: Funcția care dă indexul celulelor unui tabel
+        """
+        key = (schema.name, layout_fingerprint(shapes))
+        with self._lock:
+            fields = self._layouts.get(key)
+            if fields is not None:
+                self._layouts.move_to_end(key)
+                self.hits += 1
+                return fields
+            self.misses += 1
+
+        fields = resolve_fields(schema, index_of, len(shapes))
+        with self._lock:
+            self._layouts[key] = fields
+            while len(self._layouts) > self.max_entries:
+                self._layouts.popitem(last=False)
+        return fields
+
+    def stats(self) -> Dict[str, int]:
+        """Contoarele de hit/miss și numărul de layout-uri cunoscute."""
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._layouts)}
+
+
+# Cache-ul folosit de `extract_fisa_disciplina`
+layout_resolver = LayoutResolver()
@@ -1,34 +1,329 @@
 """
 FastAPI application pentru verificarea fișelor de disciplină.
 """
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Header, Query
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.requests import Request
-import tempfile
+import asyncio
+import hashlib
+import logging
 import os
 import json
+import time
+from contextlib import contextmanager
+from functools import partial
 from pathlib import Path
+from typing import Callable, List, Optional, Sequence
 
-from extractors import extract_fisa_disciplina
-from validators import validate_fisa, load_plan_invatamant
+from app_logging import RequestIdMiddleware, configure_logging, get_request_id, shutdown_logging
+from batch import STREAM_FORMATS, BatchSummary, iter_batch_documents, stream_batch, validate_batch
+from cache import ResultCache, source_hash
+from executor import ExecutorSaturatedError, JobTimeoutError, WorkerCrashedError, executor_from_env
+from fisa_schema import parse_fields, project_result
+from jobs import JOB_DONE, JOB_ERROR, JobRunner, JobStore, maintain
+from metrics import MetricsMiddleware, mark_received, record_stage, record_upload, record_validation, render_metrics, stage
+from plan_registry import PlanRegistry, UnknownProgramError
+from precompressed import ResponseCache, precompressed_response
+from scheduler import BULK, INTERACTIVE, Scheduler
+from serialization import FastJSONResponse
+from tasks import extract_job, validate_extracted
+from uploads import (
+    BATCH_UPLOAD_MAX_BYTES, UPLOAD_MAX_BYTES, UploadLimitMiddleware, UploadRejected, check_docx
+)
+from validators import validation_version
+
+# Logging structurat, scris dintr-un thread separat (LOG_LEVEL, LOG_FORMAT, LOG_SAMPLE_RATE)
+configure_logging()
+logger = logging.getLogger(__name__)
 
 # Inițializare FastAPI
 app = FastAPI(
     title="Verificare Fișe Disciplină",
     description="Sistem automatizat pentru verificarea conformității fișelor de disciplină",
-    version="1.0.0"
+    version="1.0.0",
+    # Răspunsurile JSON sunt serializate cu orjson (vezi serialization.py)
+    default_response_class=FastJSONResponse
 )
 
+# Durata etapelor fiecărei cereri: metrici Prometheus (/metrics) și header Server-Timing
+app.add_middleware(MetricsMiddleware)
+# Dimensiunea maximă a upload-urilor, verificată pe măsură ce body-ul este citit
+app.add_middleware(UploadLimitMiddleware, limits={
+    "/api/extract": UPLOAD_MAX_BYTES,
+    "/api/validate": UPLOAD_MAX_BYTES,
+    "/api/validate/batch": BATCH_UPLOAD_MAX_BYTES,
+    "/api/jobs": BATCH_UPLOAD_MAX_BYTES
+})
+# ID-ul de corelare (X-Request-ID) al fiecărei cereri, prezent în toate mesajele de log
+app.add_middleware(RequestIdMiddleware)
+
 # Setup templates și static files
 templates = Jinja2Templates(directory="templates")
 
+# Pagina principală este randată o singură dată per versiune de plan și de
+# șablon; versiunea șablonului intră în ETag, ca un deploy nou să nu fie
+# ascuns de un 304
+with open("templates/index.html", "rb") as f:
+    HOME_TEMPLATE_VERSION = hashlib.sha256(f.read()).hexdigest()[:8]
+
+# Cache-Control pentru pagina principală (revalidare ieftină cu ETag)
+HOME_CACHE_CONTROL = os.environ.get('HOME_CACHE_CONTROL', 'public, no-cache')
+
+# Răspunsurile care depind doar de versiunea planului, serializate și
+# comprimate (gzip, br) o singură dată
+responses = ResponseCache()
+
 # Creează directoare necesare
 Path("static/uploads").mkdir(parents=True, exist_ok=True)
 
-# Încarcă planul de învățământ o singură dată (la startup)
-plan_data = load_plan_invatamant('plan_invatamant.json')
+# Planurile de învățământ: planul implicit (încărcat la startup) și planurile
+# per program de studii și an universitar din PLANS_DIR (`<program>/<an>.json`),
+# încărcate la prima cerere. Fiecare plan este compilat o singură dată într-un
+# snapshot binar (PLAN_SNAPSHOT_DIR) comun worker-ilor; planurile încărcate sunt
+# urmărite (PLAN_RELOAD_INTERVAL secunde) și reîncărcate fără restart.
+# Versiunea unui plan (hash-ul fișierului) este cheie pentru cache și ETag.
+PLAN_PATH = 'plan_invatamant.json'
+plans = PlanRegistry(
+    plans_dir=os.environ.get('PLANS_DIR', 'planuri'),
+    default_path=PLAN_PATH,
+    snapshot_dir=os.environ.get('PLAN_SNAPSHOT_DIR', 'plan_snapshots'),
+    poll_interval=float(os.environ.get('PLAN_RELOAD_INTERVAL', 5))
+)
+
+# Token pentru endpoint-urile de administrare (dacă nu e setat, nu se cere)
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+# Motorul de extragere: 'docx' (python-docx) sau 'stream' (lxml incremental)
+EXTRACTOR_ENGINE = os.environ.get('EXTRACTOR_ENGINE', 'docx')
+
+# Pool-ul în care rulează extragerea și validarea (configurabil prin EXECUTOR_*);
+# procesele din pool scriu log-urile în același format
+executor = executor_from_env(initializer=configure_logging)
+
+# Planificatorul din fața pool-ului: validările interactive nu așteaptă după
+# loturi, iar clienții împart echitabil worker-ii (SCHEDULER_*)
+scheduler = Scheduler(
+    slots=executor.max_workers,
+    bulk_slots=int(os.environ.get('SCHEDULER_BULK_SLOTS', 0)) or None,
+    client_slots=int(os.environ.get('SCHEDULER_CLIENT_SLOTS', 0)) or None,
+    max_queue=int(os.environ.get('SCHEDULER_MAX_QUEUE', 0)) or executor.max_pending,
+    retry_after=executor.retry_after
+)
+
+# Numărul maxim de fișe dintr-un lot aflate simultan în lucru (implicit: worker-ii pool-ului)
+BATCH_WINDOW = int(os.environ.get('BATCH_WINDOW', 0)) or executor.max_workers
+
+# Cache-ul rezultatelor după hash-ul conținutului; RESULT_CACHE_DB activează
+# persistența SQLite comună worker-ilor
+result_cache = ResultCache(
+    max_entries=int(os.environ.get('RESULT_CACHE_SIZE', 1024)),
+    db_path=os.environ.get('RESULT_CACHE_DB') or None
+)
+
+
+# Job-urile de validare asincrone (JOBS_DIR); cu JOBS_WORKER=external sunt
+# procesate doar de worker-i separați (python jobs.py), nu și de aplicație
+job_store = JobStore()
+JOBS_WORKER = os.environ.get('JOBS_WORKER', 'inprocess')
+
+
+def audit_plan_store(store) -> None:
+    """Rulează auditul planului și raportează inconsistențele în log."""
+    audit = store.audit()
+    if audit["status"] != "ok":
+        logger.warning(
+            "Planul de învățământ conține inconsistențe",
+            extra={
+                "plan_version": store.version,
+                "erori": {name: stats["erori"] for name, stats in audit["sumar"].items() if stats["erori"]},
+                "durata_ms": audit["durata_ms"]
+            }
+        )
+
+
+def on_plan_reload(program: Optional[str], old, store) -> None:
+    if old is not None:
+        result_cache.discard_plan(validation_version(old))
+    logger.info(
+        "Plan reîncărcat" if old is not None else "Plan încărcat",
+        extra={"program": program, "plan_version": store.version, "discipline_count": store.discipline_count}
+    )
+    audit_plan_store(store)
+
+
+plans.on_reload(on_plan_reload)
+# Planul implicit este încărcat la startup: un plan invalid oprește pornirea
+plans.get()
+
+
+async def plan_for(program: Optional[str] = None):
+    """
+    Planul programului de studii cerut (planul implicit fără program).
+
+    Raises:
+        HTTPException: 404 dacă programul nu are plan, 503 dacă planul nu
+            poate fi încărcat
+    """
+    try:
+        return await plans.get_async(program)
+    except UnknownProgramError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except (OSError, ValueError) as e:
+        logger.error("Eroare la încărcarea planului: %s", e, extra={"program": program})
+        raise HTTPException(status_code=503, detail=f"Planul programului {program} nu poate fi încărcat")
+
+
+@app.on_event("startup")
+async def start_plan_watcher():
+    app.state.plan_watcher = asyncio.create_task(
+        plans.watch(on_error=lambda program, e: logger.error(
+            "Eroare la reîncărcarea planului: %s", e, extra={"program": program}
+        ))
+    )
+
+
+@app.on_event("startup")
+async def start_job_runner():
+    app.state.job_runner = JobRunner(job_store, validate_job_source, BATCH_WINDOW)
+    app.state.job_tasks = [asyncio.create_task(maintain(job_store))]
+    if JOBS_WORKER == 'inprocess':
+        app.state.job_tasks.append(asyncio.create_task(app.state.job_runner.run()))
+
+
+@app.on_event("shutdown")
+def shutdown_executor():
+    app.state.plan_watcher.cancel()
+    for task in app.state.job_tasks:
+        task.cancel()
+    executor.shutdown()
+    job_store.close()
+    shutdown_logging()
+
+
+async def upload_source(file: UploadFile):
+    """
+    Sursa trimisă în pool: buffer-ul upload-ului pentru thread-uri,
+    conținutul (bytes) pentru procese, care nu pot primi obiecte fișier.
+    
+    Fișierele care nu sunt DOCX (sau sunt arhive-bombă) sunt respinse
+    înainte de a fi citite în memorie sau trimise în pool.
+    """
+    try:
+        check_docx(file.file)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    
+    if executor.shares_memory:
+        return file.file
+    with stage('upload'):
+        return await file.read()
+
+
+@contextmanager
+def executor_errors():
+    """
+    Traduce saturarea, căderea unui worker și timeout-ul pool-ului în erori HTTP.
+    """
+    try:
+        yield
+    except (ExecutorSaturatedError, WorkerCrashedError) as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except JobTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+
+def client_id(request: Request) -> Optional[str]:
+    """Clientul cererii, pentru împărțirea echitabilă a worker-ilor (adresa IP)."""
+    return request.client.host if request.client else None
+
+
+async def extract_source(
+    source,
+    clasa: str = INTERACTIVE,
+    client: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None
+):
+    """
+    Extrage datele dintr-o fișă, folosind cache-ul după conținut.
+    
+    Extragerea așteaptă un loc în pool în planificator, în clasa dată
+    ('interactive' sau 'bulk'), ca job al clientului dat. Cu `fields` sunt
+    extrase doar acele câmpuri (din cache, dacă fișa a fost deja extrasă
+    complet); rezultatele parțiale nu intră în cache.
+    """
+    with stage('hash'):
+        content_hash = source_hash(source)
+    fisa_data = await result_cache.get_extract_async(content_hash)
+    if fisa_data is not None:
+        return project_result(fisa_data, fields)
+    async with scheduler.slot(clasa, client):
+        start = time.perf_counter()
+        fisa_data, timings = await executor.run(extract_job, source, EXTRACTOR_ENGINE, get_request_id(), fields)
+    # Timpul petrecut în afara job-ului, după planificator: transferul către worker
+    record_stage('queue', max(time.perf_counter() - start - sum(timings.values()), 0.0))
+    for name, seconds in timings.items():
+        record_stage(name, seconds)
+    if fields is None:
+        await result_cache.put_extract_async(content_hash, fisa_data)
+    return fisa_data
+
+
+async def validate_source(
+    source,
+    cod_disciplina: Optional[str] = None,
+    clasa: str = INTERACTIVE,
+    client: Optional[str] = None,
+    program: Optional[str] = None
+):
+    """
+    Validează o fișă față de planul programului dat, folosind cache-ul pe
+    ambele niveluri.
+    
+    Doar extragerea rulează în pool; validarea folosește planul indexat din
+    acest proces și este ieftină, așa că planul nu mai este trimis worker-ilor.
+    """
+    # Snapshot-ul planului rămâne același pe toată durata cererii, chiar dacă
+    # între timp planul este reîncărcat
+    plan_store = await plans.get_async(program)
+    with stage('hash'):
+        content_hash = source_hash(source)
+    rezultat = await result_cache.get_validation_async(content_hash, validation_version(plan_store), cod_disciplina)
+    if rezultat is None:
+        fisa_data = await extract_source(source, clasa, client)
+        with stage('validation'):
+            rezultat = validate_extracted(fisa_data, plan_store, cod_disciplina)
+        await result_cache.put_validation_async(content_hash, validation_version(plan_store), cod_disciplina, rezultat)
+    
+    record_validation(rezultat)
+    return rezultat
+
+
+async def validate_job_source(source, cod_disciplina: Optional[str], program: Optional[str], job_id: str):
+    """Validarea unei fișe dintr-un job asincron: clasa 'bulk', job-ul ca client."""
+    return await validate_source(source, cod_disciplina, BULK, f"job:{job_id}", program)
+
+
+def json_with_etag(request: Request, etag: str, build: Callable[[], bytes]) -> Response:
+    """
+    Răspuns JSON pre-serializat cu ETag; 304 dacă clientul are deja versiunea.
+    
+    Corpul (`build`) și variantele comprimate sunt calculate la prima cerere
+    pentru ETag-ul dat și servite apoi din memorie.
+    """
+    return precompressed_response(request, responses.get(etag, build), "application/json")
+
+
+def render_home(plan_store) -> bytes:
+    """Pagina principală randată pentru o versiune a planului."""
+    return templates.get_template("index.html").render(
+        discipline=plan_store.discipline
+    ).encode("utf-8")
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -36,43 +331,53 @@ async def home(request: Request):
     """
     Pagina principală cu interfața de upload și validare.
     """
-    return templates.TemplateResponse("index.html", {
-        "request": request,
-        "discipline": plan_data['discipline']
-    })
+    plan_store = plans.current
+    entry = responses.get(
+        plan_store.etag(f"home-{HOME_TEMPLATE_VERSION}"),
+        lambda: render_home(plan_store)
+    )
+    return precompressed_response(request, entry, "text/html", HOME_CACHE_CONTROL)
 
 
 @app.get("/api/discipline")
-async def get_discipline():
+async def get_discipline(
+    request: Request,
+    an: Optional[int] = None,
+    semestru: Optional[int] = None,
+    categoria: Optional[str] = None,
+    program: Optional[str] = None
+):
     """
     Returnează lista de discipline din planul de învățământ.
     
+    Args:
+        an: Filtrează după an (opțional)
+        semestru: Filtrează după semestru (opțional)
+        categoria: Filtrează după categorie (opțional)
+        program: Programul de studii, ex. `IG/2024-2025` (opțional; implicit
+            planul implicit)
+    
     Returns:
         Lista de discipline cu cod și denumire
     """
-    discipline_list = [
-        {
-            "cod": disc["cod"],
-            "denumire_ro": disc["denumire_ro"],
-            "an": disc.get("an", "N/A"),
-            "semestru": disc.get("semestru", "N/A"),
-            "credite": disc.get("credite", "N/A")
-        }
-        for disc in plan_data['discipline']
-    ]
-    return {"discipline": discipline_list}
+    plan_store = await plan_for(program)
+    etag = plan_store.etag(f"discipline-{an}-{semestru}-{categoria}")
+    return json_with_etag(request, etag, lambda: plan_store.discipline_json_for(an, semestru, categoria))
 
 
 @app.post("/api/extract")
-async def extract_fisa(file: UploadFile = File(...)):
+async def extract_fisa(request: Request, file: UploadFile = File(...), fields: Optional[str] = None):
     """
     Extrage datele din fișa DOCX încărcată.
     
     Args:
         file: Fișierul DOCX încărcat
+        fields: Doar aceste câmpuri, separate prin virgulă (ex.
+            `?fields=cod,denumire_ro,denumire_en` pentru identificarea
+            disciplinei); implicit toate
         
     Returns:
-        Datele extrase din fișă (16 câmpuri)
+        Datele extrase din fișă (16 câmpuri sau doar cele cerute)
     """
     # Verifică extensia fișierului
     if not file.filename.endswith('.docx'):
@@ -80,34 +385,31 @@ async def extract_fisa(file: UploadFile = File(...)):
             status_code=400,
             detail="Fișierul trebuie să fie în format DOCX"
         )
+    try:
+        campuri = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    mark_received()
+    record_upload("extract", file.size)
     
-    # Salvează temporar fișierul
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as tmp:
-            content = await file.read()
-            tmp.write(content)
-            tmp_path = tmp.name
+        # Extrage datele direct din buffer-ul upload-ului, în pool-ul de lucru
+        source = await upload_source(file)
+        with executor_errors():
+            fisa_data = await extract_source(source, INTERACTIVE, client_id(request), campuri)
         
-        # Extrage datele
-        fisa_data = extract_fisa_disciplina(tmp_path)
-        
-        # Șterge fișierul temporar
-        os.unlink(tmp_path)
-        
-        return {
+        # Returnat direct: rezultatul nu mai trece prin jsonable_encoder
+        return FastJSONResponse({
             "status": "success",
             "filename": file.filename,
             "data": fisa_data
-        }
+        })
         
+    except HTTPException:
+        raise
     except Exception as e:
-        # Șterge fișierul temporar dacă există
-        if 'tmp_path' in locals():
-            try:
-                os.unlink(tmp_path)
-            except:
-                pass
-        
+        logger.exception("Eroare la extragerea datelor", extra={"fisier": file.filename})
         raise HTTPException(
             status_code=500,
             detail=f"Eroare la extragerea datelor: {str(e)}"
@@ -116,8 +418,10 @@ async def extract_fisa(file: UploadFile = File(...)):
 
 @app.post("/api/validate")
 async def validate_fisa_endpoint(
+    request: Request,
     file: UploadFile = File(...), 
-    cod_disciplina: str = Form(None)
+    cod_disciplina: str = Form(None),
+    program: Optional[str] = None
 ):
     """
     Validează fișa DOCX încărcată față de planul de învățământ.
@@ -125,6 +429,7 @@ async def validate_fisa_endpoint(
     Args:
         file: Fișierul DOCX încărcat
         cod_disciplina: Codul disciplinei din plan (opțional - se folosește codul din fișă dacă nu e furnizat)
+        program: Programul de studii, ex. `IG/2024-2025` (opțional)
         
     Returns:
         Rezultatul validării cu toate verificările
@@ -135,57 +440,275 @@ async def validate_fisa_endpoint(
             status_code=400,
             detail="Fișierul trebuie să fie în format DOCX"
         )
+    # Un program fără plan este respins înainte de extragere
+    await plan_for(program)
+    
+    mark_received()
+    record_upload("validate", file.size)
     
-    # Salvează temporar fișierul
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as tmp:
-            content = await file.read()
-            tmp.write(content)
-            tmp_path = tmp.name
-        
-        # Extrage datele din fișă
-        fisa_data = extract_fisa_disciplina(tmp_path)
+        # Extrage datele și validează față de plan, în pool-ul de lucru
+        source = await upload_source(file)
+        with executor_errors():
+            rezultat = await validate_source(source, cod_disciplina, INTERACTIVE, client_id(request), program)
         
-        # Șterge fișierul temporar
-        os.unlink(tmp_path)
-        
-        # Dacă utilizatorul a selectat manual o disciplină, suprascrie codul din fișă
-        if cod_disciplina:
-            fisa_data['cod'] = cod_disciplina
-        
-        # Validează față de plan
-        rezultat = validate_fisa(fisa_data, plan_data)
-        
-        return {
+        return FastJSONResponse({
             "status": "success",
             "filename": file.filename,
             "cod_selectat_manual": cod_disciplina is not None,
+            "program": program,
             "validare": rezultat
-        }
+        })
         
+    except HTTPException:
+        raise
     except Exception as e:
-        # Șterge fișierul temporar dacă există
-        if 'tmp_path' in locals():
-            try:
-                os.unlink(tmp_path)
-            except:
-                pass
-        
+        logger.exception("Eroare la validare", extra={"fisier": file.filename})
         raise HTTPException(
             status_code=500,
             detail=f"Eroare la validare: {str(e)}"
         )
 
 
+@app.post("/api/validate/batch")
+async def validate_batch_endpoint(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    response_format: str = Query("json", alias="format"),
+    program: Optional[str] = None
+):
+    """
+    Validează în lot mai multe fișe DOCX sau o arhivă ZIP cu fișe.
+    
+    Fișele sunt procesate în paralel în pool-ul de lucru; arhivele sunt
+    citite membru cu membru, fără dezarhivare pe disc.
+    
+    Args:
+        files: Fișierele DOCX și/sau arhivele ZIP încărcate
+        response_format: 'json' (un singur răspuns), 'ndjson' sau 'sse'
+            (câte o înregistrare per fișă, imediat ce este gata, apoi sumarul)
+        program: Programul de studii, ex. `IG/2024-2025` (opțional)
+        
+    Returns:
+        Rezultatul validării pentru fiecare fișă și sumarul agregat
+    """
+    if response_format != "json" and response_format not in STREAM_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail="Formatul trebuie să fie json, ndjson sau sse"
+        )
+    await plan_for(program)
+    
+    mark_received()
+    for file in files:
+        record_upload("batch", file.size)
+    
+    documents = iter_batch_documents(files, in_memory=executor.shares_memory)
+    validate = partial(validate_source, clasa=BULK, client=client_id(request), program=program)
+    results = validate_batch(documents, validate, BATCH_WINDOW)
+    
+    if response_format in STREAM_FORMATS:
+        encode, media_type = STREAM_FORMATS[response_format]
+        return StreamingResponse(
+            stream_batch(results, encode),
+            media_type=media_type,
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
+    rezultate = []
+    summary = BatchSummary()
+    async for item in results:
+        rezultate.append(item)
+        summary.add(item)
+    
+    rezultate.sort(key=lambda item: item['index'])
+    
+    return FastJSONResponse({
+        "status": "success",
+        "rezultate": rezultate,
+        "sumar": summary.to_dict()
+    })
+
+
+@app.post("/api/jobs", status_code=202)
+async def create_job(
+    files: List[UploadFile] = File(...),
+    cod_disciplina: str = Form(None),
+    program: Optional[str] = None
+):
+    """
+    Creează un job de validare asincron pentru una sau mai multe fișe.
+    
+    Fișele (DOCX sau arhive ZIP) sunt salvate și validate în fundal;
+    progresul și rezultatul se obțin cu GET /api/jobs/{job_id}. Un job
+    identic deja existent (aceleași fișe, același plan) este returnat
+    în locul unuia nou.
+    
+    Args:
+        files: Fișierele DOCX și/sau arhivele ZIP încărcate
+        cod_disciplina: Codul disciplinei din plan (opțional, pentru toate fișele)
+        program: Programul de studii, ex. `IG/2024-2025` (opțional)
+        
+    Returns:
+        ID-ul job-ului, status-ul și URL-ul pentru urmărire
+    """
+    plan_store = await plan_for(program)
+    
+    mark_received()
+    for file in files:
+        record_upload("jobs", file.size)
+    
+    # Fișele sunt salvate pe disc pe măsură ce sunt citite; în memorie rămân doar hash-urile
+    documents = [doc async for doc in iter_batch_documents(files, spool=job_store.save_file)]
+    if not documents:
+        raise HTTPException(status_code=400, detail="Nu a fost trimisă nicio fișă")
+    
+    job_id, deduplicat = await asyncio.to_thread(
+        job_store.create, documents, cod_disciplina, validation_version(plan_store), program
+    )
+    if not deduplicat:
+        app.state.job_runner.notify()
+    
+    job = await asyncio.to_thread(job_store.get, job_id, with_results=False)
+    url = f"/api/jobs/{job_id}"
+    return FastJSONResponse(
+        status_code=202,
+        content={
+            "job_id": job_id,
+            "status": job["status"],
+            "deduplicat": deduplicat,
+            "progres": job["progres"],
+            "url": url
+        },
+        headers={"Location": url}
+    )
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Starea unui job de validare.
+    
+    Returns:
+        Status-ul ('queued', 'running', 'done', 'error') și progresul; după
+        terminare, rezultatul per fișă și sumarul agregat (ca la
+        /api/validate/batch)
+    """
+    job = await asyncio.to_thread(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job-ul nu există sau a expirat")
+    
+    headers = {"Cache-Control": "no-store"}
+    if job["status"] not in (JOB_DONE, JOB_ERROR):
+        headers["Retry-After"] = "1"
+    return FastJSONResponse(content=job, headers=headers)
+
+
+@app.get("/api/programe")
+async def get_programe():
+    """
+    Programele de studii (și anii universitari) care au un plan de învățământ.
+    
+    Returns:
+        Cheile programelor (`<program>/<an>`, valoarea parametrului `program`)
+        și versiunea planurilor deja încărcate
+    """
+    programe = await asyncio.to_thread(plans.programs)
+    loaded = plans.loaded()
+    return FastJSONResponse({
+        "programe": [
+            {
+                "program": program,
+                "plan_version": loaded[program].version if program in loaded else None
+            }
+            for program in programe
+        ]
+    })
+
+
 @app.get("/api/plan")
-async def get_plan():
+async def get_plan(request: Request, program: Optional[str] = None):
     """
     Returnează întregul plan de învățământ.
     
+    Args:
+        program: Programul de studii, ex. `IG/2024-2025` (opțional)
+    
     Returns:
         Planul complet de învățământ
     """
-    return plan_data
+    plan_store = await plan_for(program)
+    return json_with_etag(request, plan_store.etag("plan"), lambda: plan_store.plan_json)
+
+
+@app.get("/api/plan/audit")
+async def get_plan_audit(request: Request, program: Optional[str] = None):
+    """
+    Auditul de consistență al planului de învățământ.
+    
+    Verifică pentru fiecare disciplină din plan aceleași constrângeri ca
+    pentru o fișă (credite × 25, suma componentelor studiului individual,
+    ore plan + studiu = total semestru, ore examinări) și suma creditelor
+    per semestru. Auditul rulează o singură dată per versiune de plan.
+    
+    Args:
+        program: Programul de studii, ex. `IG/2024-2025` (opțional)
+    
+    Returns:
+        Status-ul, sumarul per verificare, erorile per disciplină și
+        creditele per semestru
+    """
+    plan_store = await plan_for(program)
+    return json_with_etag(request, plan_store.etag("audit"), plan_store.audit_json)
+
+
+@app.post("/api/plan/reload")
+async def reload_plan(program: Optional[str] = None, x_admin_token: Optional[str] = Header(None)):
+    """
+    Reîncarcă planul de învățământ din fișier, fără restart.
+    
+    Planul nou este verificat și compilat înainte de a înlocui planul curent;
+    cererile aflate în lucru își termină validarea pe planul vechi.
+    
+    Args:
+        program: Programul de studii, ex. `IG/2024-2025` (opțional)
+    
+    Returns:
+        Versiunea planului după reîncărcare
+    """
+    if ADMIN_TOKEN and x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Acces interzis")
+    
+    try:
+        reloaded = await plans.reload_async(program, force=True)
+    except UnknownProgramError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except (OSError, ValueError) as e:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Planul nu a putut fi reîncărcat: {str(e)}"
+        )
+    
+    plan_store = await plan_for(program)
+    return {
+        "status": "success",
+        "program": program,
+        "reloaded": reloaded,
+        "plan_version": plan_store.version,
+        "discipline_count": plan_store.discipline_count
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Metricile aplicației în formatul text Prometheus.
+    
+    Cu mai mulți worker-i uvicorn (PROMETHEUS_MULTIPROC_DIR setat),
+    valorile sunt agregate din toate procesele.
+    """
+    body, content_type = render_metrics()
+    return Response(content=body, headers={"Content-Type": content_type})
 
 
 @app.get("/health")
@@ -193,9 +716,15 @@ async def health_check():
     """
     Endpoint pentru verificarea stării aplicației.
     """
+    plan_store = plans.current
     return {
         "status": "healthy",
-        "discipline_count": len(plan_data['discipline']),
+        "discipline_count": plan_store.discipline_count,
+        "plan_version": plan_store.version,
+        "programe_incarcate": sorted(program for program in plans.loaded() if program is not None),
+        "cache": result_cache.stats(),
+        "scheduler": scheduler.stats(),
+        "executor": executor.stats(),
         "version": "1.0.0"
     }
 
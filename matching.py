@@ -0,0 +1,169 @@
+"""
+Modul pentru compararea denumirilor de discipline.
+
+Denumirile sunt comparate după normalizare (litere mici, spații simple,
+ş/ţ cu sedilă echivalente cu ș/ț cu virgulă), cu un scor de similaritate
+2·LCS / (len(a) + len(b)) calculat bit-paralel (Hyyrö), în O(⌈m/w⌉·n)
+în loc de O(m·n) cât costă `SequenceMatcher`. Separat se verifică dacă
+două denumiri diferă *doar* prin diacritice (ă/â/î/ș/ț lipsă).
+
+`NameIndex` păstrează formele normalizate ale denumirilor din plan și
+găsește disciplina cu denumirea cea mai apropiată de una dată.
+"""
+import os
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+# Pragurile de similaritate (configurabile prin variabile de mediu)
+SIMILARITY_OK = float(os.environ.get('MATCH_OK_THRESHOLD', 0.95))
+SIMILARITY_WARNING = float(os.environ.get('MATCH_WARNING_THRESHOLD', 0.85))
+
+# Scorul minim pentru a propune o disciplină din plan după denumire
+SIMILARITY_SUGGEST = float(os.environ.get('MATCH_SUGGEST_THRESHOLD', 0.6))
+
+# Variantele cu sedilă (ş, ţ) sunt încă frecvente în documentele Word
+_CEDILLA_TO_COMMA = str.maketrans({
+    'ş': 'ș', 'Ş': 'Ș',
+    'ţ': 'ț', 'Ţ': 'Ț',
+})
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_name(text: Optional[str]) -> str:
+    """
+    Forma canonică a unei denumiri: litere mici, spații simple, ș/ț cu virgulă.
+    """
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFC', text).translate(_CEDILLA_TO_COMMA)
+    return _WHITESPACE.sub(' ', text.strip()).lower()
+
+
+def fold_diacritics(text: str) -> str:
+    """Elimină diacriticele (ă -> a, ș -> s etc.) dintr-un text deja normalizat."""
+    decomposed = unicodedata.normalize('NFD', text)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def _char_masks(text: str) -> Dict[str, int]:
+    """Pentru fiecare caracter, bitmask-ul pozițiilor lui în text."""
+    masks: Dict[str, int] = {}
+    for i, ch in enumerate(text):
+        masks[ch] = masks.get(ch, 0) | (1 << i)
+    return masks
+
+
+def _lcs_length(masks: Dict[str, int], length: int, other: str) -> int:
+    """Lungimea celei mai lungi subsecvențe comune, bit-paralel."""
+    full = (1 << length) - 1
+    v = full
+    for ch in other:
+        u = v & masks.get(ch, 0)
+        v = ((v + u) | (v - u)) & full
+    return length - v.bit_count()
+
+
+def ratio(a: str, b: str) -> float:
+    """
+    Similaritatea (0.0 - 1.0) a două texte deja normalizate.
+
+    Aceeași formulă ca `SequenceMatcher.ratio()`, dar pe cea mai lungă
+    subsecvență comună exactă (SequenceMatcher o aproximează euristic).
+    """
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    return 2.0 * _lcs_length(_char_masks(a), len(a), b) / (len(a) + len(b))
+
+
+def similarity(a: Optional[str], b: Optional[str]) -> float:
+    """Similaritatea (0.0 - 1.0) a două denumiri, după normalizare."""
+    return ratio(normalize_name(a), normalize_name(b))
+
+
+def compare_names(fisa: Optional[str], plan: Optional[str]) -> Tuple[float, str, bool]:
+    """
+    Compară denumirea din fișă cu cea din plan.
+
+    Returns:
+        Tuplu (scor, status, doar_diacritice): status este 'ok', 'warning'
+        sau 'error' după praguri; diferențele doar de diacritice sunt cel
+        puțin 'warning', indiferent de scor
+    """
+    a = normalize_name(fisa)
+    b = normalize_name(plan)
+    score = ratio(a, b)
+    only_diacritics = a != b and bool(a) and fold_diacritics(a) == fold_diacritics(b)
+
+    if score >= SIMILARITY_OK:
+        status = 'ok'
+    elif score >= SIMILARITY_WARNING or only_diacritics:
+        status = 'warning'
+    else:
+        status = 'error'
+    return score, status, only_diacritics
+
+
+class NameIndex:
+    """
+    Index pentru căutarea disciplinei cu denumirea cea mai apropiată.
+
+    Formele normalizate și bitmask-urile denumirilor din plan sunt calculate
+    o singură dată; la căutare, candidații al căror scor maxim posibil (dat
+    doar de lungimi) nu poate depăși cel mai bun scor găsit nu mai sunt comparați.
+    """
+
+    def __init__(self, discipline: Iterable[Dict[str, Any]], keys: Tuple[str, ...] = ('denumire_ro', 'denumire_en')):
+        """
+        Args:
+            discipline: Disciplinele din plan
+            keys: Câmpurile cu denumiri comparate (română, engleză)
+        """
+        self._entries: List[Tuple[int, Dict[str, int], Dict[str, Any]]] = []
+        for disc in discipline:
+            for key in keys:
+                name = fold_diacritics(normalize_name(disc.get(key)))
+                if name:
+                    self._entries.append((len(name), _char_masks(name), disc))
+
+    def best_match(
+        self,
+        denumire: Optional[str],
+        min_score: float = SIMILARITY_SUGGEST
+    ) -> Optional[Tuple[Dict[str, Any], float]]:
+        """
+        Disciplina cu denumirea (română sau engleză) cea mai apropiată.
+
+        Comparația ignoră diacriticele.
+
+        Returns:
+            Tuplu (disciplină, scor), sau None dacă niciun scor nu atinge `min_score`
+        """
+        query = fold_diacritics(normalize_name(denumire))
+        if not query:
+            return None
+
+        n = len(query)
+        best: Optional[Tuple[Dict[str, Any], float]] = None
+        best_score = min_score
+        # Scorul maxim posibil: subsecvența comună are cel mult min(m, n) caractere;
+        # candidații sunt parcurși descrescător după această limită
+        candidates = sorted(
+            ((2.0 * min(length, n) / (length + n), length, masks, disc)
+             for length, masks, disc in self._entries),
+            key=lambda candidate: candidate[0],
+            reverse=True
+        )
+        for bound, length, masks, disc in candidates:
+            if bound < best_score:
+                break
+            score = 2.0 * _lcs_length(masks, length, query) / (length + n)
+            if score >= best_score and (best is None or score > best[1]):
+                best, best_score = (disc, score), score
+                if score == 1.0:
+                    break
+        return best
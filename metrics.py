@@ -0,0 +1,210 @@
+"""
+Modul pentru metricile aplicației (format Prometheus) și Server-Timing.
+
+Fiecare cerere HTTP primește un `StageTimer` (prin `MetricsMiddleware`),
+în care se adună duratele etapelor procesării: primirea upload-ului,
+hash-ul conținutului, așteptarea în pool, parsarea DOCX, căutarea în celule,
+validarea. Duratele sunt înregistrate și în histograme Prometheus, expuse
+pe /metrics, iar opțional în header-ul `Server-Timing` al răspunsului.
+
+Cu mai mulți worker-i uvicorn, variabila PROMETHEUS_MULTIPROC_DIR trebuie să
+indice un director gol (comun worker-ilor) înainte de pornire; /metrics
+agregă atunci valorile tuturor proceselor.
+"""
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+
+# Header-ul Server-Timing (SERVER_TIMING=0 îl dezactivează)
+SERVER_TIMING = os.environ.get('SERVER_TIMING', '1') != '0'
+
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (10e3, 25e3, 50e3, 100e3, 250e3, 500e3, 1e6, 2.5e6, 5e6, 10e6, 25e6, 50e6)
+
+STAGE_SECONDS = Histogram(
+    'fisa_stage_seconds',
+    'Durata etapelor procesării unei fișe',
+    ['stage'],
+    buckets=STAGE_BUCKETS
+)
+UPLOAD_BYTES = Histogram(
+    'fisa_upload_bytes',
+    'Dimensiunea fișierelor încărcate',
+    ['endpoint'],
+    buckets=SIZE_BUCKETS
+)
+VALIDATIONS = Counter(
+    'fisa_validations_total',
+    'Validări de fișe, după status-ul global',
+    ['status']
+)
+CHECKS = Counter(
+    'fisa_validation_checks_total',
+    'Rezultatele verificărilor individuale (ex. total_semestru_din_credite)',
+    ['check', 'status']
+)
+REQUEST_SECONDS = Histogram(
+    'fisa_http_request_duration_seconds',
+    'Durata cererilor HTTP',
+    ['method', 'route', 'status'],
+    buckets=STAGE_BUCKETS
+)
+# Planificatorul job-urilor (vezi scheduler.py); în modul multiproces,
+# valorile instantanee ale worker-ilor în viață sunt adunate
+SCHEDULER_QUEUED = Gauge(
+    'fisa_scheduler_queue_depth',
+    'Job-uri în așteptare în planificator, per clasă',
+    ['clasa'],
+    multiprocess_mode='livesum'
+)
+SCHEDULER_ACTIVE = Gauge(
+    'fisa_scheduler_active',
+    'Job-uri în lucru în pool, per clasă',
+    ['clasa'],
+    multiprocess_mode='livesum'
+)
+SCHEDULER_WAIT = Histogram(
+    'fisa_scheduler_wait_seconds',
+    'Timpul de așteptare în planificator, per clasă',
+    ['clasa'],
+    buckets=STAGE_BUCKETS
+)
+
+
+class StageTimer:
+    """Duratele etapelor unei cereri, în ordinea în care au fost înregistrate."""
+
+    __slots__ = ('start', 'stages')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def server_timing(self) -> str:
+        """Valoarea header-ului Server-Timing (durate în milisecunde)."""
+        entries = [f'{stage};dur={seconds * 1000:.2f}' for stage, seconds in self.stages.items()]
+        entries.append(f'total;dur={(time.perf_counter() - self.start) * 1000:.2f}')
+        return ', '.join(entries)
+
+
+_current_timer: ContextVar[Optional[StageTimer]] = ContextVar('stage_timer', default=None)
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """Înregistrează durata unei etape (histogramă + cererea curentă)."""
+    STAGE_SECONDS.labels(stage).observe(seconds)
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.add(stage, seconds)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Măsoară blocul `with` ca etapa `name`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+def mark_received() -> None:
+    """
+    Înregistrează etapa 'receive': de la începutul cererii până la handler
+    (citirea body-ului și parsarea multipart, cu scrierea fișierului temporar).
+    """
+    timer = _current_timer.get()
+    if timer is not None:
+        record_stage('receive', time.perf_counter() - timer.start)
+
+
+def record_upload(endpoint: str, size: Optional[int]) -> None:
+    """Înregistrează dimensiunea unui fișier încărcat."""
+    if size is not None:
+        UPLOAD_BYTES.labels(endpoint).observe(size)
+
+
+def record_validation(rezultat: Dict[str, Any]) -> None:
+    """Numără status-ul global și status-ul fiecărei verificări dintr-o validare."""
+    VALIDATIONS.labels(rezultat['status']).inc()
+    for grup in (rezultat.get('validari') or {}).values():
+        for nume, verificare in grup.items():
+            CHECKS.labels(nume, verificare.get('status', 'necunoscut')).inc()
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Metricile în formatul text Prometheus și content-type-ul lor."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI: măsoară fiecare cerere HTTP și adaugă header-ul Server-Timing.
+
+    Este un middleware ASGI simplu (nu BaseHTTPMiddleware), astfel încât
+    răspunsurile în flux (NDJSON/SSE) nu sunt puse în buffer.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._routes: Optional[Dict[Any, str]] = None
+
+    def _route(self, scope: Dict[str, Any]) -> str:
+        # Eticheta este șablonul rutei (nu calea efectivă), pentru cardinalitate mică
+        if self._routes is None:
+            app = scope.get('app')
+            self._routes = {
+                route.endpoint: route.path
+                for route in getattr(app, 'routes', [])
+                if hasattr(route, 'endpoint')
+            }
+        return self._routes.get(scope.get('endpoint'), 'other')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        timer = StageTimer()
+        token = _current_timer.set(timer)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                if SERVER_TIMING and timer.stages:
+                    headers = list(message.get('headers', []))
+                    headers.append((b'server-timing', timer.server_timing().encode('latin-1')))
+                    message = {**message, 'headers': headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_timer.reset(token)
+            REQUEST_SECONDS.labels(scope['method'], self._route(scope), str(status)).observe(
+                time.perf_counter() - timer.start
+            )
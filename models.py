@@ -0,0 +1,124 @@
+"""
+Modelele tipizate ale datelor care circulă între extractor, validare și API.
+
+Fișa extrasă, disciplina din plan și rezultatul validării rămân dicționare
+simple (așa sunt păstrate în cache, în job-uri și în proiecțiile cu
+`fields`); tipurile de mai jos le descriu forma pentru verificarea statică,
+fără niciun cost la rulare. Serializarea lor în răspunsuri este în
+serialization.py.
+"""
+from typing import Any, Dict, List, Optional, TypedDict
+
+
+class OreSaptamana(TypedDict):
+    """Ore pe săptămână, pe tipuri de activitate."""
+    curs: int
+    seminar: int
+    proiect: int
+    lucrari: int
+
+
+class DistributieFondTimp(TypedDict):
+    """Distribuția fondului de timp al studiului individual (ore pe semestru)."""
+    studiu_manual: int
+    documentare: int
+    pregatire_seminarii: int
+    examinari: int
+
+
+class FisaData(TypedDict, total=False):
+    """
+    Datele extrase din fișa disciplinei (vezi `fisa_schema.RESULT_DEFAULTS`).
+
+    O extragere completă conține toate câmpurile; una cu `fields`, doar
+    câmpurile cerute.
+    """
+    cod: Optional[str]
+    denumire_ro: Optional[str]
+    denumire_en: Optional[str]
+    categoria: Optional[str]
+    credite: Optional[int]
+    nr_ore_saptamana_total: Optional[int]
+    nr_ore_saptamana: OreSaptamana
+    total_ore_plan: Optional[int]
+    distributie_fond_timp: DistributieFondTimp
+    total_ore_studiu_individual: Optional[int]
+    total_ore_semestru: Optional[int]
+    evaluare: Optional[str]
+
+
+class DisciplinaPlan(TypedDict, total=False):
+    """
+    O disciplină din planul de învățământ.
+
+    Câmpurile din `plan_store.REQUIRED_FIELDS` sunt obligatorii; celelalte
+    lipsesc din unele planuri.
+    """
+    cod: str
+    denumire_ro: str
+    denumire_en: str
+    categoria: str
+    credite: int
+    nr_ore_saptamana: OreSaptamana
+    an: int
+    semestru: int
+    nr_ore_saptamana_total: int
+    total_ore_plan: int
+    distributie_fond_timp: DistributieFondTimp
+    total_ore_studiu_individual: int
+    total_ore_semestru: int
+    evaluare: str
+
+
+class Verificare(TypedDict, total=False):
+    """
+    Rezultatul unei reguli de validare (vezi rules.py).
+
+    Câmpurile prezente depind de tipul regulii: 'exact' și 'fuzzy' au
+    valoare_fisa/valoare_plan (plus similarity), 'formula' are formula,
+    valoare_calculata, calcul și corect, iar 'interval' are valoare,
+    interval și corect.
+    """
+    status: str
+    valoare_fisa: Any
+    valoare_plan: Any
+    similarity: float
+    formula: str
+    valoare_calculata: Any
+    calcul: str
+    valoare: Any
+    interval: List[int]
+    corect: bool
+    mesaj: Optional[str]
+
+
+class StatisticiValidare(TypedDict):
+    """Numărul de verificări, pe status."""
+    total_verificari: int
+    succes: int
+    warning: int
+    erori: int
+
+
+class SugestieDisciplina(TypedDict):
+    """Disciplina propusă după denumire, când codul fișei nu există în plan."""
+    cod: str
+    denumire_ro: str
+    similarity: float
+
+
+class RezultatValidare(TypedDict, total=False):
+    """
+    Rezultatul `validators.validate_fisa`.
+
+    Dacă disciplina nu există în plan, `validari` este None, iar rezultatul
+    are `mesaj` și, eventual, `sugestie` în locul sumarului și statisticilor.
+    """
+    status: str
+    cod: Optional[str]
+    denumire: Optional[str]
+    mesaj: str
+    sugestie: SugestieDisciplina
+    validari: Optional[Dict[str, Dict[str, Verificare]]]
+    summary: str
+    statistici: StatisticiValidare
@@ -0,0 +1,245 @@
+"""
+Modul pentru auditul de consistență al planului de învățământ.
+
+Planul conține aceleași câmpuri ca fișa (credite, total ore, distribuția
+fondului de timp), deci constrângerile verificate pentru o fișă
+(regulile de tip formula și interval din `rules.DEFAULT_RULES`) se pot
+verifica și pentru plan. Disciplinele sunt încărcate o singură dată în
+coloane numpy și fiecare constrângere este evaluată pe toate rândurile
+deodată; doar rândurile cu erori sunt apoi transformate în dicționare.
+
+Verificări (per disciplină, cu aceleași nume ca în validarea fișei):
+- total_semestru_din_credite: total_ore_semestru == credite × 25
+- total_studiu_suma: total_ore_studiu_individual == studiu_manual + documentare + pregatire_seminarii
+- total_semestru_suma: total_ore_semestru == total_ore_plan + total_ore_studiu_individual
+- ore_examinari: examinari între 2 și 3
+și per semestru (an, semestru):
+- credite_semestru: suma creditelor == 30
+
+O disciplină căreia îi lipsesc câmpurile unei verificări nu este numărată
+ca eroare, ci ca 'lipsa' în sumar.
+
+Utilizare din linia de comandă:
+    python plan_audit.py plan_invatamant.json [--json]
+"""
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from rules import INTERVAL_EXAMINARI, ORE_PER_CREDIT
+
+
+# Suma creditelor unui semestru
+CREDITE_PER_SEMESTRU = 30
+
+# Coloanele numerice: nume coloană -> câmpul disciplinei; câmpurile din
+# 'distributie_fond_timp' sunt date separat
+NUMERIC_COLUMNS = ('an', 'semestru', 'credite', 'total_ore_plan', 'total_ore_studiu_individual', 'total_ore_semestru')
+DISTRIBUTIE_COLUMNS = ('studiu_manual', 'documentare', 'pregatire_seminarii', 'examinari')
+
+_NAN = float('nan')
+
+
+def _column(values: Sequence[Any]) -> np.ndarray:
+    """Un vector float64 din valori; cele lipsă sau nenumerice devin NaN."""
+    try:
+        # Cazul obișnuit: doar numere și None (None devine NaN)
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        pass
+    return np.fromiter(
+        (value if type(value) is int or type(value) is float else _NAN for value in values),
+        dtype=np.float64,
+        count=len(values)
+    )
+
+
+class PlanColumns:
+    """
+    Disciplinele planului în formă coloanară (un vector numpy per câmp).
+
+    Valorile lipsă sunt NaN; orice comparație cu NaN este falsă, deci
+    rândurile incomplete sunt excluse explicit prin măștile `present`.
+    """
+
+    __slots__ = ('cod', 'count', 'columns')
+
+    def __init__(self, discipline: Sequence[Dict[str, Any]]):
+        self.cod: List[Any] = [disc.get('cod') for disc in discipline]
+        self.count = len(discipline)
+        self.columns: Dict[str, np.ndarray] = {
+            name: _column([disc.get(name) for disc in discipline]) for name in NUMERIC_COLUMNS
+        }
+        distributie = [disc.get('distributie_fond_timp') for disc in discipline]
+        distributie = [dist if isinstance(dist, dict) else {} for dist in distributie]
+        for name in DISTRIBUTIE_COLUMNS:
+            self.columns[name] = _column([dist.get(name) for dist in distributie])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def present(self, *names: str) -> np.ndarray:
+        """Masca rândurilor care au toate câmpurile date."""
+        mask = np.ones(self.count, dtype=bool)
+        for name in names:
+            mask &= ~np.isnan(self.columns[name])
+        return mask
+
+
+def _value(x: float) -> Optional[int]:
+    return None if x != x else int(x)
+
+
+def _row_check(
+    cols: PlanColumns,
+    name: str,
+    fields: Tuple[str, ...],
+    ok: np.ndarray,
+    valoare: np.ndarray,
+    calculat: Optional[np.ndarray],
+    mesaj: str
+) -> Tuple[Dict[str, int], List[Dict[str, Any]]]:
+    """Sumarul unei verificări per disciplină și lista rândurilor cu erori."""
+    present = cols.present(*fields)
+    failed = np.flatnonzero(present & ~ok)
+    sumar = {
+        'verificate': int(present.sum()),
+        'erori': int(failed.size),
+        'lipsa': int(cols.count - present.sum())
+    }
+    # Doar rândurile cu erori ies din numpy, ca liste Python
+    valori = valoare[failed].tolist()
+    calculate = calculat[failed].tolist() if calculat is not None else None
+    erori = []
+    for j, i in enumerate(failed.tolist()):
+        eroare = {
+            'cod': cols.cod[i],
+            'verificare': name,
+            'valoare': _value(valori[j]),
+            'mesaj': mesaj
+        }
+        if calculate is not None:
+            eroare['valoare_calculata'] = _value(calculate[j])
+        erori.append(eroare)
+    return sumar, erori
+
+
+def audit_columns(cols: PlanColumns) -> Dict[str, Any]:
+    """
+    Verifică toate constrângerile pe disciplinele în formă coloanară.
+
+    Returns:
+        Dicționar cu status, sumar per verificare, erorile per disciplină
+        și creditele per semestru
+    """
+    credite = cols['credite']
+    total_semestru = cols['total_ore_semestru']
+    total_plan = cols['total_ore_plan']
+    total_studiu = cols['total_ore_studiu_individual']
+    examinari = cols['examinari']
+    minim, maxim = INTERVAL_EXAMINARI
+
+    din_credite = credite * ORE_PER_CREDIT
+    suma_studiu = cols['studiu_manual'] + cols['documentare'] + cols['pregatire_seminarii']
+    suma_semestru = total_plan + total_studiu
+
+    checks = [
+        ('total_semestru_din_credite', ('credite', 'total_ore_semestru'),
+         total_semestru == din_credite, total_semestru, din_credite,
+         f'Total ore semestru nu este egal cu credite × {ORE_PER_CREDIT}'),
+        ('total_studiu_suma', ('total_ore_studiu_individual', 'studiu_manual', 'documentare', 'pregatire_seminarii'),
+         total_studiu == suma_studiu, total_studiu, suma_studiu,
+         'Total ore studiu nu este suma componentelor'),
+        ('total_semestru_suma', ('total_ore_semestru', 'total_ore_plan', 'total_ore_studiu_individual'),
+         total_semestru == suma_semestru, total_semestru, suma_semestru,
+         'Total ore semestru nu este suma ore plan + studiu'),
+        ('ore_examinari', ('examinari',),
+         (examinari >= minim) & (examinari <= maxim), examinari, None,
+         f'Ore examinări trebuie să fie între {minim} și {maxim}')
+    ]
+
+    sumar: Dict[str, Dict[str, int]] = {}
+    erori: List[Dict[str, Any]] = []
+    for name, fields, ok, valoare, calculat, mesaj in checks:
+        sumar[name], check_erori = _row_check(cols, name, fields, ok, valoare, calculat, mesaj)
+        erori.extend(check_erori)
+
+    # Creditele per semestru: grupare după (an, semestru) și sumă ponderată
+    semestre = []
+    has_semestru = cols.present('an', 'semestru')
+    if has_semestru.any():
+        # Cheie scalară an × 1000 + semestru (np.unique pe o coloană e mult mai rapid decât pe perechi)
+        keys = cols['an'][has_semestru] * 1000 + cols['semestru'][has_semestru]
+        unique, inverse = np.unique(keys, return_inverse=True)
+        sume = np.bincount(inverse, weights=np.nan_to_num(credite[has_semestru]), minlength=len(unique))
+        for key, suma in zip(unique.tolist(), sume.tolist()):
+            an, semestru = divmod(int(key), 1000)
+            ok = suma == CREDITE_PER_SEMESTRU
+            semestre.append({
+                'an': an,
+                'semestru': semestru,
+                'credite': int(suma),
+                'status': 'ok' if ok else 'error',
+                'mesaj': None if ok else f'Suma creditelor ({int(suma)}) diferă de {CREDITE_PER_SEMESTRU}'
+            })
+    semestre_erori = sum(1 for sem in semestre if sem['status'] == 'error')
+    sumar['credite_semestru'] = {
+        'verificate': len(semestre),
+        'erori': semestre_erori,
+        'lipsa': int(cols.count - has_semestru.sum())
+    }
+
+    return {
+        'status': 'error' if erori or semestre_erori else 'ok',
+        'discipline_count': cols.count,
+        'sumar': sumar,
+        'erori': erori,
+        'semestre': semestre
+    }
+
+
+def audit_plan(plan_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Auditul de consistență al întregului plan.
+
+    Args:
+        plan_data: Planul, în formatul returnat de `load_plan_invatamant`
+
+    Returns:
+        Rezultatul `audit_columns`, plus durata auditului în milisecunde
+    """
+    start = time.perf_counter()
+    rezultat = audit_columns(PlanColumns(plan_data['discipline']))
+    rezultat['durata_ms'] = round((time.perf_counter() - start) * 1000, 3)
+    return rezultat
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+    import sys
+
+    parser = argparse.ArgumentParser(description='Auditul de consistență al planului de învățământ')
+    parser.add_argument('plan', nargs='?', default='plan_invatamant.json', help='Fișierul JSON cu planul')
+    parser.add_argument('--json', action='store_true', help='Afișează rezultatul complet ca JSON')
+    args = parser.parse_args()
+
+    with open(args.plan, encoding='utf-8') as f:
+        plan = json.load(f)
+    rezultat = audit_plan(plan)
+
+    if args.json:
+        print(json.dumps(rezultat, indent=2, ensure_ascii=False))
+    else:
+        print(f"STATUS: {rezultat['status'].upper()} "
+              f"({rezultat['discipline_count']} discipline, {rezultat['durata_ms']} ms)")
+        for name, stats in rezultat['sumar'].items():
+            print(f"  {name:28} verificate: {stats['verificate']:5}  erori: {stats['erori']:5}  lipsă: {stats['lipsa']:5}")
+        for eroare in rezultat['erori']:
+            calculat = f" (calculat: {eroare['valoare_calculata']})" if 'valoare_calculata' in eroare else ''
+            print(f"  ✗ {eroare['cod']}: {eroare['mesaj']} – {eroare['valoare']}{calculat}")
+        for sem in rezultat['semestre']:
+            if sem['status'] == 'error':
+                print(f"  ✗ Anul {sem['an']}, semestrul {sem['semestru']}: {sem['mesaj']}")
+    sys.exit(1 if rezultat['status'] == 'error' else 0)
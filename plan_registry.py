@@ -0,0 +1,223 @@
+"""
+Registrul planurilor de învățământ, câte unul per program de studii și an universitar.
+
+Planurile sunt organizate în PLANS_DIR ca `<program>/<an universitar>.json`
+(ex. `planuri/IG/2024-2025.json`), iar cheia unui plan este
+`<program>/<an universitar>` (ex. `IG/2024-2025`). Fără program se folosește
+planul implicit (plan_invatamant.json), ca înainte.
+
+Un plan este încărcat doar la prima cerere care îl folosește și compilat o
+singură dată într-un snapshot binar (vezi plan_snapshot.py), deschis cu mmap
+și comun tuturor worker-ilor; un worker păstrează din plan doar indexurile
+după cod și denumire și disciplinele folosite recent.
+
+Planurile încărcate sunt urmărite și înlocuite atomic la modificarea
+fișierului (copy-on-write): o cerere își ia o singură dată planul și lucrează
+pe acel snapshot până la final, fără lock-uri.
+"""
+import asyncio
+import os
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from plan_snapshot import PlanSnapshot, load_snapshot
+
+
+# Cheia unui plan: programul (litere, cifre, '-', '_') și anul universitar;
+# exclude orice cale în afara directorului planurilor
+PROGRAM_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_-]*/\d{4}-\d{4}$')
+
+
+class UnknownProgramError(LookupError):
+    """Programul de studii cerut nu are un plan de învățământ."""
+
+
+class PlanRegistry:
+    """
+    Planurile de învățământ ale tuturor programelor, încărcate la cerere.
+
+    Un plan invalid nu înlocuiește planul deja încărcat; unul care nu poate
+    fi încărcat deloc produce eroarea la fiecare cerere, până la corectare.
+    """
+
+    def __init__(
+        self,
+        plans_dir: str,
+        default_path: str,
+        snapshot_dir: str,
+        poll_interval: float = 5.0
+    ):
+        """
+        Args:
+            plans_dir: Directorul cu planurile programelor (`<program>/<an>.json`)
+            default_path: Planul folosit când cererea nu specifică programul
+            snapshot_dir: Directorul snapshot-urilor compilate (comun worker-ilor)
+            poll_interval: Intervalul de verificare a planurilor încărcate, în
+                secunde (0 dezactivează urmărirea automată)
+        """
+        self.plans_dir = plans_dir
+        self.default_path = default_path
+        self.snapshot_dir = snapshot_dir
+        self.poll_interval = poll_interval
+        self._plans: Dict[Optional[str], PlanSnapshot] = {}
+        self._signatures: Dict[Optional[str], Tuple[int, int, int]] = {}
+        self._listeners: List[Callable[[Optional[str], Optional[PlanSnapshot], PlanSnapshot], None]] = []
+        self._lock = threading.Lock()
+
+    def path_for(self, program: Optional[str]) -> str:
+        """
+        Fișierul planului unui program (planul implicit pentru None).
+
+        Raises:
+            UnknownProgramError: dacă cheia programului nu este validă
+        """
+        if program is None:
+            return self.default_path
+        if not PROGRAM_PATTERN.match(program):
+            raise UnknownProgramError(
+                f"Program invalid: {program!r} (format așteptat: <program>/<an>, ex. IG/2024-2025)"
+            )
+        return os.path.join(self.plans_dir, f'{program}.json')
+
+    def _file_signature(self, program: Optional[str]) -> Tuple[int, int, int]:
+        try:
+            stat = os.stat(self.path_for(program))
+        except FileNotFoundError:
+            raise UnknownProgramError(f"Nu există plan de învățământ pentru programul {program}")
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def get(self, program: Optional[str] = None) -> PlanSnapshot:
+        """
+        Planul programului dat, încărcat (și compilat) la prima utilizare.
+
+        Raises:
+            UnknownProgramError: dacă programul nu are plan
+            ValueError, OSError: dacă planul nu poate fi încărcat
+        """
+        plan = self._plans.get(program)
+        if plan is not None:
+            return plan
+        with self._lock:
+            plan = self._plans.get(program)
+            if plan is None:
+                signature = self._file_signature(program)
+                plan = load_snapshot(self.path_for(program), self.snapshot_dir)
+                self._signatures[program] = signature
+                self._install(program, plan)
+        return plan
+
+    async def get_async(self, program: Optional[str] = None) -> PlanSnapshot:
+        """Varianta async a `get`: doar prima încărcare rulează într-un thread separat."""
+        plan = self._plans.get(program)
+        if plan is not None:
+            return plan
+        return await asyncio.to_thread(self.get, program)
+
+    @property
+    def current(self) -> PlanSnapshot:
+        """Planul implicit."""
+        return self.get(None)
+
+    def programs(self) -> List[str]:
+        """Programele (`<program>/<an>`) care au un plan în directorul planurilor."""
+        try:
+            entries = sorted(os.scandir(self.plans_dir), key=lambda entry: entry.name)
+        except FileNotFoundError:
+            return []
+        programs = []
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            for name in sorted(os.listdir(entry.path)):
+                program = f'{entry.name}/{name[:-len(".json")]}'
+                if name.endswith('.json') and PROGRAM_PATTERN.match(program):
+                    programs.append(program)
+        return programs
+
+    def loaded(self) -> Dict[Optional[str], PlanSnapshot]:
+        """Planurile încărcate în acest proces (None pentru planul implicit)."""
+        return dict(self._plans)
+
+    def on_reload(
+        self,
+        listener: Callable[[Optional[str], Optional[PlanSnapshot], PlanSnapshot], None]
+    ) -> None:
+        """
+        Înregistrează o funcție apelată după fiecare încărcare sau înlocuire
+        a unui plan, cu programul, planul vechi (None la prima încărcare) și
+        planul nou.
+        """
+        self._listeners.append(listener)
+
+    def _install(self, program: Optional[str], plan: PlanSnapshot) -> bool:
+        old = self._plans.get(program)
+        if old is not None and old.version == plan.version:
+            return False
+        # Planul vechi rămâne mapat cât timp îl folosesc cererile aflate în lucru
+        self._plans[program] = plan
+        for listener in self._listeners:
+            listener(program, old, plan)
+        return True
+
+    def reload(self, program: Optional[str] = None, force: bool = False) -> bool:
+        """
+        Reîncarcă planul dacă fișierul s-a schimbat (sau mereu, cu `force`).
+
+        Un plan neîncărcat încă este doar încărcat.
+
+        Returns:
+            True dacă planul a fost înlocuit cu o versiune nouă
+
+        Raises:
+            UnknownProgramError: dacă programul nu are plan
+            ValueError, OSError: dacă fișierul nu poate fi încărcat; planul
+                curent rămâne neschimbat
+        """
+        if program not in self._plans:
+            self.get(program)
+            return False
+        signature = self._file_signature(program)
+        if not force and signature == self._signatures.get(program):
+            return False
+        try:
+            plan = load_snapshot(self.path_for(program), self.snapshot_dir)
+        finally:
+            # Un fișier invalid nu este reîncercat până la următoarea modificare
+            self._signatures[program] = signature
+        return self._install(program, plan)
+
+    async def reload_async(self, program: Optional[str] = None, force: bool = False) -> bool:
+        """
+        Varianta async a `reload`: citirea și compilarea rulează într-un thread
+        separat, iar înlocuirea referinței (și notificările) în event loop.
+        """
+        if program not in self._plans:
+            await self.get_async(program)
+            return False
+        signature = await asyncio.to_thread(self._file_signature, program)
+        if not force and signature == self._signatures.get(program):
+            return False
+        try:
+            plan = await asyncio.to_thread(load_snapshot, self.path_for(program), self.snapshot_dir)
+        finally:
+            self._signatures[program] = signature
+        return self._install(program, plan)
+
+    async def watch(self, on_error: Optional[Callable[[Optional[str], Exception], None]] = None) -> None:
+        """
+        Verifică periodic fișierele planurilor încărcate și le reîncarcă la modificare.
+
+        Un plan invalid (sau șters) este raportat prin `on_error` și ignorat
+        până la următoarea modificare a fișierului; planul încărcat rămâne în uz.
+        """
+        if self.poll_interval <= 0:
+            return
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            for program in list(self._plans):
+                try:
+                    await self.reload_async(program)
+                except (LookupError, OSError, ValueError) as e:
+                    if on_error is not None:
+                        on_error(program, e)
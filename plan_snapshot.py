@@ -0,0 +1,413 @@
+"""
+Snapshot binar, read-only, al unui plan de învățământ.
+
+Un `PlanStore` ține în fiecare worker uvicorn planul parsat (dicționare
+Python, de câteva ori mai mari decât JSON-ul) plus indexurile lui; cu zeci de
+programe de studii și mai mulți worker-i, memoria se multiplică. Planul este
+compilat o singură dată într-un fișier binar compact, deschis apoi cu mmap
+de toți worker-ii: paginile sunt comune (page cache), iar un worker în plus
+nu mai adaugă o copie a planului.
+
+Structura fișierului (little-endian):
+
+- antet: `SNAPSHOT_MAGIC`, numărul de discipline, tabelul secțiunilor
+  (offset, lungime);
+- secțiunile JSON gata de servit: planul (/api/plan), lista disciplinelor
+  (/api/discipline) și auditul (/api/plan/audit);
+- JSON-ul fiecărei discipline, materializat la cerere (`get_disciplina`);
+- tabelul disciplinelor, cu înregistrări de lungime fixă (`_RECORD`):
+  JSON-ul, codul, categoria, anul, semestrul și grupul (an, semestru),
+  pentru filtre;
+- indexurile după cod și după denumirea normalizată, sortate (căutare binară);
+- textele (UTF-8) referite de tabel și de indexuri.
+
+`PlanSnapshot` oferă aceeași interfață ca `PlanStore` (validarea, /api/plan,
+/api/discipline, auditul), deci cele două sunt interschimbabile.
+"""
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from matching import NameIndex, normalize_name
+from models import DisciplinaPlan
+from plan_audit import audit_plan
+from plan_store import MAX_FILTERED_RESPONSES, PlanStore, check_plan
+from serialization import dumps, loads
+
+
+# Se incrementează la orice schimbare a formatului sau a conținutului
+# derivat (ex. auditul); snapshot-urile vechi sunt recompilate
+SNAPSHOT_VERSION = 1
+SNAPSHOT_MAGIC = b'FPLAN\x00\x00' + bytes([SNAPSHOT_VERSION])
+
+# Disciplinele materializate păstrate per snapshot și per proces
+MAX_CACHED_DISCIPLINE = 256
+
+# Secțiunile fișierului, în ordinea din tabelul secțiunilor
+_SECTIONS = ('version', 'plan', 'summaries', 'audit', 'discipline', 'records', 'by_cod', 'by_name', 'strings')
+
+_HEADER = struct.Struct(f'<8sI{2 * len(_SECTIONS)}Q')
+# JSON (offset, lungime), cod (offset, lungime), categoria (offset, lungime), an,
+# semestru, grupul (an, semestru) în ordinea primei apariții în plan
+_RECORD = struct.Struct('<IIIIIIiiI')
+# Intrare de index: text (offset, lungime), indexul disciplinei
+_INDEX_ENTRY = struct.Struct('<III')
+
+# Valorile lipsă (sau care nu sunt numere întregi) din tabelul disciplinelor
+_MISSING_TEXT = 0xFFFFFFFF
+_MISSING_INT = -2 ** 31
+
+
+def snapshot_version(raw: bytes) -> str:
+    """Versiunea planului: hash-ul SHA-256 trunchiat al fișierului (ca la `PlanStore.from_file`)."""
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+def _int_column(value: Any) -> int:
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, int) and -2 ** 31 < value < 2 ** 31:
+        return value
+    return _MISSING_INT
+
+
+def compile_snapshot(plan_data: Dict[str, Any], version: str) -> bytes:
+    """
+    Compilează planul (deja verificat cu `check_plan`) în formatul binar.
+
+    Args:
+        plan_data: Planul, în formatul returnat de `load_plan_invatamant`
+        version: Versiunea planului
+
+    Returns:
+        Conținutul fișierului snapshot
+    """
+    discipline = plan_data['discipline']
+    strings = bytearray()
+    interned: Dict[str, Tuple[int, int]] = {}
+
+    def text(value: Any) -> Tuple[int, int]:
+        if not isinstance(value, str):
+            return _MISSING_TEXT, 0
+        ref = interned.get(value)
+        if ref is None:
+            encoded = value.encode('utf-8')
+            ref = interned[value] = (len(strings), len(encoded))
+            strings.extend(encoded)
+        return ref
+
+    disc_json = bytearray()
+    records = bytearray()
+    by_cod: Dict[str, int] = {}
+    by_name: Dict[str, int] = {}
+    groups: Dict[str, int] = {}
+    for idx, disc in enumerate(discipline):
+        body = dumps(disc)
+        # Cheia grupului păstrează valorile originale (ex. None și 'II' sunt grupuri diferite)
+        group = groups.setdefault(dumps([disc.get('an'), disc.get('semestru')]).decode('utf-8'), len(groups))
+        records.extend(_RECORD.pack(
+            len(disc_json), len(body),
+            *text(disc['cod']), *text(disc.get('categoria')),
+            _int_column(disc.get('an')), _int_column(disc.get('semestru')), group
+        ))
+        disc_json.extend(body)
+        # La coduri sau denumiri duplicate, prima apariție câștigă (ca în PlanStore)
+        if isinstance(disc['cod'], str):
+            by_cod.setdefault(disc['cod'], idx)
+        for key in ('denumire_ro', 'denumire_en'):
+            name = normalize_name(disc.get(key))
+            if name:
+                by_name.setdefault(name, idx)
+
+    def index(entries: Dict[str, int]) -> bytes:
+        out = bytearray()
+        for value, idx in sorted(entries.items(), key=lambda item: item[0].encode('utf-8')):
+            out.extend(_INDEX_ENTRY.pack(*text(value), idx))
+        return bytes(out)
+
+    sections = {
+        'version': version.encode('utf-8'),
+        'plan': dumps(plan_data),
+        'summaries': dumps({"discipline": PlanStore.summaries(discipline)}),
+        'audit': dumps({"plan_version": version, **audit_plan(plan_data)}),
+        'discipline': bytes(disc_json),
+        'records': bytes(records),
+        'by_cod': index(by_cod),
+        'by_name': index(by_name),
+    }
+    sections['strings'] = bytes(strings)
+
+    table = []
+    offset = _HEADER.size
+    for name in _SECTIONS:
+        table.extend((offset, len(sections[name])))
+        offset += len(sections[name])
+    header = _HEADER.pack(SNAPSHOT_MAGIC, len(discipline), *table)
+    return header + b''.join(sections[name] for name in _SECTIONS)
+
+
+def write_snapshot(path: str, content: bytes) -> None:
+    """Scrie atomic snapshot-ul (worker-ii care îl deschid simultan văd fie nimic, fie tot fișierul)."""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.plan')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class PlanSnapshot:
+    """
+    Planul de învățământ citit direct din snapshot-ul mapat în memorie.
+
+    Disciplinele sunt materializate (dicționare) doar la cerere; răspunsurile
+    JSON ale planului sunt citite din fișier așa cum au fost serializate.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Fișierul snapshot (vezi `compile_snapshot`)
+
+        Raises:
+            ValueError: dacă fișierul nu este un snapshot valid, în formatul curent
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            try:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f"Snapshot gol: {path}")
+        if len(self._mm) < _HEADER.size:
+            raise ValueError(f"Snapshot incomplet: {path}")
+        magic, count, *table = _HEADER.unpack_from(self._mm, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"Snapshot în alt format: {path}")
+        self._sections = {
+            name: (table[2 * i], table[2 * i + 1]) for i, name in enumerate(_SECTIONS)
+        }
+        end = max(offset + length for offset, length in self._sections.values())
+        if end > len(self._mm):
+            raise ValueError(f"Snapshot incomplet: {path}")
+
+        self.discipline_count = count
+        self.version = self._section('version').decode('utf-8')
+        self._records = self._sections['records'][0]
+        self._discipline_offset = self._sections['discipline'][0]
+        self._strings = self._sections['strings'][0]
+        self._by_cod = self._index('by_cod')
+        self._by_name = self._index('by_name')
+        self._cache: 'OrderedDict[int, DisciplinaPlan]' = OrderedDict()
+        self._filtered_json: Dict[Tuple[Any, Any, Any], bytes] = {}
+        self._name_index: Optional[NameIndex] = None
+        self._lock = threading.Lock()
+
+    # -- Citirea secțiunilor ------------------------------------------------
+
+    def _section(self, name: str) -> bytes:
+        offset, length = self._sections[name]
+        return self._mm[offset:offset + length]
+
+    def _text(self, offset: int, length: int) -> Optional[str]:
+        if offset == _MISSING_TEXT:
+            return None
+        start = self._strings + offset
+        return self._mm[start:start + length].decode('utf-8')
+
+    def _index(self, name: str) -> List[Tuple[bytes, int]]:
+        # Doar cheile (cod / denumire) sunt copiate; disciplinele rămân în fișier
+        offset, length = self._sections[name]
+        entries = []
+        for pos in range(offset, offset + length, _INDEX_ENTRY.size):
+            text_offset, text_length, idx = _INDEX_ENTRY.unpack_from(self._mm, pos)
+            start = self._strings + text_offset
+            entries.append((self._mm[start:start + text_length], idx))
+        return entries
+
+    def _lookup(self, entries: List[Tuple[bytes, int]], key: str) -> Optional[int]:
+        encoded = key.encode('utf-8')
+        pos = bisect.bisect_left(entries, (encoded, -1))
+        if pos < len(entries) and entries[pos][0] == encoded:
+            return entries[pos][1]
+        return None
+
+    def _record(self, idx: int) -> Tuple[int, ...]:
+        return _RECORD.unpack_from(self._mm, self._records + idx * _RECORD.size)
+
+    def disciplina(self, idx: int) -> DisciplinaPlan:
+        """Disciplina cu indexul dat (în ordinea din plan), materializată."""
+        with self._lock:
+            disc = self._cache.get(idx)
+            if disc is not None:
+                self._cache.move_to_end(idx)
+                return disc
+        offset, length = self._record(idx)[:2]
+        start = self._discipline_offset + offset
+        disc = loads(self._mm[start:start + length])
+        with self._lock:
+            self._cache[idx] = disc
+            while len(self._cache) > MAX_CACHED_DISCIPLINE:
+                self._cache.popitem(last=False)
+        return disc
+
+    # -- Interfața PlanStore ------------------------------------------------
+
+    @property
+    def plan_json(self) -> bytes:
+        """Răspunsul /api/plan."""
+        return self._section('plan')
+
+    @property
+    def discipline_json(self) -> bytes:
+        """Răspunsul /api/discipline (nefiltrat)."""
+        return self._section('summaries')
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """Planul complet, materializat (pentru operații rare, ex. randarea unei pagini)."""
+        return loads(self.plan_json)
+
+    @property
+    def discipline(self) -> List[DisciplinaPlan]:
+        """Lista completă de discipline, materializată, în ordinea din plan."""
+        return self.data['discipline']
+
+    def etag(self, resource: str) -> str:
+        """ETag puternic pentru o resursă derivată din această versiune a planului."""
+        return f'"{self.version}-{resource}"'
+
+    def get_disciplina(self, cod: Optional[str]) -> Optional[DisciplinaPlan]:
+        """Disciplina cu codul dat, sau None."""
+        if not isinstance(cod, str):
+            return None
+        idx = self._lookup(self._by_cod, cod)
+        return self.disciplina(idx) if idx is not None else None
+
+    def find_by_name(self, denumire: Optional[str]) -> Optional[DisciplinaPlan]:
+        """Disciplina cu denumirea (română sau engleză) dată, după normalizare."""
+        name = normalize_name(denumire)
+        idx = self._lookup(self._by_name, name) if name else None
+        return self.disciplina(idx) if idx is not None else None
+
+    def match_by_name(self, denumire: Optional[str]) -> Optional[Tuple[DisciplinaPlan, float]]:
+        """
+        Disciplina cu denumirea cea mai apropiată (potrivire aproximativă).
+
+        Indexul aproximativ este construit la prima utilizare (doar
+        denumirile), fiind necesar doar pentru fișele cu cod greșit.
+
+        Returns:
+            Tuplu (disciplină, scor), sau None dacă nicio denumire nu este
+            suficient de apropiată
+        """
+        disc = self.find_by_name(denumire)
+        if disc is not None:
+            return disc, 1.0
+        if self._name_index is None:
+            self._name_index = NameIndex(
+                {'denumire_ro': disc.get('denumire_ro'), 'denumire_en': disc.get('denumire_en'), 'index': idx}
+                for idx, disc in enumerate(self.discipline)
+            )
+        match = self._name_index.best_match(denumire)
+        if match is None:
+            return None
+        entry, scor = match
+        return self.disciplina(entry['index']), scor
+
+    def filter(
+        self,
+        an: Optional[int] = None,
+        semestru: Optional[int] = None,
+        categoria: Optional[str] = None
+    ) -> List[DisciplinaPlan]:
+        """Disciplinele dintr-un an/semestru și/sau dintr-o categorie (ordinea din `PlanStore.filter`)."""
+        if an is None and semestru is None and categoria is None:
+            return self.discipline
+        groups: Dict[int, List[int]] = {}
+        for idx in range(self.discipline_count):
+            _, _, _, _, cat_offset, cat_length, disc_an, disc_sem, group = self._record(idx)
+            if an is not None and disc_an != an:
+                continue
+            if semestru is not None and disc_sem != semestru:
+                continue
+            if categoria is not None and self._text(cat_offset, cat_length) != categoria:
+                continue
+            # Gruparea după (an, semestru) păstrează ordinea rezultatelor din PlanStore
+            groups.setdefault(group, []).append(idx)
+        if an is None and semestru is None:
+            indexes = sorted(idx for members in groups.values() for idx in members)
+        else:
+            indexes = [idx for group in sorted(groups) for idx in groups[group]]
+        return [self.disciplina(idx) for idx in indexes]
+
+    def audit(self) -> Dict[str, Any]:
+        """Auditul de consistență al planului, calculat la compilarea snapshot-ului."""
+        audit = loads(self.audit_json())
+        audit.pop('plan_version', None)
+        return audit
+
+    def audit_json(self) -> bytes:
+        """Răspunsul /api/plan/audit."""
+        return self._section('audit')
+
+    @staticmethod
+    def summaries(discipline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Forma scurtă a disciplinelor, folosită de /api/discipline."""
+        return PlanStore.summaries(discipline)
+
+    def discipline_json_for(
+        self,
+        an: Optional[int] = None,
+        semestru: Optional[int] = None,
+        categoria: Optional[str] = None
+    ) -> bytes:
+        """Răspunsul /api/discipline (filtrat), serializat o singură dată per filtru."""
+        if an is None and semestru is None and categoria is None:
+            return self.discipline_json
+        key = (an, semestru, categoria)
+        body = self._filtered_json.get(key)
+        if body is None:
+            body = dumps({"discipline": self.summaries(self.filter(an, semestru, categoria))})
+            if len(self._filtered_json) < MAX_FILTERED_RESPONSES:
+                self._filtered_json[key] = body
+        return body
+
+    def close(self) -> None:
+        """Închide maparea (după ce nicio cerere nu mai folosește snapshot-ul)."""
+        self._mm.close()
+
+
+def load_snapshot(plan_path: str, snapshot_dir: str) -> PlanSnapshot:
+    """
+    Snapshot-ul planului din fișierul dat, compilat dacă nu există încă.
+
+    Snapshot-ul se numește după versiunea planului (hash-ul fișierului), deci
+    worker-ii care încarcă același plan deschid același fișier, iar o versiune
+    nouă a planului primește un snapshot nou.
+
+    Raises:
+        ValueError, OSError: dacă planul nu poate fi încărcat
+    """
+    with open(plan_path, 'rb') as f:
+        raw = f.read()
+    version = snapshot_version(raw)
+    path = os.path.join(snapshot_dir, f'{version}.plan')
+    try:
+        return PlanSnapshot(path)
+    except (OSError, ValueError):
+        pass
+    plan_data = json.loads(raw.decode('utf-8'))
+    check_plan(plan_data)
+    write_snapshot(path, compile_snapshot(plan_data, version))
+    return PlanSnapshot(path)
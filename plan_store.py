@@ -0,0 +1,211 @@
+"""
+Modul pentru planul de învățământ indexat.
+
+`PlanStore` se construiește o singură dată din fișierul planului (același
+format ca `load_plan_invatamant`) și oferă căutări directe (după cod, an/semestru, categorie, denumire) în locul
+parcurgerii liniare a listei `discipline`, plus răspunsurile API
+pre-serializate, cu ETag derivat din versiunea planului. Denumirile sunt
+indexate și pentru căutarea aproximativă (vezi `matching.NameIndex`).
+
+Aplicația folosește varianta compilată și partajată între worker-i a
+planului (`plan_snapshot.PlanSnapshot`, cu aceeași interfață), prin registrul
+planurilor (plan_registry.py); `PlanStore` rămâne pentru utilitarele care
+încarcă un singur plan (bulk.py, benchmark-uri).
+"""
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from matching import NameIndex, normalize_name
+from models import DisciplinaPlan
+from plan_audit import audit_plan
+from serialization import dumps
+
+
+# Numărul maxim de răspunsuri filtrate păstrate serializate per versiune de plan
+MAX_FILTERED_RESPONSES = 256
+
+
+# Câmpurile fiecărei discipline folosite de validare
+REQUIRED_FIELDS = ('cod', 'denumire_ro', 'denumire_en', 'categoria', 'credite', 'nr_ore_saptamana')
+REQUIRED_ORE = ('curs', 'seminar', 'proiect', 'lucrari')
+
+
+def check_plan(plan_data: Any) -> None:
+    """
+    Verifică structura planului înainte de a fi folosit.
+
+    Raises:
+        ValueError: dacă planul nu are structura așteptată
+    """
+    if not isinstance(plan_data, dict) or not isinstance(plan_data.get('discipline'), list):
+        raise ValueError("Planul trebuie să conțină lista 'discipline'")
+    for i, disc in enumerate(plan_data['discipline']):
+        if not isinstance(disc, dict):
+            raise ValueError(f"Disciplina #{i} nu este un obiect")
+        missing = [field for field in REQUIRED_FIELDS if field not in disc]
+        if missing:
+            raise ValueError(f"Disciplina #{i} ({disc.get('cod')}) nu are câmpurile: {', '.join(missing)}")
+        ore = disc['nr_ore_saptamana']
+        if not isinstance(ore, dict) or any(tip not in ore for tip in REQUIRED_ORE):
+            raise ValueError(f"Disciplina {disc['cod']} are 'nr_ore_saptamana' incomplet")
+
+
+class PlanStore:
+    """
+    Planul de învățământ indexat, tratat ca read-only după construire.
+    """
+
+    def __init__(self, plan_data: Dict[str, Any], version: str):
+        """
+        Args:
+            plan_data: Planul, în formatul returnat de `load_plan_invatamant`
+            version: Versiunea planului (de regulă hash-ul fișierului)
+        """
+        self.data = plan_data
+        self.version = version
+
+        discipline = plan_data['discipline']
+        self._by_cod: Dict[str, DisciplinaPlan] = {}
+        self._by_an_semestru: Dict[Tuple[Any, Any], List[DisciplinaPlan]] = {}
+        self._by_categoria: Dict[Any, List[DisciplinaPlan]] = {}
+        self._by_name: Dict[str, DisciplinaPlan] = {}
+
+        for disc in discipline:
+            # La coduri duplicate, prima apariție câștigă (ca în căutarea liniară)
+            self._by_cod.setdefault(disc['cod'], disc)
+            self._by_an_semestru.setdefault((disc.get('an'), disc.get('semestru')), []).append(disc)
+            self._by_categoria.setdefault(disc.get('categoria'), []).append(disc)
+            for key in ('denumire_ro', 'denumire_en'):
+                name = normalize_name(disc.get(key))
+                if name:
+                    self._by_name.setdefault(name, disc)
+        self._name_index = NameIndex(discipline)
+
+        # Răspunsurile API, serializate o singură dată per versiune de plan
+        self.plan_json = dumps(plan_data)
+        self.discipline_json = dumps({"discipline": self.summaries(discipline)})
+        self._filtered_json: Dict[Tuple[Any, Any, Any], bytes] = {}
+        self._audit: Optional[Dict[str, Any]] = None
+        self._audit_json: Optional[bytes] = None
+
+    @classmethod
+    def from_file(cls, file_path: str) -> 'PlanStore':
+        """
+        Încarcă, verifică și indexează planul din fișierul JSON.
+
+        Fișierul este citit o singură dată, astfel încât versiunea (hash-ul
+        SHA-256 trunchiat al conținutului) corespunde exact datelor încărcate.
+
+        Raises:
+            ValueError: dacă fișierul nu este un plan valid
+        """
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        plan_data = json.loads(raw.decode('utf-8'))
+        check_plan(plan_data)
+        return cls(plan_data, hashlib.sha256(raw).hexdigest()[:16])
+
+    @property
+    def discipline(self) -> List[DisciplinaPlan]:
+        """Lista completă de discipline, în ordinea din plan."""
+        return self.data['discipline']
+
+    @property
+    def discipline_count(self) -> int:
+        """Numărul de discipline din plan."""
+        return len(self.data['discipline'])
+
+    def etag(self, resource: str) -> str:
+        """ETag puternic pentru o resursă derivată din această versiune a planului."""
+        return f'"{self.version}-{resource}"'
+
+    def get_disciplina(self, cod: Optional[str]) -> Optional[DisciplinaPlan]:
+        """Disciplina cu codul dat, sau None."""
+        return self._by_cod.get(cod)
+
+    def find_by_name(self, denumire: Optional[str]) -> Optional[DisciplinaPlan]:
+        """Disciplina cu denumirea (română sau engleză) dată, după normalizare."""
+        return self._by_name.get(normalize_name(denumire))
+
+    def match_by_name(self, denumire: Optional[str]) -> Optional[Tuple[DisciplinaPlan, float]]:
+        """
+        Disciplina cu denumirea cea mai apropiată (potrivire aproximativă).
+
+        Returns:
+            Tuplu (disciplină, scor), sau None dacă nicio denumire nu este
+            suficient de apropiată
+        """
+        disc = self.find_by_name(denumire)
+        if disc is not None:
+            return disc, 1.0
+        return self._name_index.best_match(denumire)
+
+    def filter(
+        self,
+        an: Optional[int] = None,
+        semestru: Optional[int] = None,
+        categoria: Optional[str] = None
+    ) -> List[DisciplinaPlan]:
+        """Disciplinele dintr-un an/semestru și/sau dintr-o categorie."""
+        if an is not None and semestru is not None:
+            result = self._by_an_semestru.get((an, semestru), [])
+        elif an is not None or semestru is not None:
+            result = [
+                disc
+                for (disc_an, disc_sem), group in self._by_an_semestru.items()
+                if (an is None or disc_an == an) and (semestru is None or disc_sem == semestru)
+                for disc in group
+            ]
+        elif categoria is not None:
+            return self._by_categoria.get(categoria, [])
+        else:
+            return self.discipline
+
+        if categoria is not None:
+            result = [disc for disc in result if disc.get('categoria') == categoria]
+        return result
+
+    def audit(self) -> Dict[str, Any]:
+        """Auditul de consistență al planului (vezi plan_audit.py), calculat o singură dată."""
+        if self._audit is None:
+            self._audit = audit_plan(self.data)
+        return self._audit
+
+    def audit_json(self) -> bytes:
+        """Răspunsul /api/plan/audit, serializat o singură dată."""
+        if self._audit_json is None:
+            self._audit_json = dumps({"plan_version": self.version, **self.audit()})
+        return self._audit_json
+
+    @staticmethod
+    def summaries(discipline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Forma scurtă a disciplinelor, folosită de /api/discipline."""
+        return [
+            {
+                "cod": disc["cod"],
+                "denumire_ro": disc["denumire_ro"],
+                "an": disc.get("an", "N/A"),
+                "semestru": disc.get("semestru", "N/A"),
+                "credite": disc.get("credite", "N/A")
+            }
+            for disc in discipline
+        ]
+
+    def discipline_json_for(
+        self,
+        an: Optional[int] = None,
+        semestru: Optional[int] = None,
+        categoria: Optional[str] = None
+    ) -> bytes:
+        """Răspunsul /api/discipline (filtrat), serializat o singură dată per filtru."""
+        if an is None and semestru is None and categoria is None:
+            return self.discipline_json
+        key = (an, semestru, categoria)
+        body = self._filtered_json.get(key)
+        if body is None:
+            body = dumps({"discipline": self.summaries(self.filter(an, semestru, categoria))})
+            if len(self._filtered_json) < MAX_FILTERED_RESPONSES:
+                self._filtered_json[key] = body
+        return body
+
@@ -0,0 +1,169 @@
+"""
+Răspunsuri pre-calculate, servite din memorie.
+
+Paginile și listele care depind doar de versiunea planului (pagina
+principală, /api/discipline, /api/plan) sunt serializate și comprimate o
+singură dată per versiune: gzip și, dacă modulul opțional `brotli` este
+instalat, br. La fiecare cerere se alege doar varianta potrivită header-ului
+Accept-Encoding și se compară ETag-ul (304 Not Modified), fără randare,
+serializare sau compresie.
+
+Fiecare variantă are propriul ETag puternic (ex. "v-home" și "v-home-gzip"),
+iar răspunsurile poartă `Vary: Accept-Encoding`, ca proxy-urile și
+browserele să nu amestece variantele.
+"""
+import gzip
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Tuple
+
+from fastapi.requests import Request
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:  # dependență opțională: fără brotli se servesc doar gzip și identity
+    brotli = None
+
+
+# Corpurile mai mici nu sunt comprimate (câștigul nu acoperă header-ele)
+MIN_COMPRESS_SIZE = 512
+
+# Numărul maxim de răspunsuri păstrate (ETag-urile conțin versiunea planului,
+# deci cele ale versiunilor vechi ies treptat din cache)
+MAX_CACHED_RESPONSES = 256
+
+# Ordinea de preferință la calitate egală în Accept-Encoding
+ENCODINGS = ('br', 'gzip')
+
+
+class PrecompressedBody:
+    """
+    Un corp de răspuns cu variantele lui comprimate și ETag-urile lor.
+    """
+
+    __slots__ = ('variants',)
+
+    def __init__(self, body: bytes, etag: str):
+        """
+        Args:
+            body: Corpul necomprimat
+            etag: ETag-ul puternic al variantei necomprimate (cu ghilimele)
+        """
+        self.variants: Dict[str, Tuple[bytes, str]] = {'identity': (body, etag)}
+        if len(body) < MIN_COMPRESS_SIZE:
+            return
+        # mtime=0: aceeași intrare dă exact aceiași octeți (ETag stabil între worker-i)
+        compressed = {'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            compressed['br'] = brotli.compress(body, quality=11)
+        for encoding, data in compressed.items():
+            if len(data) < len(body):
+                self.variants[encoding] = (data, f'{etag[:-1]}-{encoding}"')
+
+    def select(self, accept_encoding: str) -> Tuple[str, bytes, str]:
+        """
+        Varianta potrivită pentru header-ul Accept-Encoding.
+
+        Returns:
+            Tuplu (encoding, corp, etag)
+        """
+        encoding = choose_encoding(accept_encoding, self.variants)
+        body, etag = self.variants[encoding]
+        return encoding, body, etag
+
+
+def choose_encoding(accept_encoding: str, available) -> str:
+    """
+    Codificarea cu cea mai mare calitate (q) acceptată de client dintre cele
+    disponibile; 'identity' dacă nu există niciuna.
+    """
+    if not accept_encoding:
+        return 'identity'
+    quality: Dict[str, float] = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        quality[name.strip().lower()] = q
+    wildcard = quality.get('*', 0.0)
+    best, best_q = 'identity', 0.0
+    for encoding in ENCODINGS:
+        if encoding not in available:
+            continue
+        q = quality.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """True dacă ETag-ul se află în lista din If-None-Match (comparație slabă, RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """
+    Corpurile pre-comprimate, indexate după ETag (LRU limitat).
+    """
+
+    def __init__(self, max_entries: int = MAX_CACHED_RESPONSES):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, PrecompressedBody]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag: str, build: Callable[[], bytes]) -> PrecompressedBody:
+        """
+        Corpul pentru ETag-ul dat; la prima cerere este construit cu `build`
+        și comprimat.
+        """
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is not None:
+                self._entries.move_to_end(etag)
+                return entry
+        # Construirea și compresia rulează în afara lock-ului; două cereri
+        # simultane pot construi același corp, rezultatul fiind identic
+        entry = PrecompressedBody(build(), etag)
+        with self._lock:
+            self._entries[etag] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def precompressed_response(
+    request: Request,
+    entry: PrecompressedBody,
+    media_type: str,
+    cache_control: str = 'no-cache'
+) -> Response:
+    """
+    Răspunsul pentru un corp pre-comprimat: 304 dacă clientul are deja
+    varianta aleasă, altfel corpul cu Content-Encoding potrivit.
+    """
+    encoding, body, etag = entry.select(request.headers.get('accept-encoding', ''))
+    headers = {'ETag': etag, 'Cache-Control': cache_control, 'Vary': 'Accept-Encoding'}
+    if etag_matches(request.headers.get('if-none-match', ''), etag):
+        return Response(status_code=304, headers=headers)
+    if encoding != 'identity':
+        headers['Content-Encoding'] = encoding
+    return Response(content=body, media_type=media_type, headers=headers)
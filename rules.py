@@ -0,0 +1,362 @@
+"""
+Motorul de reguli pentru validarea fișelor.
+
+Verificările sunt descrise declarativ (ca schema câmpurilor din
+fisa_schema.py) și compilate o singură dată într-un `RulePlan`: o listă plată
+de funcții, fiecare cu accesul la câmpuri deja rezolvat. Evaluarea unei fișe
+parcurge lista o singură dată și numără status-urile pe loc; mesajele sunt
+formatate doar pentru verificările care nu trec.
+
+Tipuri de reguli:
+- 'exact': câmpul din fișă == câmpul din plan
+- 'fuzzy': denumiri comparate cu `matching.compare_names`
+- 'formula': câmpul == (suma termenilor) × factor
+- 'interval': min <= câmpul <= max
+
+Câmpurile imbricate se scriu cu punct ('nr_ore_saptamana.curs'); mesajele
+sunt șabloane `str.format` cu valorile verificării. Opțional: 'severitate'
+('error' sau 'warning'), 'camp_plan' (dacă diferă de câmpul din fișă) și
+'optional' (regula 'exact' nu se aplică dacă planul nu are câmpul). Regulile
+suplimentare pot fi citite dintr-un fișier JSON (VALIDATION_RULES_FILE),
+fără modificări de cod; o regulă cu același `nume` ca una implicită o
+înlocuiește. Exemplu (tipul de evaluare față de plan):
+
+    [{"nume": "evaluare", "grup": "comparatie_plan", "tip": "exact",
+      "camp": "evaluare", "severitate": "warning", "optional": true,
+      "mesaj": "Tipul de evaluare ({valoare_fisa}) diferă de cel din plan ({valoare_plan})"}]
+"""
+import hashlib
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from matching import compare_names
+from models import DisciplinaPlan, FisaData, StatisticiValidare, Verificare
+
+
+# Constrângerile comune fișei și planului (vezi și plan_audit.py)
+ORE_PER_CREDIT = 25
+INTERVAL_EXAMINARI = (2, 3)
+
+# Grupurile de verificări din rezultatul validării, în ordinea din răspuns
+RULE_GROUPS = ('comparatie_plan', 'verificari_matematice', 'verificari_intervale')
+
+RULE_TYPES = ('exact', 'fuzzy', 'formula', 'interval')
+
+SEVERITIES = ('error', 'warning')
+
+# Fișier JSON cu reguli suplimentare (sau care le înlocuiesc pe cele implicite)
+VALIDATION_RULES_FILE = os.environ.get('VALIDATION_RULES_FILE')
+
+DEFAULT_RULES: List[Dict[str, Any]] = [
+    # Comparație cu planul
+    {'nume': 'cod', 'grup': 'comparatie_plan', 'tip': 'exact', 'camp': 'cod',
+     'mesaj': 'Codul disciplinei diferă de cel din plan'},
+    {'nume': 'denumire_ro', 'grup': 'comparatie_plan', 'tip': 'fuzzy', 'camp': 'denumire_ro',
+     'mesaje': {
+         'diacritice': 'Denumirea în română diferă doar prin diacritice',
+         'warning': 'Diferențe minore în denumirea în română',
+         'error': 'Denumirea în română diferă semnificativ de cea din plan'
+     }},
+    {'nume': 'denumire_en', 'grup': 'comparatie_plan', 'tip': 'fuzzy', 'camp': 'denumire_en',
+     'mesaje': {
+         'diacritice': 'Denumirea în engleză diferă doar prin diacritice',
+         'warning': 'Diferențe minore în denumirea în engleză',
+         'error': 'Denumirea în engleză diferă semnificativ de cea din plan'
+     }},
+    {'nume': 'categoria', 'grup': 'comparatie_plan', 'tip': 'exact', 'camp': 'categoria',
+     'mesaj': 'Categoria diferă de cea din plan'},
+    {'nume': 'credite', 'grup': 'comparatie_plan', 'tip': 'exact', 'camp': 'credite',
+     'mesaj': 'Numărul de credite diferă de cel din plan'},
+    *[
+        {'nume': f'ore_{tip_ore}', 'grup': 'comparatie_plan', 'tip': 'exact',
+         'camp': f'nr_ore_saptamana.{tip_ore}', 'mesaj': f'Ore {tip_ore} diferă de cele din plan'}
+        for tip_ore in ('curs', 'seminar', 'proiect', 'lucrari')
+    ],
+
+    # Constrângeri matematice
+    {'nume': 'total_semestru_din_credite', 'grup': 'verificari_matematice', 'tip': 'formula',
+     'camp': 'total_ore_semestru', 'termeni': ['credite'], 'factor': ORE_PER_CREDIT,
+     'formula': f'total_ore_semestru == credite × {ORE_PER_CREDIT}',
+     'mesaj': f'Total ore semestru ({{valoare}}) nu este egal cu credite × {ORE_PER_CREDIT} ({{calculat}})'},
+    {'nume': 'total_studiu_suma', 'grup': 'verificari_matematice', 'tip': 'formula',
+     'camp': 'total_ore_studiu_individual',
+     'termeni': ['distributie_fond_timp.studiu_manual', 'distributie_fond_timp.documentare',
+                 'distributie_fond_timp.pregatire_seminarii'],
+     'formula': 'total_studiu == studiu_manual + documentare + pregatire_seminarii',
+     'mesaj': 'Total ore studiu ({valoare}) nu este suma componentelor ({calculat})'},
+    {'nume': 'total_semestru_suma', 'grup': 'verificari_matematice', 'tip': 'formula',
+     'camp': 'total_ore_semestru', 'termeni': ['total_ore_plan', 'total_ore_studiu_individual'],
+     'formula': 'total_semestru == total_plan + total_studiu',
+     'mesaj': 'Total ore semestru ({valoare}) nu este suma ore plan ({total_ore_plan}) + studiu ({total_ore_studiu_individual})'},
+
+    # Intervale
+    {'nume': 'ore_examinari', 'grup': 'verificari_intervale', 'tip': 'interval',
+     'camp': 'distributie_fond_timp.examinari', 'min': INTERVAL_EXAMINARI[0], 'max': INTERVAL_EXAMINARI[1],
+     'mesaj': 'Ore examinări ({valoare}) trebuie să fie între {min} și {max}'}
+]
+
+
+# O regulă compilată: (grup, nume, funcție(fisa, plan) -> rezultatul verificării)
+CompiledRule = Tuple[str, str, Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]]]
+
+
+def _getter(path: str) -> Callable[[Dict[str, Any]], Any]:
+    """Funcția care citește un câmp (eventual imbricat, ex. 'a.b')."""
+    keys = path.split('.')
+    if len(keys) == 1:
+        key = keys[0]
+        return lambda data: data[key]
+    if len(keys) == 2:
+        parent, key = keys
+        return lambda data: data[parent][key]
+
+    def get(data: Dict[str, Any]) -> Any:
+        for key in keys:
+            data = data[key]
+        return data
+    return get
+
+
+def _compile_exact(rule: Dict[str, Any]):
+    get_fisa = _getter(rule['camp'])
+    get_plan = _getter(rule.get('camp_plan', rule['camp']))
+    severitate = rule.get('severitate', 'error')
+    mesaj = rule['mesaj']
+    optional = rule.get('optional', False)
+
+    def check(fisa: Dict[str, Any], plan: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        valoare_fisa = get_fisa(fisa)
+        try:
+            valoare_plan = get_plan(plan)
+        except KeyError:
+            if optional:
+                return None
+            raise
+        if valoare_plan is None and optional:
+            # Câmpul nu este completat în plan: verificarea nu se aplică
+            return None
+        if valoare_fisa == valoare_plan:
+            return {'status': 'ok', 'valoare_fisa': valoare_fisa, 'valoare_plan': valoare_plan, 'mesaj': None}
+        return {
+            'status': severitate,
+            'valoare_fisa': valoare_fisa,
+            'valoare_plan': valoare_plan,
+            'mesaj': mesaj.format(valoare_fisa=valoare_fisa, valoare_plan=valoare_plan)
+        }
+    return check
+
+
+def _compile_fuzzy(rule: Dict[str, Any]):
+    get_fisa = _getter(rule['camp'])
+    get_plan = _getter(rule.get('camp_plan', rule['camp']))
+    mesaje = rule['mesaje']
+    # Rezultatul pentru denumiri identice (cazul obișnuit) nu depinde de text
+    identic = compare_names('x', 'x')
+
+    def check(fisa: Dict[str, Any], plan: Dict[str, Any]) -> Dict[str, Any]:
+        valoare_fisa = get_fisa(fisa)
+        valoare_plan = get_plan(plan)
+        if valoare_fisa and valoare_fisa == valoare_plan and isinstance(valoare_fisa, str):
+            scor, status, doar_diacritice = identic
+        else:
+            scor, status, doar_diacritice = compare_names(valoare_fisa, valoare_plan)
+        if status == 'ok':
+            mesaj = None
+        elif status == 'warning' and doar_diacritice:
+            mesaj = mesaje['diacritice']
+        else:
+            mesaj = mesaje[status]
+        return {
+            'status': status,
+            'valoare_fisa': valoare_fisa,
+            'valoare_plan': valoare_plan,
+            'similarity': round(scor, 3),
+            'mesaj': mesaj
+        }
+    return check
+
+
+def _compile_formula(rule: Dict[str, Any]):
+    get_valoare = _getter(rule['camp'])
+    termeni = [(path.rsplit('.', 1)[-1], _getter(path)) for path in rule['termeni']]
+    factor = rule.get('factor', 1)
+    formula = rule['formula']
+    severitate = rule.get('severitate', 'error')
+    mesaj = rule['mesaj']
+    # Textul calculului: "valoare == t1 + t2 (× factor)"
+    calcul_format = '{} == ' + ' + '.join('{}' for _ in termeni) + (f' × {factor}' if factor != 1 else '')
+
+    def check(fisa: Dict[str, Any], plan: Dict[str, Any]) -> Dict[str, Any]:
+        valoare = get_valoare(fisa)
+        valori = [get(fisa) for _, get in termeni]
+        calculat = sum(valori[1:], valori[0])
+        if factor != 1:
+            calculat = calculat * factor
+        corect = valoare == calculat
+        return {
+            'status': 'ok' if corect else severitate,
+            'formula': formula,
+            'valoare_fisa': valoare,
+            'valoare_calculata': calculat,
+            'calcul': calcul_format.format(valoare, *valori),
+            'corect': corect,
+            'mesaj': None if corect else mesaj.format(
+                valoare=valoare, calculat=calculat,
+                **{name: value for (name, _), value in zip(termeni, valori)}
+            )
+        }
+    return check
+
+
+def _compile_interval(rule: Dict[str, Any]):
+    get_valoare = _getter(rule['camp'])
+    minim, maxim = rule['min'], rule['max']
+    severitate = rule.get('severitate', 'error')
+    mesaj = rule['mesaj']
+
+    def check(fisa: Dict[str, Any], plan: Dict[str, Any]) -> Dict[str, Any]:
+        valoare = get_valoare(fisa)
+        corect = minim <= valoare <= maxim
+        return {
+            'status': 'ok' if corect else severitate,
+            'valoare': valoare,
+            'interval': [minim, maxim],
+            'corect': corect,
+            'mesaj': None if corect else mesaj.format(valoare=valoare, min=minim, max=maxim)
+        }
+    return check
+
+
+_COMPILERS = {
+    'exact': _compile_exact,
+    'fuzzy': _compile_fuzzy,
+    'formula': _compile_formula,
+    'interval': _compile_interval
+}
+
+
+def compile_rule(rule: Dict[str, Any]) -> CompiledRule:
+    """
+    Compilează o regulă declarativă.
+
+    Raises:
+        ValueError: dacă regula are tip, grup sau severitate necunoscute
+    """
+    for key in ('nume', 'grup', 'tip', 'camp'):
+        if key not in rule:
+            raise ValueError(f"Regula {rule.get('nume')} nu are câmpul '{key}'")
+    if rule['tip'] not in RULE_TYPES:
+        raise ValueError(f"Tip de regulă necunoscut: {rule['tip']}")
+    if rule['grup'] not in RULE_GROUPS:
+        raise ValueError(f"Grup de reguli necunoscut: {rule['grup']}")
+    if rule.get('severitate', 'error') not in SEVERITIES:
+        raise ValueError(f"Severitate necunoscută: {rule['severitate']}")
+    try:
+        return rule['grup'], rule['nume'], _COMPILERS[rule['tip']](rule)
+    except KeyError as e:
+        raise ValueError(f"Regula {rule['nume']} nu are câmpul {e}")
+
+
+class RulePlan:
+    """
+    Setul de reguli compilat într-o listă plată, evaluat într-o singură trecere.
+    """
+
+    __slots__ = ('rules', 'version', '_groups')
+
+    def __init__(self, rules: List[Dict[str, Any]]):
+        """
+        Args:
+            rules: Regulile declarative (vezi `DEFAULT_RULES`)
+
+        Raises:
+            ValueError: dacă o regulă nu este validă
+        """
+        self.rules: List[CompiledRule] = [compile_rule(rule) for rule in rules]
+        # Regulile fiecărui grup, pentru evaluarea unui singur grup
+        self._groups: Dict[str, List[CompiledRule]] = {grup: [] for grup in RULE_GROUPS}
+        for compiled in self.rules:
+            self._groups[compiled[0]].append(compiled)
+        # Versiunea setului de reguli (intră în cheia cache-ului validărilor)
+        self.version = hashlib.sha256(
+            json.dumps(rules, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        ).hexdigest()[:8]
+
+    def evaluate(
+        self,
+        fisa_data: FisaData,
+        plan_data: DisciplinaPlan
+    ) -> Tuple[Dict[str, Dict[str, Verificare]], StatisticiValidare]:
+        """
+        Evaluează toate regulile pentru o fișă.
+
+        Returns:
+            Tuplu (rezultatele pe grupuri, statistici: total_verificari,
+            succes, warning, erori)
+        """
+        validari: Dict[str, Dict[str, Verificare]] = {grup: {} for grup in RULE_GROUPS}
+        counts = {'ok': 0, 'warning': 0, 'error': 0}
+        for grup, nume, check in self.rules:
+            rezultat = check(fisa_data, plan_data)
+            if rezultat is None:
+                continue
+            validari[grup][nume] = rezultat
+            counts[rezultat['status']] += 1
+        statistici = {
+            'total_verificari': counts['ok'] + counts['warning'] + counts['error'],
+            'succes': counts['ok'],
+            'warning': counts['warning'],
+            'erori': counts['error']
+        }
+        return validari, statistici
+
+    def evaluate_group(
+        self,
+        grup: str,
+        fisa_data: FisaData,
+        plan_data: DisciplinaPlan
+    ) -> Dict[str, Verificare]:
+        """
+        Evaluează doar regulile unui grup.
+
+        Raises:
+            ValueError: dacă grupul nu există
+        """
+        if grup not in self._groups:
+            raise ValueError(f"Grup de reguli necunoscut: {grup}")
+        validari: Dict[str, Verificare] = {}
+        for _, nume, check in self._groups[grup]:
+            rezultat = check(fisa_data, plan_data)
+            if rezultat is not None:
+                validari[nume] = rezultat
+        return validari
+
+
+def load_rules(file_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Regulile implicite, completate cu cele din fișierul JSON dat.
+
+    Fișierul conține o listă de reguli; o regulă cu același nume ca una
+    implicită o înlocuiește (în aceeași poziție), celelalte sunt adăugate
+    la final.
+    """
+    rules = list(DEFAULT_RULES)
+    if not file_path:
+        return rules
+    with open(file_path, encoding='utf-8') as f:
+        extra = json.load(f)
+    if not isinstance(extra, list):
+        raise ValueError("Fișierul de reguli trebuie să conțină o listă de reguli")
+    positions = {rule['nume']: i for i, rule in enumerate(rules)}
+    for rule in extra:
+        if rule.get('nume') in positions:
+            rules[positions[rule['nume']]] = rule
+        else:
+            positions[rule.get('nume')] = len(rules)
+            rules.append(rule)
+    return rules
+
+
+# Setul de reguli folosit de `validators.validate_fisa`, compilat la import
+RULE_PLAN = RulePlan(load_rules(VALIDATION_RULES_FILE))
@@ -0,0 +1,266 @@
+"""
+Planificatorul job-urilor trimise în pool-ul de lucru.
+
+Fără planificator, un lot mare (o arhivă cu sute de fișe, un job asincron)
+ocupă toți worker-ii, iar o validare interactivă din interfață așteaptă
+după el. `Scheduler` ține job-urile într-o coadă proprie și le trimite în
+pool doar când există un worker liber:
+
+- două clase, 'interactive' (/api/extract, /api/validate) și 'bulk'
+  (loturi, job-uri asincrone), servite ponderat (implicit 4:1); clasa
+  'bulk' nu poate ocupa toți worker-ii (SCHEDULER_BULK_SLOTS), deci o cerere
+  interactivă găsește mereu un worker care se eliberează curând;
+- în fiecare clasă, clienții (adresa IP; pentru job-uri, job-ul) sunt
+  serviți echitabil: următorul job este al clientului servit cel mai puțin
+  până acum, nu al celui care a trimis primul cele mai multe fișe;
+- un client are cel mult SCHEDULER_CLIENT_SLOTS job-uri în lucru simultan
+  în fiecare clasă: loturile unui client nu îi blochează cererile interactive;
+- coada fiecărei clase este limitată (SCHEDULER_MAX_QUEUE): peste limită
+  se ridică ExecutorSaturatedError (503 + Retry-After, iar loturile reîncearcă).
+
+Adâncimea cozilor, job-urile în lucru și timpul de așteptare sunt expuse pe
+/metrics (fisa_scheduler_*), iar așteptarea apare și în Server-Timing
+(etapa 'schedule').
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional
+
+from executor import ExecutorSaturatedError
+from metrics import SCHEDULER_ACTIVE, SCHEDULER_QUEUED, SCHEDULER_WAIT, record_stage
+
+
+INTERACTIVE = 'interactive'
+BULK = 'bulk'
+SCHEDULER_CLASSES = (INTERACTIVE, BULK)
+
+# Ponderile claselor: la cereri în așteptare în ambele clase, 'interactive'
+# primește de 4 ori mai mulți worker-i eliberați decât 'bulk'
+CLASS_WEIGHTS = {
+    INTERACTIVE: float(os.environ.get('SCHEDULER_INTERACTIVE_WEIGHT', 4)),
+    BULK: float(os.environ.get('SCHEDULER_BULK_WEIGHT', 1))
+}
+
+
+class _Waiter:
+    __slots__ = ('clasa', 'client', 'future', 'enqueued')
+
+    def __init__(self, clasa: str, client: str, future: asyncio.Future):
+        self.clasa = clasa
+        self.client = client
+        self.future = future
+        self.enqueued = time.perf_counter()
+
+
+class _ClassQueue:
+    """Cozile per client ale unei clase, timpul virtual și job-urile în lucru ale fiecărui client."""
+
+    __slots__ = ('name', 'weight', 'waiting', 'vtime', 'clock', 'pass_', 'active', 'queued', 'client_active')
+
+    def __init__(self, name: str, weight: float):
+        self.name = name
+        self.weight = weight
+        self.waiting: Dict[str, Deque[_Waiter]] = {}
+        # Timpul virtual al clientului = numărul de job-uri primite; un client
+        # care revine după o pauză pornește de la ceasul clasei, nu de la 0
+        self.vtime: Dict[str, float] = {}
+        self.clock = 0.0
+        # Poziția clasei în planificarea ponderată între clase (stride scheduling)
+        self.pass_ = 0.0
+        self.active = 0
+        self.queued = 0
+        # Job-urile în lucru ale fiecărui client în această clasă (limita SCHEDULER_CLIENT_SLOTS)
+        self.client_active: Dict[str, int] = {}
+
+
+class Scheduler:
+    """
+    Coada echitabilă, cu priorități, din fața pool-ului de lucru.
+
+    Toate metodele rulează în event loop-ul worker-ului uvicorn (fără lock-uri).
+    """
+
+    def __init__(
+        self,
+        slots: int,
+        bulk_slots: Optional[int] = None,
+        client_slots: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        retry_after: int = 5,
+        weights: Optional[Dict[str, float]] = None
+    ):
+        """
+        Args:
+            slots: Job-uri trimise simultan în pool (de regulă numărul de worker-i)
+            bulk_slots: Câte dintre ele poate ocupa clasa 'bulk' (implicit
+                toate mai puțin unul, de la 3 worker-i în sus)
+            client_slots: Job-uri în lucru simultan per client, în fiecare
+                clasă (implicit `bulk_slots`: un client singur folosește
+                toți worker-ii disponibili, iar la mai mulți clienți
+                împărțirea o face servirea echitabilă)
+            max_queue: Lungimea maximă a cozii unei clase (implicit 4 × slots)
+            retry_after: Valoarea Retry-After la coadă plină
+            weights: Ponderile claselor (implicit CLASS_WEIGHTS)
+        """
+        self.slots = slots
+        self.bulk_slots = bulk_slots or (slots - 1 if slots >= 3 else slots)
+        self.client_slots = client_slots or self.bulk_slots
+        self.max_queue = max_queue or slots * 4
+        self.retry_after = retry_after
+        weights = weights or CLASS_WEIGHTS
+        self._classes = {name: _ClassQueue(name, weights[name]) for name in SCHEDULER_CLASSES}
+        self._running = 0
+        # Poziția ultimei clase servite; o clasă care revine după o pauză pornește de aici
+        self._global_pass = 0.0
+
+    # -- Stare --------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Job-urile în așteptare și în lucru, per clasă."""
+        return {
+            name: {'in_asteptare': q.queued, 'in_lucru': q.active, 'clienti': len(q.waiting)}
+            for name, q in self._classes.items()
+        }
+
+    # -- Alegerea următorului job ------------------------------------------
+
+    def _eligible_client(self, q: _ClassQueue) -> Optional[str]:
+        """Clientul cu cel mai mic timp virtual care mai are voie la un job."""
+        best, best_vtime = None, 0.0
+        for client in q.waiting:
+            if q.client_active.get(client, 0) >= self.client_slots:
+                continue
+            vtime = q.vtime[client]
+            if best is None or vtime < best_vtime:
+                best, best_vtime = client, vtime
+        return best
+
+    def _next(self) -> Optional[_Waiter]:
+        chosen_class, chosen_client = None, None
+        for q in self._classes.values():
+            if not q.waiting:
+                continue
+            if q.name == BULK and q.active >= self.bulk_slots:
+                continue
+            client = self._eligible_client(q)
+            if client is None:
+                continue
+            if chosen_class is None or q.pass_ < chosen_class.pass_:
+                chosen_class, chosen_client = q, client
+        if chosen_class is None:
+            return None
+
+        q = chosen_class
+        waiters = q.waiting[chosen_client]
+        waiter = waiters.popleft()
+        if not waiters:
+            del q.waiting[chosen_client]
+        q.queued -= 1
+        q.clock = q.vtime[chosen_client]
+        q.vtime[chosen_client] += 1.0
+        self._global_pass = q.pass_
+        q.pass_ += 1.0 / q.weight
+        q.active += 1
+        q.client_active[chosen_client] = q.client_active.get(chosen_client, 0) + 1
+        return waiter
+
+    def _dispatch(self) -> None:
+        """Trimite job-uri în pool cât timp există locuri libere."""
+        while self._running < self.slots:
+            waiter = self._next()
+            if waiter is None:
+                break
+            self._running += 1
+            if waiter.future.cancelled():
+                # Abandonat înainte ca handler-ul lui să ruleze: locul rămâne liber
+                self._unaccount(waiter.clasa, waiter.client)
+                continue
+            waiter.future.set_result(None)
+        for name, q in self._classes.items():
+            SCHEDULER_QUEUED.labels(name).set(q.queued)
+            SCHEDULER_ACTIVE.labels(name).set(q.active)
+
+    # -- Locuri -------------------------------------------------------------
+
+    def _enqueue(self, clasa: str, client: str) -> _Waiter:
+        q = self._classes[clasa]
+        if q.queued >= self.max_queue:
+            raise ExecutorSaturatedError(self.retry_after)
+        if not q.waiting:
+            # Clasa revine după o pauză: nu acumulează prioritate cât a stat
+            q.pass_ = max(q.pass_, self._global_pass)
+        if client not in q.waiting:
+            q.vtime[client] = max(q.vtime.get(client, 0.0), q.clock)
+            q.waiting[client] = deque()
+        waiter = _Waiter(clasa, client, asyncio.get_running_loop().create_future())
+        q.waiting[client].append(waiter)
+        q.queued += 1
+        return waiter
+
+    def _cancel(self, clasa: str, waiter: _Waiter) -> None:
+        """Scoate din coadă un job abandonat (ex. clientul s-a deconectat)."""
+        q = self._classes[clasa]
+        waiters = q.waiting.get(waiter.client)
+        if waiters is not None and waiter in waiters:
+            waiters.remove(waiter)
+            q.queued -= 1
+            if not waiters:
+                del q.waiting[waiter.client]
+                self._forget(q, waiter.client)
+        self._dispatch()
+
+    def _forget(self, q: _ClassQueue, client: str) -> None:
+        # Clienții inactivi nu mai sunt ținuți minte (timpul virtual se
+        # reface din ceasul clasei la revenire)
+        if client not in q.waiting and not q.client_active.get(client):
+            q.vtime.pop(client, None)
+
+    def _unaccount(self, clasa: str, client: str) -> None:
+        q = self._classes[clasa]
+        q.active -= 1
+        self._running -= 1
+        active = q.client_active[client] - 1
+        if active:
+            q.client_active[client] = active
+        else:
+            del q.client_active[client]
+            self._forget(q, client)
+
+    def _release(self, clasa: str, client: str) -> None:
+        self._unaccount(clasa, client)
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, clasa: str, client: Optional[str]) -> AsyncIterator[None]:
+        """
+        Așteaptă un loc în pool pentru un job al clientului dat.
+
+        Args:
+            clasa: 'interactive' sau 'bulk'
+            client: Identificatorul clientului (ex. adresa IP)
+
+        Raises:
+            ExecutorSaturatedError: dacă coada clasei este plină
+        """
+        client = client or '-'
+        waiter = self._enqueue(clasa, client)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Locul fusese deja acordat: este eliberat
+                self._release(clasa, client)
+            else:
+                self._cancel(clasa, waiter)
+            raise
+        waited = time.perf_counter() - waiter.enqueued
+        SCHEDULER_WAIT.labels(clasa).observe(waited)
+        record_stage('schedule', waited)
+        try:
+            yield
+        finally:
+            self._release(clasa, client)
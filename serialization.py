@@ -0,0 +1,61 @@
+"""
+Serializarea JSON a răspunsurilor API și a rezultatelor păstrate pe disc.
+
+Rezultatele (fișe extrase, validări, loturi cu mii de fișe) sunt dicționare
+simple. Returnate ca atare de un endpoint, FastAPI le trece întâi prin
+`jsonable_encoder`, care copiază recursiv toată structura, apoi prin
+`json.dumps`; pentru un lot de 2000 de fișe asta înseamnă ~0,8 s și o copie
+completă a rezultatelor în memorie. Endpoint-urile returnează în schimb
+direct un `FastJSONResponse`, serializat într-o singură trecere cu orjson
+(dependență opțională; fără ea se folosește modulul json, cu aceeași formă
+a ieșirii).
+"""
+import json
+from typing import Any, Union
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # dependență opțională: fără orjson se folosește modulul json
+    orjson = None
+
+
+if orjson is not None:
+    # Chei ne-string (ex. numere) convertite ca în json.dumps
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def dumps(content: Any) -> bytes:
+    """
+    JSON compact, UTF-8, fără escape pentru diacritice (aceeași formă ca
+    `JSONResponse` din Starlette).
+    """
+    if orjson is not None:
+        return orjson.dumps(content, option=_ORJSON_OPTIONS)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Inversul lui `dumps` (acceptă și text)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Răspuns JSON serializat cu `dumps`.
+
+    Returnat direct din endpoint, ocolește `jsonable_encoder`; conținutul
+    trebuie să fie deja format din tipuri JSON (dict, list, str, număr, None).
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,66 @@
+"""
+Job-urile executate în pool-ul de lucru (vezi executor.py).
+
+Funcțiile sunt definite la nivel de modul pentru a putea fi trimise
+într-un ProcessPoolExecutor.
+"""
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from app_logging import request_id_var
+from extractors import FisaSource, extract_fisa_disciplina
+from models import FisaData, RezultatValidare
+from validators import validate_fisa
+
+
+def extract_job(
+    source: FisaSource,
+    engine: str = 'docx',
+    request_id: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None
+) -> Tuple[FisaData, Dict[str, float]]:
+    """
+    Extrage datele din fișă.
+
+    Args:
+        source: Conținutul fișei (bytes) sau un obiect fișier
+        engine: Motorul de extragere
+        request_id: ID-ul cererii HTTP, pentru mesajele de log din worker
+        fields: Doar aceste câmpuri (implicit toate)
+
+    Returns:
+        Tuplu (date extrase, duratele etapelor în worker: 'parse', 'cells')
+    """
+    # Worker-ii pool-ului nu moștenesc contextul cererii
+    token = request_id_var.set(request_id)
+    try:
+        timings: Dict[str, float] = {}
+        fisa_data = extract_fisa_disciplina(source, engine=engine, timings=timings, fields=fields)
+        return fisa_data, timings
+    finally:
+        request_id_var.reset(token)
+
+
+def validate_extracted(
+    fisa_data: FisaData,
+    plan_data: Dict[str, Any],
+    cod_disciplina: Optional[str] = None,
+    program: Optional[str] = None
+) -> RezultatValidare:
+    """
+    Validează date deja extrase (de exemplu, luate din cache).
+
+    Args:
+        fisa_data: Date extrase din fișa disciplinei (nu sunt modificate)
+        plan_data: Date din planul de învățământ (sau registrul planurilor)
+        cod_disciplina: Codul selectat manual (suprascrie codul din fișă)
+        program: Programul de studii, când plan_data este registrul planurilor
+
+    Returns:
+        Rezultatul validării
+    """
+    # Dacă utilizatorul a selectat manual o disciplină, suprascrie codul din fișă
+    if cod_disciplina:
+        fisa_data = {**fisa_data, 'cod': cod_disciplina}
+
+    return validate_fisa(fisa_data, plan_data, program)
+
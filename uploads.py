@@ -0,0 +1,146 @@
+"""
+Modul pentru limitarea și verificarea fișierelor încărcate.
+
+- `UploadLimitMiddleware` limitează dimensiunea body-ului cererilor de
+  upload: o cerere cu Content-Length prea mare este respinsă (413) înainte
+  de a fi citită, iar una fără Content-Length (chunked) este oprită imediat
+  ce depășește limita, în timp ce body-ul este parsat în bucăți. Parserul
+  multipart scrie fișierele în fișiere temporare (peste 1 MB pe disc), deci
+  memoria per worker rămâne limitată.
+- `check_docx` verifică, înainte de parsare, că fișierul este o arhivă ZIP
+  (semnătura și directorul central) care conține word/document.xml, și
+  respinge arhivele-bombă: dimensiunea declarată a document.xml și raportul
+  de compresie sunt limitate. zipfile nu decomprimă niciodată mai mult
+  decât dimensiunea declarată, deci limita se aplică și la extragere.
+"""
+import os
+import zipfile
+from typing import BinaryIO, Dict, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+
+# Dimensiunea maximă a body-ului unei cereri cu o singură fișă
+UPLOAD_MAX_BYTES = int(os.environ.get('UPLOAD_MAX_BYTES', 20 * 1024 * 1024))
+
+# Dimensiunea maximă a body-ului unei cereri de validare în lot
+BATCH_UPLOAD_MAX_BYTES = int(os.environ.get('BATCH_UPLOAD_MAX_BYTES', 200 * 1024 * 1024))
+
+# Dimensiunea maximă (necomprimată) a word/document.xml
+DOCX_MAX_XML_BYTES = int(os.environ.get('DOCX_MAX_XML_BYTES', 20 * 1024 * 1024))
+
+# Raportul maxim dimensiune necomprimată / comprimată pentru word/document.xml
+# (XML-ul unei fișe se comprimă de regulă de 5-15 ori, cel al tabelelor mari
+# și repetitive de până la ~40 de ori)
+DOCX_MAX_COMPRESSION_RATIO = int(os.environ.get('DOCX_MAX_COMPRESSION_RATIO', 100))
+
+ZIP_MAGIC = b'PK\x03\x04'
+DOCUMENT_XML = 'word/document.xml'
+
+
+class UploadRejected(Exception):
+    """Fișierul încărcat nu este o fișă DOCX acceptabilă."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def check_docx(file: BinaryIO) -> None:
+    """
+    Verifică structura unui fișier DOCX, fără a-l parsa.
+
+    Se citesc doar semnătura și directorul central al arhivei; poziția în
+    fișier este readusă la început.
+
+    Args:
+        file: Fișierul încărcat (obiect fișier binar cu seek)
+
+    Raises:
+        UploadRejected: dacă fișierul nu este DOCX (400) sau dacă
+            document.xml depășește limitele de dezarhivare (413)
+    """
+    try:
+        file.seek(0)
+        if file.read(len(ZIP_MAGIC)) != ZIP_MAGIC:
+            raise UploadRejected("Fișierul nu este un document DOCX valid")
+        file.seek(0)
+        try:
+            with zipfile.ZipFile(file) as archive:
+                info = archive.getinfo(DOCUMENT_XML)
+        except KeyError:
+            raise UploadRejected("Fișierul nu este un document DOCX valid (lipsește word/document.xml)")
+        except (zipfile.BadZipFile, OSError):
+            raise UploadRejected("Fișierul nu este un document DOCX valid (arhivă ZIP coruptă)")
+
+        if info.file_size > DOCX_MAX_XML_BYTES:
+            raise UploadRejected("Conținutul documentului depășește dimensiunea maximă permisă", 413)
+        if info.compress_size and info.file_size / info.compress_size > DOCX_MAX_COMPRESSION_RATIO:
+            raise UploadRejected("Documentul are un raport de compresie suspect", 413)
+    finally:
+        file.seek(0)
+
+
+def upload_limit_exceeded(limit: int) -> HTTPException:
+    """Eroarea HTTP 413 pentru un body mai mare decât `limit` octeți."""
+    return HTTPException(
+        status_code=413,
+        detail=f"Fișierul depășește dimensiunea maximă permisă ({limit // (1024 * 1024)} MB)"
+    )
+
+
+class UploadLimitMiddleware:
+    """
+    Middleware ASGI care limitează dimensiunea body-ului pe rutele de upload.
+
+    Depășirea limitei în timpul citirii body-ului ridică HTTPException(413)
+    din `receive`; FastAPI o lasă să treacă de parsarea formularului, iar
+    răspunsul este cel obișnuit pentru HTTPException.
+    """
+
+    def __init__(self, app, limits: Dict[str, int]):
+        """
+        Args:
+            limits: Limita în octeți pentru fiecare cale (ex. '/api/validate')
+        """
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope['path']) if scope['type'] == 'http' else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        content_length: Optional[int] = None
+        for name, value in scope['headers']:
+            if name == b'content-length':
+                try:
+                    content_length = int(value)
+                except ValueError:
+                    content_length = None
+                break
+
+        if content_length is not None and content_length > limit:
+            # Respinsă înainte de a citi body-ul
+            await self._reject(scope, receive, send, limit)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > limit:
+                    raise upload_limit_exceeded(limit)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    async def _reject(self, scope, receive, send, limit: int) -> None:
+        exc = upload_limit_exceeded(limit)
+        response = JSONResponse({"detail": exc.detail}, status_code=exc.status_code, headers={"Connection": "close"})
+        await response(scope, receive, send)
@@ -2,24 +2,26 @@
 Modul pentru validarea fișelor de disciplină față de planul de învățământ.
 """
 import json
-from typing import Dict, Any, List
-from difflib import SequenceMatcher
+import logging
+from typing import Dict, Any, List, Optional
 
+from app_logging import log_sampled
+from matching import SIMILARITY_OK, SIMILARITY_WARNING
+from models import FisaData, RezultatValidare
+from plan_registry import PlanRegistry
+from rules import INTERVAL_EXAMINARI, ORE_PER_CREDIT, RULE_PLAN
 
-def similarity(a: str, b: str) -> float:
-    """
-    Calculează similaritatea între două string-uri (0.0 - 1.0).
-    
-    Args:
-        a: Primul string
-        b: Al doilea string
-        
-    Returns:
-        Scor de similaritate între 0.0 și 1.0
-    """
-    if not a or not b:
-        return 0.0
-    return SequenceMatcher(None, a.lower(), b.lower()).ratio()
+
+# Versiunea regulilor de validare (pragurile de similaritate și setul de
+# reguli); rezultatele din cache obținute cu alte reguli nu mai sunt folosite
+VALIDATION_VERSION = f'2-{SIMILARITY_OK:g}-{SIMILARITY_WARNING:g}-{RULE_PLAN.version}'
+
+logger = logging.getLogger(__name__)
+
+
+def validation_version(plan_store) -> str:
+    """Versiunea sub care sunt păstrate validările în cache: planul + regulile de validare."""
+    return f"{plan_store.version}-{VALIDATION_VERSION}"
 
 
 def validate_against_plan(fisa_data: Dict[str, Any], plan_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -31,91 +33,9 @@ def validate_against_plan(fisa_data: Dict[str, Any], plan_data: Dict[str, Any])
         plan_data: Date din planul de învățământ pentru disciplina respectivă
         
     Returns:
-        Dicționar cu rezultatele validării
+        Dicționar cu rezultatele validării (regulile din grupul 'comparatie_plan')
     """
-    validari = {}
-    
-    # 1. Cod disciplină (exact match)
-    cod_match = fisa_data['cod'] == plan_data['cod']
-    validari['cod'] = {
-        'status': 'ok' if cod_match else 'error',
-        'valoare_fisa': fisa_data['cod'],
-        'valoare_plan': plan_data['cod'],
-        'mesaj': None if cod_match else 'Codul disciplinei diferă de cel din plan'
-    }
-    
-    # 2. Denumire română (fuzzy match)
-    sim_ro = similarity(fisa_data['denumire_ro'], plan_data['denumire_ro'])
-    if sim_ro >= 0.95:
-        status_ro = 'ok'
-        mesaj_ro = None
-    elif sim_ro >= 0.85:
-        status_ro = 'warning'
-        mesaj_ro = 'Diferențe minore în denumirea în română (probabil diacritice)'
-    else:
-        status_ro = 'error'
-        mesaj_ro = 'Denumirea în română diferă semnificativ de cea din plan'
-    
-    validari['denumire_ro'] = {
-        'status': status_ro,
-        'valoare_fisa': fisa_data['denumire_ro'],
-        'valoare_plan': plan_data['denumire_ro'],
-        'similarity': round(sim_ro, 3),
-        'mesaj': mesaj_ro
-    }
-    
-    # 3. Denumire engleză (fuzzy match)
-    sim_en = similarity(fisa_data['denumire_en'], plan_data['denumire_en'])
-    if sim_en >= 0.95:
-        status_en = 'ok'
-        mesaj_en = None
-    elif sim_en >= 0.85:
-        status_en = 'warning'
-        mesaj_en = 'Diferențe minore în denumirea în engleză'
-    else:
-        status_en = 'error'
-        mesaj_en = 'Denumirea în engleză diferă semnificativ de cea din plan'
-    
-    validari['denumire_en'] = {
-        'status': status_en,
-        'valoare_fisa': fisa_data['denumire_en'],
-        'valoare_plan': plan_data['denumire_en'],
-        'similarity': round(sim_en, 3),
-        'mesaj': mesaj_en
-    }
-    
-    # 4. Categoria (exact match)
-    cat_match = fisa_data['categoria'] == plan_data['categoria']
-    validari['categoria'] = {
-        'status': 'ok' if cat_match else 'error',
-        'valoare_fisa': fisa_data['categoria'],
-        'valoare_plan': plan_data['categoria'],
-        'mesaj': None if cat_match else 'Categoria diferă de cea din plan'
-    }
-    
-    # 5. Credite (exact match)
-    credite_match = fisa_data['credite'] == plan_data['credite']
-    validari['credite'] = {
-        'status': 'ok' if credite_match else 'error',
-        'valoare_fisa': fisa_data['credite'],
-        'valoare_plan': plan_data['credite'],
-        'mesaj': None if credite_match else 'Numărul de credite diferă de cel din plan'
-    }
-    
-    # 6. Ore pe săptămână - detaliate
-    ore_fisa = fisa_data['nr_ore_saptamana']
-    ore_plan = plan_data['nr_ore_saptamana']
-    
-    for tip_ore in ['curs', 'seminar', 'proiect', 'lucrari']:
-        match = ore_fisa[tip_ore] == ore_plan[tip_ore]
-        validari[f'ore_{tip_ore}'] = {
-            'status': 'ok' if match else 'error',
-            'valoare_fisa': ore_fisa[tip_ore],
-            'valoare_plan': ore_plan[tip_ore],
-            'mesaj': None if match else f'Ore {tip_ore} diferă de cele din plan'
-        }
-    
-    return validari
+    return RULE_PLAN.evaluate_group('comparatie_plan', fisa_data, plan_data)
 
 
 def validate_mathematical_constraints(fisa_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -133,56 +53,8 @@ def validate_mathematical_constraints(fisa_data: Dict[str, Any]) -> Dict[str, An
     Returns:
         Dicționar cu rezultatele verificărilor matematice
     """
-    verificari = {}
-    
-    # 1. Total ore semestru = credite × 25
-    credite = fisa_data['credite']
-    total_semestru = fisa_data['total_ore_semestru']
-    calculat_din_credite = credite * 25
-    
-    match_credite = total_semestru == calculat_din_credite
-    verificari['total_semestru_din_credite'] = {
-        'status': 'ok' if match_credite else 'error',
-        'formula': 'total_ore_semestru == credite × 25',
-        'valoare_fisa': total_semestru,
-        'valoare_calculata': calculat_din_credite,
-        'calcul': f'{total_semestru} == {credite} × 25',
-        'corect': match_credite,
-        'mesaj': None if match_credite else f'Total ore semestru ({total_semestru}) nu este egal cu credite × 25 ({calculat_din_credite})'
-    }
-    
-    # 2. Total ore studiu individual = suma componente
-    dist = fisa_data['distributie_fond_timp']
-    total_studiu = fisa_data['total_ore_studiu_individual']
-    suma_componente = dist['studiu_manual'] + dist['documentare'] + dist['pregatire_seminarii']
-    
-    match_studiu = total_studiu == suma_componente
-    verificari['total_studiu_suma'] = {
-        'status': 'ok' if match_studiu else 'error',
-        'formula': 'total_studiu == studiu_manual + documentare + pregatire_seminarii',
-        'valoare_fisa': total_studiu,
-        'valoare_calculata': suma_componente,
-        'calcul': f'{total_studiu} == {dist["studiu_manual"]} + {dist["documentare"]} + {dist["pregatire_seminarii"]}',
-        'corect': match_studiu,
-        'mesaj': None if match_studiu else f'Total ore studiu ({total_studiu}) nu este suma componentelor ({suma_componente})'
-    }
-    
-    # 3. Total ore semestru = total ore plan + total ore studiu individual
-    total_plan = fisa_data['total_ore_plan']
-    calculat_semestru = total_plan + total_studiu
-    
-    match_semestru = total_semestru == calculat_semestru
-    verificari['total_semestru_suma'] = {
-        'status': 'ok' if match_semestru else 'error',
-        'formula': 'total_semestru == total_plan + total_studiu',
-        'valoare_fisa': total_semestru,
-        'valoare_calculata': calculat_semestru,
-        'calcul': f'{total_semestru} == {total_plan} + {total_studiu}',
-        'corect': match_semestru,
-        'mesaj': None if match_semestru else f'Total ore semestru ({total_semestru}) nu este suma ore plan ({total_plan}) + studiu ({total_studiu})'
-    }
-    
-    return verificari
+    # Doar regulile grupului, care citesc numai fișa: planul nu este necesar
+    return RULE_PLAN.evaluate_group('verificari_matematice', fisa_data, {})
 
 
 def validate_intervals(fisa_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -198,65 +70,77 @@ def validate_intervals(fisa_data: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Dicționar cu rezultatele verificărilor de interval
     """
-    verificari = {}
-    
-    # Ore examinări între 2 și 3
-    examinari = fisa_data['distributie_fond_timp']['examinari']
-    in_interval = 2 <= examinari <= 3
-    
-    verificari['ore_examinari'] = {
-        'status': 'ok' if in_interval else 'error',
-        'valoare': examinari,
-        'interval': [2, 3],
-        'corect': in_interval,
-        'mesaj': None if in_interval else f'Ore examinări ({examinari}) trebuie să fie între 2 și 3'
-    }
-    
-    return verificari
+    return RULE_PLAN.evaluate_group('verificari_intervale', fisa_data, {})
 
 
-def validate_fisa(fisa_data: Dict[str, Any], plan_data: Dict[str, Any]) -> Dict[str, Any]:
+def validate_fisa(
+    fisa_data: FisaData,
+    plan_data: Dict[str, Any],
+    program: Optional[str] = None
+) -> RezultatValidare:
     """
     Funcția principală de validare a fișei disciplinei.
     
     Args:
         fisa_data: Date extrase din fișa disciplinei
-        plan_data: Date din planul de învățământ
+        plan_data: Date din planul de învățământ (dicționar, PlanStore,
+            PlanSnapshot sau registrul planurilor, PlanRegistry)
+        program: Programul de studii (`<program>/<an>`), când plan_data
+            este registrul planurilor; implicit planul implicit
         
     Returns:
         Dicționar cu toate rezultatele validării
+
+    Raises:
+        plan_registry.UnknownProgramError: dacă programul nu are plan
     """
-    print(fisa_data)
-    # Găsește disciplina în plan după cod
-    disciplina_plan = None
-    for disc in plan_data['discipline']:
-        if disc['cod'] == fisa_data['cod']:
-            disciplina_plan = disc
-            break
+    if isinstance(plan_data, PlanRegistry):
+        plan_data = plan_data.get(program)
+    elif program is not None:
+        raise ValueError("Programul de studii poate fi ales doar din registrul planurilor")
+
+    # Găsește disciplina în plan după cod (index direct pentru PlanStore/PlanSnapshot)
+    if hasattr(plan_data, 'get_disciplina'):
+        disciplina_plan = plan_data.get_disciplina(fisa_data['cod'])
+    else:
+        disciplina_plan = None
+        for disc in plan_data['discipline']:
+            if disc['cod'] == fisa_data['cod']:
+                disciplina_plan = disc
+                break
     
     if not disciplina_plan:
-        return {
+        rezultat = {
             'status': 'error',
             'cod': fisa_data['cod'],
             'mesaj': f"Disciplina cu codul {fisa_data['cod']} nu există în planul de învățământ",
             'validari': None
         }
-    
-    # Rulează toate validările
-    validari_plan = validate_against_plan(fisa_data, disciplina_plan)
-    validari_matematice = validate_mathematical_constraints(fisa_data)
-    validari_intervale = validate_intervals(fisa_data)
+        # Codul lipsește sau e greșit: propune disciplina cu denumirea cea mai apropiată
+        if hasattr(plan_data, 'match_by_name'):
+            match = (plan_data.match_by_name(fisa_data.get('denumire_ro'))
+                     or plan_data.match_by_name(fisa_data.get('denumire_en')))
+            if match:
+                disc, scor = match
+                rezultat['sugestie'] = {
+                    'cod': disc['cod'],
+                    'denumire_ro': disc['denumire_ro'],
+                    'similarity': round(scor, 3)
+                }
+        log_sampled(
+            logger, logging.INFO, 'Disciplina nu există în plan',
+            cod=fisa_data['cod'], sugestie=rezultat.get('sugestie', {}).get('cod')
+        )
+        return rezultat
+    
+    # Rulează toate validările (o singură trecere prin regulile compilate)
+    validari, statistici = RULE_PLAN.evaluate(fisa_data, disciplina_plan)
     
     # Determină status-ul global
-    toate_validarile = {**validari_plan, **validari_matematice, **validari_intervale}
-    
-    are_erori = any(v.get('status') == 'error' for v in toate_validarile.values())
-    are_warning = any(v.get('status') == 'warning' for v in toate_validarile.values())
-    
-    if are_erori:
+    if statistici['erori']:
         status_global = 'error'
         summary = 'Fișa conține erori care trebuie corectate'
-    elif are_warning:
+    elif statistici['warning']:
         status_global = 'warning'
         summary = 'Fișa este validă dar conține avertismente'
     else:
@@ -268,20 +152,17 @@ def validate_fisa(fisa_data: Dict[str, Any], plan_data: Dict[str, Any]) -> Dict[
         'status': status_global,
         'cod': fisa_data['cod'],
         'denumire': fisa_data['denumire_ro'],
-        'validari': {
-            'comparatie_plan': validari_plan,
-            'verificari_matematice': validari_matematice,
-            'verificari_intervale': validari_intervale
-        },
+        'validari': validari,
         'summary': summary,
-        'statistici': {
-            'total_verificari': len(toate_validarile),
-            'succes': sum(1 for v in toate_validarile.values() if v.get('status') == 'ok'),
-            'warning': sum(1 for v in toate_validarile.values() if v.get('status') == 'warning'),
-            'erori': sum(1 for v in toate_validarile.values() if v.get('status') == 'error')
-        }
+        'statistici': statistici
     }
     
+    # Doar codul și status-urile; conținutul fișei nu ajunge în log
+    log_sampled(
+        logger, logging.DEBUG, 'Fișă validată',
+        cod=fisa_data['cod'], status=status_global,
+        erori=[nume for grup in validari.values() for nume, v in grup.items() if v['status'] == 'error']
+    )
     return rezultat
 
 